@@ -0,0 +1,349 @@
+"""
+Бенчмарк маршрутов API (команда benchmark_api).
+
+Каждый сценарий - запрос к одному маршруту api/v1/urls.py через тестовый
+клиент Django. Для сценария измеряются время ответа (p50, p95, p99),
+число запросов к БД (api.diagnostics.track_queries) и пик памяти,
+выделенной за запрос (tracemalloc). Память меряется отдельным проходом:
+трассировка замедляет код и исказила бы время. Запросы на запись
+выполняются в транзакции, которая откатывается, поэтому база от прогона
+к прогону не меняется. Лимиты частоты запросов на время прогона снимаются.
+"""
+import math
+import platform
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import django
+from django.db import connection, transaction
+from django.urls import get_resolver
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.diagnostics import track_queries
+from api.v1.authentication import get_token_for_user
+from api.v1.throttling import SlidingWindowThrottle
+from reviews.models import Comment, Review, Title, User
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+CONFIRMATION_CODE = 'bench'
+PERCENTILES = (50, 95, 99)
+ALLOCATION_REQUESTS = 5
+TITLE = '/api/v1/titles/{title}/'
+REVIEW = TITLE + 'reviews/{review}/'
+COMMENT = REVIEW + 'comments/{comment}/'
+
+
+class Scenario:
+    """Запрос к маршруту: кто, каким методом и с какими данными."""
+
+    def __init__(self, name, method, route, client, path, data=None,
+                 status=200):
+        self.name = name
+        self.method = method
+        self.route = route
+        self.client = client
+        self.path = path
+        self.data = data
+        self.status = status
+
+    def __repr__(self):
+        return f'<Scenario {self.name}>'
+
+
+SCENARIOS = (
+    Scenario('GET api-root', 'GET', 'api-root', 'user', '/api/v1/'),
+    Scenario('GET users-list', 'GET', 'users-list', 'admin',
+             '/api/v1/users/'),
+    Scenario('GET users-list ?search', 'GET', 'users-list', 'admin',
+             '/api/v1/users/?search={username}'),
+    Scenario('GET users-detail', 'GET', 'users-detail', 'admin',
+             '/api/v1/users/{username}/'),
+    Scenario('GET users-me', 'GET', 'users-me', 'user', '/api/v1/users/me/'),
+    Scenario('GET genres-list', 'GET', 'genres-list', 'user',
+             '/api/v1/genres/'),
+    Scenario('GET categories-list', 'GET', 'categories-list', 'user',
+             '/api/v1/categories/'),
+    Scenario('GET titles-list', 'GET', 'titles-list', 'user',
+             '/api/v1/titles/'),
+    Scenario('GET titles-list (кэш)', 'GET', 'titles-list', 'anon',
+             '/api/v1/titles/'),
+    Scenario('GET titles-list ?genre&year', 'GET', 'titles-list', 'user',
+             '/api/v1/titles/?genre={genre}&year={year}'),
+    Scenario('GET titles-list ?search', 'GET', 'titles-list', 'user',
+             '/api/v1/titles/?search={search}'),
+    Scenario('GET titles-list ?ids', 'GET', 'titles-list', 'user',
+             '/api/v1/titles/?ids={ids}'),
+    Scenario('GET titles-list последняя страница', 'GET', 'titles-list',
+             'user', '/api/v1/titles/?page={last_page}'),
+    Scenario('GET titles-detail', 'GET', 'titles-detail', 'user', TITLE),
+    Scenario('GET reviews-list', 'GET', 'reviews-list', 'user',
+             TITLE + 'reviews/'),
+    Scenario('GET reviews-list ?cursor', 'GET', 'reviews-list', 'user',
+             TITLE + 'reviews/?cursor='),
+    Scenario('GET reviews-detail', 'GET', 'reviews-detail', 'user', REVIEW),
+    Scenario('GET comments-list', 'GET', 'comments-list', 'user',
+             REVIEW + 'comments/'),
+    Scenario('GET comments-detail', 'GET', 'comments-detail', 'user',
+             COMMENT),
+    Scenario('GET export', 'GET', 'export', 'admin',
+             '/api/v1/export/genre.csv'),
+    Scenario('POST sign_up', 'POST', 'sign_up', 'anon',
+             '/api/v1/auth/signup/',
+             {'username': 'bench_new', 'email': 'bench_new@yamdb.fake'}),
+    Scenario('POST token', 'POST', 'token', 'anon', '/api/v1/auth/token/',
+             {'username': 'bench_user',
+              'confirmation_code': CONFIRMATION_CODE}),
+    Scenario('POST users-list', 'POST', 'users-list', 'admin',
+             '/api/v1/users/',
+             {'username': 'bench_created',
+              'email': 'bench_created@yamdb.fake'}, 201),
+    Scenario('PATCH users-detail', 'PATCH', 'users-detail', 'admin',
+             '/api/v1/users/{username}/', {'bio': 'Обновлено'}),
+    Scenario('DELETE users-detail', 'DELETE', 'users-detail', 'admin',
+             '/api/v1/users/{username}/', status=204),
+    Scenario('PATCH users-me', 'PATCH', 'users-me', 'user',
+             '/api/v1/users/me/', {'bio': 'Обновлено'}),
+    Scenario('POST genres-list', 'POST', 'genres-list', 'admin',
+             '/api/v1/genres/',
+             {'name': 'Новый жанр', 'slug': 'bench-genre'}, 201),
+    Scenario('DELETE genres-detail', 'DELETE', 'genres-detail', 'admin',
+             '/api/v1/genres/{genre}/', status=204),
+    Scenario('POST categories-list', 'POST', 'categories-list', 'admin',
+             '/api/v1/categories/',
+             {'name': 'Новая категория', 'slug': 'bench-category'}, 201),
+    Scenario('DELETE categories-detail', 'DELETE', 'categories-detail',
+             'admin', '/api/v1/categories/{category}/', status=204),
+    Scenario('POST titles-list', 'POST', 'titles-list', 'admin',
+             '/api/v1/titles/',
+             {'name': 'Новое произведение', 'year': 2000,
+              'genre': ['{genre}'], 'category': '{category}'}, 201),
+    Scenario('POST titles-bulk', 'POST', 'titles-bulk', 'admin',
+             '/api/v1/titles/bulk/',
+             [{'name': f'Новое произведение {number}', 'year': 2000,
+               'genre': ['{genre}'], 'category': '{category}'}
+              for number in range(50)], 201),
+    Scenario('PATCH titles-detail', 'PATCH', 'titles-detail', 'admin',
+             TITLE, {'name': 'Обновлено'}),
+    Scenario('DELETE titles-detail', 'DELETE', 'titles-detail', 'admin',
+             TITLE, status=204),
+    Scenario('POST reviews-list', 'POST', 'reviews-list', 'user',
+             TITLE + 'reviews/', {'text': 'Отзыв', 'score': 7}, 201),
+    Scenario('PATCH reviews-detail', 'PATCH', 'reviews-detail', 'admin',
+             REVIEW, {'text': 'Обновлено'}),
+    Scenario('DELETE reviews-detail', 'DELETE', 'reviews-detail', 'admin',
+             REVIEW, status=204),
+    Scenario('POST comments-list', 'POST', 'comments-list', 'user',
+             REVIEW + 'comments/', {'text': 'Комментарий'}, 201),
+    Scenario('PATCH comments-detail', 'PATCH', 'comments-detail', 'admin',
+             COMMENT, {'text': 'Обновлено'}),
+    Scenario('DELETE comments-detail', 'DELETE', 'comments-detail',
+             'admin', COMMENT, status=204),
+)
+
+
+def api_routes():
+    """Имена всех маршрутов api/v1/urls.py."""
+    return {
+        name for name in get_resolver('api.v1.urls').reverse_dict
+        if isinstance(name, str)
+    }
+
+
+def uncovered_routes(scenarios=SCENARIOS):
+    return api_routes() - {scenario.route for scenario in scenarios}
+
+
+def fill(value, context):
+    """Подставляет id и slug из context в адрес или данные сценария."""
+    if isinstance(value, str):
+        return value.format(**context)
+    if isinstance(value, list):
+        return [fill(item, context) for item in value]
+    if isinstance(value, dict):
+        return {key: fill(item, context) for key, item in value.items()}
+    return value
+
+
+def benchmark_context():
+    """Записи, к которым обращаются сценарии, и пользователи прогона."""
+    User.objects.update_or_create(
+        username='bench_admin',
+        defaults={'email': 'bench_admin@yamdb.fake', 'role': User.ADMIN},
+    )
+    User.objects.update_or_create(
+        username='bench_user',
+        defaults={'email': 'bench_user@yamdb.fake',
+                  'confirmation_code': CONFIRMATION_CODE},
+    )
+    title = (Title.objects.select_related('category')
+             .prefetch_related('genre').order_by('id').first())
+    if title is None:
+        raise ValueError('В базе нет произведений: сначала заполните ее.')
+    review = Review.objects.filter(title=title).order_by('id').first()
+    comment = Comment.objects.filter(review=review).order_by('id').first()
+    genre = title.genre.first()
+    return {
+        'title': title.id,
+        'review': review.id if review else 0,
+        'comment': comment.id if comment else 0,
+        'username': 'bench_user',
+        'genre': genre.slug if genre else '',
+        'category': title.category.slug if title.category else '',
+        'year': title.year,
+        'ids': ','.join(map(str, range(title.id + 19, title.id - 1, -1))),
+        'search': title.name.split()[0],
+        'last_page': max(1, math.ceil(Title.objects.count() / 5)),
+    }
+
+
+def make_clients():
+    clients = {'anon': APIClient()}
+    for role, username in (('user', 'bench_user'), ('admin', 'bench_admin')):
+        client = APIClient()
+        token = get_token_for_user(User.objects.get(username=username))
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        clients[role] = client
+    return clients
+
+
+@contextmanager
+def unthrottled():
+    rates = SlidingWindowThrottle.THROTTLE_RATES
+    SlidingWindowThrottle.THROTTLE_RATES = {
+        scope: '1000000/day' for scope in rates
+    }
+    try:
+        yield
+    finally:
+        SlidingWindowThrottle.THROTTLE_RATES = rates
+
+
+def perform(client, scenario, path, data):
+    """Запрос сценария; запись откатывается."""
+    call = getattr(client, scenario.method.lower())
+    if scenario.method in SAFE_METHODS:
+        response = call(path)
+    else:
+        with transaction.atomic():
+            response = call(path, data, format='json')
+            transaction.set_rollback(True)
+    if response.streaming:
+        b''.join(response.streaming_content)
+    return response.status_code
+
+
+def percentile(values, percent):
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[percent - 1]
+
+
+def run_scenario(scenario, client, context, requests, warmup):
+    path = fill(scenario.path, context)
+    data = fill(scenario.data, context)
+    for _ in range(warmup):
+        perform(client, scenario, path, data)
+    latencies, queries, statuses = [], [], {}
+    for _ in range(requests):
+        with track_queries() as log:
+            started = time.perf_counter()
+            status = perform(client, scenario, path, data)
+            latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(log.count)
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    allocations = []
+    tracemalloc.start()
+    try:
+        for _ in range(min(requests, ALLOCATION_REQUESTS)):
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            perform(client, scenario, path, data)
+            _, peak = tracemalloc.get_traced_memory()
+            allocations.append((peak - current) / 1024)
+    finally:
+        tracemalloc.stop()
+
+    result = {
+        'route': scenario.route,
+        'method': scenario.method,
+        'requests': requests,
+        'mean_ms': statistics.fmean(latencies),
+        'queries': max(queries),
+        'alloc_peak_kib': statistics.median(allocations),
+        'statuses': statuses,
+        'errors': requests - statuses.get(str(scenario.status), 0),
+    }
+    for percent in PERCENTILES:
+        result[f'p{percent}_ms'] = percentile(latencies, percent)
+    return result
+
+
+def run_benchmark(scenarios=SCENARIOS, requests=50, warmup=3):
+    """Прогон сценариев на текущей базе: словарь для JSON."""
+    context = benchmark_context()
+    clients = make_clients()
+    with unthrottled():
+        results = {
+            scenario.name: run_scenario(
+                scenario, clients[scenario.client], context,
+                requests, warmup,
+            )
+            for scenario in scenarios
+        }
+    return {
+        'meta': {
+            'created': timezone.now().isoformat(),
+            'dataset': {
+                'titles': Title.objects.count(),
+                'reviews': Review.objects.count(),
+                'comments': Comment.objects.count(),
+            },
+            'requests': requests,
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+        },
+        'scenarios': results,
+    }
+
+
+def change(new, old):
+    """Изменение в процентах; None, если сравнивать не с чем."""
+    if not old:
+        return None
+    return (new - old) / old * 100
+
+
+def compare(results, baseline, threshold=10.0):
+    """
+    Сравнение с сохраненным прогоном. Регрессия - рост p95 больше чем
+    на threshold процентов или больше запросов к БД.
+    Возвращает строки [{scenario, изменения, regression}].
+    """
+    rows = []
+    for name, current in results['scenarios'].items():
+        old = baseline['scenarios'].get(name)
+        if old is None:
+            rows.append({'scenario': name, 'new': True, 'regression': False})
+            continue
+        row = {
+            'scenario': name,
+            'new': False,
+            'queries': current['queries'] - old['queries'],
+            'alloc_peak_kib': change(
+                current['alloc_peak_kib'], old['alloc_peak_kib']
+            ),
+        }
+        for percent in PERCENTILES:
+            key = f'p{percent}_ms'
+            row[key] = change(current[key], old[key])
+        row['regression'] = (
+            row['queries'] > 0
+            or row['p95_ms'] is not None and row['p95_ms'] > threshold
+        )
+        rows.append(row)
+    return rows
@@ -0,0 +1,38 @@
+"""Проверки настроек кэшей API (см. reviews.checks)."""
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+from reviews.checks import process_local_cache_errors
+
+
+@register(Tags.caches)
+def check_response_cache(app_configs, **kwargs):
+    return process_local_cache_errors(['RESPONSE_CACHE'], 'api.E001')
+
+
+# Кэши, в которых add и incr атомарны для всех процессов сервера.
+ATOMIC_COUNTER_BACKENDS = (
+    'api_yamdb.cache.AtomicFileBasedCache',
+    'django.core.cache.backends.memcached.MemcachedCache',
+    'django.core.cache.backends.memcached.PyLibMCCache',
+    'django.core.cache.backends.memcached.PyMemcacheCache',
+    'django_redis.cache.RedisCache',
+)
+
+
+@register(Tags.caches)
+def check_throttle_cache(app_configs, **kwargs):
+    """
+    Счетчикам ограничения частоты запросов нужен атомарный incr: иначе
+    одновременные запросы теряют увеличения и проходят сверх лимита.
+    """
+    alias = settings.THROTTLE_CACHE
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if backend in ATOMIC_COUNTER_BACKENDS:
+        return []
+    return [Error(
+        f'THROTTLE_CACHE указывает на кэш {alias!r} ({backend}) без '
+        f'атомарного incr для всех процессов сервера.',
+        hint='Укажите один из кэшей: ' + ', '.join(ATOMIC_COUNTER_BACKENDS),
+        id='api.E002',
+    )]
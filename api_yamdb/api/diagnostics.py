@@ -0,0 +1,143 @@
+"""
+Диагностика запросов к БД для каждого запроса к API.
+
+Выключена по умолчанию (DB_DIAGNOSTICS): заголовки раскрывают устройство
+сервиса, а поиск места вызова медленного запроса стоит времени. Включенная
+DiagnosticsMiddleware:
+1. Добавляет к ответу X-DB-Query-Count, X-DB-Time-ms и Server-Timing
+   (время БД и всего запроса, видно в инструментах разработчика браузера).
+2. Пишет в лог api.diagnostics запросы дольше DB_SLOW_QUERY_MS: SQL,
+   длительность, view и сериализатор, из которых запрос выполнен.
+3. Считает похожие запросы (одинаковый SQL с точностью до значений).
+   Если такой запрос повторился DB_REPEATED_QUERY_THRESHOLD раз и больше,
+   это вероятная проблема N+1: запрос пишется в лог, число таких групп -
+   в заголовок X-DB-Repeated-Queries.
+Запросы записывает в журнал текущего запроса (query_log) общая с метриками
+обертка api.queries.record_query.
+"""
+import logging
+import re
+import sys
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from rest_framework.serializers import BaseSerializer
+from rest_framework.views import APIView
+
+from api.queries import query_log
+from api_yamdb.middleware import WrappingMiddleware
+
+logger = logging.getLogger('api.diagnostics')
+
+# Значения в SQL и списки параметров IN (...) разной длины.
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+PARAM_LISTS = re.compile(r'\((?:\s*(?:%s|\?)\s*,)*\s*(?:%s|\?)\s*\)')
+
+
+def normalize_sql(sql):
+    """SQL без значений: похожие запросы дают одну строку."""
+    return PARAM_LISTS.sub('(...)', LITERALS.sub('?', sql))
+
+
+def find_origin():
+    """View и сериализатор, из которых выполняется запрос."""
+    view = serializer = None
+    frame = sys._getframe(2)
+    while frame is not None and view is None:
+        owner = frame.f_locals.get('self')
+        if serializer is None and isinstance(owner, BaseSerializer):
+            serializer = type(owner).__name__
+        elif isinstance(owner, APIView):
+            action = getattr(owner, 'action', None)
+            view = type(owner).__name__ + (f'.{action}' if action else '')
+        frame = frame.f_back
+    return view, serializer
+
+
+class QueryLog:
+    """Запросы к БД одного запроса к API."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        # Похожий SQL -> [число, время, (view, сериализатор)].
+        self.groups = {}
+
+    def add(self, sql, seconds):
+        self.count += 1
+        self.seconds += seconds
+        key = normalize_sql(sql)
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = [0, 0.0, None]
+        group[0] += 1
+        group[1] += seconds
+        slow = seconds * 1000 >= settings.DB_SLOW_QUERY_MS
+        if slow or group[2] is None and group[0] > 1:
+            # Место вызова ищется только для медленного или повторного
+            # запроса: обход стека дороже самого учета.
+            group[2] = find_origin()
+        if slow:
+            view, serializer = group[2]
+            logger.warning(
+                'Медленный запрос %.1f мс, view %s, сериализатор %s: %s',
+                seconds * 1000, view, serializer, sql,
+            )
+
+    def repeated(self):
+        """Группы похожих запросов, повторившихся подозрительно часто."""
+        return [
+            (sql, count, seconds, origin or (None, None))
+            for sql, (count, seconds, origin) in self.groups.items()
+            if count >= settings.DB_REPEATED_QUERY_THRESHOLD
+        ]
+
+
+@contextmanager
+def track_queries():
+    """Журнал запросов к БД внутри блока with, в том числе вне API."""
+    log = QueryLog()
+    token = query_log.set(log)
+    try:
+        yield log
+    finally:
+        query_log.reset(token)
+
+
+class DiagnosticsMiddleware(WrappingMiddleware):
+    def handle(self, request):
+        if not settings.DB_DIAGNOSTICS:
+            return self.get_response(request)
+        started = time.perf_counter()
+        with track_queries() as log:
+            response = self.get_response(request)
+        return self.report(request, response, log, started)
+
+    async def ahandle(self, request):
+        if not settings.DB_DIAGNOSTICS:
+            return await self.get_response(request)
+        started = time.perf_counter()
+        with track_queries() as log:
+            response = await self.get_response(request)
+        return self.report(request, response, log, started)
+
+    def report(self, request, response, log, started):
+        total_ms = (time.perf_counter() - started) * 1000
+        db_ms = log.seconds * 1000
+        repeated = log.repeated()
+        for sql, count, seconds, (view, serializer) in repeated:
+            logger.warning(
+                'Вероятно N+1: %d похожих запросов (%.1f мс) в %s %s, '
+                'view %s, сериализатор %s: %s',
+                count, seconds * 1000, request.method, request.path,
+                view, serializer, sql,
+            )
+        response['X-DB-Query-Count'] = str(log.count)
+        response['X-DB-Time-ms'] = f'{db_ms:.1f}'
+        response['X-DB-Repeated-Queries'] = str(len(repeated))
+        response['Server-Timing'] = (
+            f'db;dur={db_ms:.1f};desc="{log.count} queries", '
+            f'total;dur={total_ms:.1f}'
+        )
+        return response
@@ -0,0 +1,159 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from api.benchmark import SCENARIOS, compare, run_benchmark, uncovered_routes
+from reviews.seed import seed_catalog
+
+
+def percent(value):
+    return '   нов.' if value is None else f'{value:+6.1f}%'
+
+
+class Command(BaseCommand):
+    help = (
+        'Бенчмарк всех маршрутов API: p50/p95/p99, запросы к БД и память '
+        'на запрос. База заполняется каталогом заданного объема, запись '
+        'откатывается. С --baseline сравнивает с сохраненным прогоном.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=10000,
+                            help='Произведений в тестовой базе.')
+        parser.add_argument('--reviews-per-title', type=int, default=3,
+                            help='Отзывов на произведение.')
+        parser.add_argument('--comments-per-review', type=int, default=2,
+                            help='Комментариев к отзыву.')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Seed генератора данных.')
+        parser.add_argument('--requests', type=int, default=50,
+                            help='Замеряемых запросов на сценарий.')
+        parser.add_argument('--warmup', type=int, default=3,
+                            help='Запросов прогрева на сценарий.')
+        parser.add_argument(
+            '--scenario', action='append', dest='scenarios',
+            help='Только сценарии, имя которых содержит строку '
+                 '(можно повторять).'
+        )
+        parser.add_argument(
+            '--database',
+            help='Файл SQLite: если есть - используется как есть, если нет '
+                 '- создается и заполняется. Без параметра база временная.'
+        )
+        parser.add_argument('--output', help='Записать результаты в JSON.')
+        parser.add_argument('--baseline',
+                            help='JSON прошлого прогона для сравнения.')
+        parser.add_argument(
+            '--threshold', type=float, default=10.0,
+            help='Допустимый рост p95 в процентах при сравнении.'
+        )
+
+    def use_database(self, path):
+        connections.close_all()
+        settings.DATABASES['default']['NAME'] = str(path)
+        connections['default'].settings_dict['NAME'] = str(path)
+
+    def prepare(self, path, options):
+        exists = path.exists()
+        self.use_database(path)
+        if exists:
+            return
+        call_command('migrate', verbosity=0)
+        counts = seed_catalog(
+            options['titles'], options['reviews_per_title'],
+            options['comments_per_review'], options['seed'],
+        )
+        self.stdout.write('Создано: ' + ', '.join(
+            f'{model.__name__} {count}' for model, count in counts.items()
+        ))
+
+    def select(self, names):
+        if not names:
+            missing = uncovered_routes()
+            if missing:
+                self.stderr.write(
+                    'Маршруты без сценария: ' + ', '.join(sorted(missing))
+                )
+            return SCENARIOS
+        scenarios = tuple(
+            scenario for scenario in SCENARIOS
+            if any(name in scenario.name for name in names)
+        )
+        if not scenarios:
+            raise CommandError('Нет сценариев с такими именами.')
+        return scenarios
+
+    def report(self, results):
+        self.stdout.write(
+            f'{"сценарий":40} {"p50":>8} {"p95":>8} {"p99":>8} '
+            f'{"БД":>4} {"КиБ":>8}'
+        )
+        for name, result in results['scenarios'].items():
+            self.stdout.write(
+                f'{name:40} {result["p50_ms"]:8.2f} {result["p95_ms"]:8.2f} '
+                f'{result["p99_ms"]:8.2f} {result["queries"]:4} '
+                f'{result["alloc_peak_kib"]:8.1f}'
+            )
+            if result['errors']:
+                self.stderr.write(
+                    f'  неожиданные статусы: {result["statuses"]}'
+                )
+
+    def report_comparison(self, rows, baseline, results):
+        if baseline['meta']['dataset'] != results['meta']['dataset']:
+            self.stderr.write(
+                'Базовый прогон сделан на другом объеме данных: '
+                f'{baseline["meta"]["dataset"]}.'
+            )
+        self.stdout.write(
+            f'{"сценарий":40} {"p50":>7} {"p95":>7} {"p99":>7} '
+            f'{"БД":>4} {"память":>7}'
+        )
+        for row in rows:
+            if row['new']:
+                self.stdout.write(f'{row["scenario"]:40} нет в базовом')
+                continue
+            self.stdout.write(
+                f'{row["scenario"]:40} {percent(row["p50_ms"])} '
+                f'{percent(row["p95_ms"])} {percent(row["p99_ms"])} '
+                f'{row["queries"]:+4} {percent(row["alloc_peak_kib"])}'
+                + ('  РЕГРЕССИЯ' if row['regression'] else '')
+            )
+
+    def handle(self, *args, **options):
+        scenarios = self.select(options['scenarios'])
+        baseline = None
+        if options['baseline']:
+            baseline = json.loads(Path(options['baseline']).read_text())
+        old_name = settings.DATABASES['default']['NAME']
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                path = Path(
+                    options['database'] or Path(tmp) / 'benchmark.sqlite3'
+                )
+                self.prepare(path, options)
+                results = run_benchmark(
+                    scenarios, options['requests'], options['warmup']
+                )
+        finally:
+            self.use_database(old_name)
+
+        self.report(results)
+        if options['output']:
+            Path(options['output']).write_text(
+                json.dumps(results, ensure_ascii=False, indent=2)
+            )
+        if baseline is None:
+            return
+        rows = compare(results, baseline, options['threshold'])
+        self.report_comparison(rows, baseline, results)
+        regressions = [row['scenario'] for row in rows if row['regression']]
+        if regressions:
+            raise CommandError(
+                'Регрессии производительности: ' + ', '.join(regressions)
+            )
@@ -0,0 +1,112 @@
+import re
+
+from django.core.management.base import BaseCommand
+from django.http import Http404
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.v1.views import (CategoryViewSet, CommentViewSet, GenreViewSet,
+                          ReviewViewSet, TitleViewSet)
+from reviews.models import Category, Genre, Review, Title
+
+FULL_SCAN = re.compile(r'\bSCAN (TABLE )?\w+$')
+# Чтение всего индекса, например COUNT(*) без фильтров.
+INDEX_SCAN = re.compile(r'\bSCAN (TABLE )?\w+ USING (COVERING )?INDEX')
+
+
+class Command(BaseCommand):
+    help = (
+        'Печатает EXPLAIN QUERY PLAN для запросов страниц и подсчета строк '
+        'списков каждого viewset и отмечает полные просмотры таблиц '
+        'и индексов.'
+    )
+
+    def get_cases(self):
+        """
+        Запросы списков в том виде, в каком их строят viewsets.
+        Значения фильтров берутся из первых записей в базе.
+        """
+        title = Title.objects.order_by('id').first()
+        review = Review.objects.order_by('id').first()
+        category = Category.objects.order_by('id').first()
+        genre = Genre.objects.order_by('id').first()
+        title_id = title.id if title else 0
+        review_id = review.id if review else 0
+        review_title_id = review.title_id if review else 0
+        return (
+            ('titles', TitleViewSet, {}, {}),
+            ('titles?category&year', TitleViewSet, {}, {
+                'category': category.slug if category else '',
+                'year': title.year if title else 0,
+            }),
+            ('titles?genre', TitleViewSet, {}, {
+                'genre': genre.slug if genre else '',
+            }),
+            ('titles?name', TitleViewSet, {}, {
+                'name': title.name if title else '',
+            }),
+            ('genres', GenreViewSet, {}, {}),
+            ('categories', CategoryViewSet, {}, {}),
+            ('reviews', ReviewViewSet, {'title_id': title_id}, {}),
+            ('comments', CommentViewSet,
+             {'title_id': review_title_id, 'review_id': review_id}, {}),
+        )
+
+    def get_list_queryset(self, viewset_class, kwargs, params):
+        """Запрос списка и размер страницы."""
+        factory = APIRequestFactory()
+        view = viewset_class(action='list', kwargs=kwargs, format_kwarg=None)
+        view.request = Request(factory.get('/', params))
+        queryset = view.filter_queryset(view.get_queryset())
+        return queryset, view.paginator.get_page_size(view.request)
+
+    def explain(self, queryset, limited):
+        """
+        Печатает план запроса; возвращает число полных просмотров таблиц
+        и индексов. limited - запрос останавливается на LIMIT страницы.
+        """
+        full_scans = index_scans = 0
+        for line in queryset.explain().splitlines():
+            # В SQLite полный просмотр выглядит как `SCAN <таблица>`
+            # без указания индекса.
+            if FULL_SCAN.search(line):
+                if limited:
+                    # Список без фильтров читается по первичному ключу
+                    # и останавливается на LIMIT страницы.
+                    line = f'{line}  <- просмотр по id до LIMIT'
+                else:
+                    full_scans += 1
+                    line = self.style.WARNING(f'{line}  <- полный просмотр')
+            elif INDEX_SCAN.search(line) and not limited:
+                index_scans += 1
+                line = self.style.WARNING(
+                    f'{line}  <- просмотр всего индекса'
+                )
+            self.stdout.write(f'    {line}')
+        return full_scans, index_scans
+
+    def handle(self, *args, **options):
+        full_scans = index_scans = 0
+        for name, viewset_class, kwargs, params in self.get_cases():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            try:
+                queryset, page_size = self.get_list_queryset(
+                    viewset_class, kwargs, params
+                )
+            except Http404:
+                self.stdout.write('  нет данных для построения запроса')
+                continue
+            # Пагинатор еще и считает все строки списка (COUNT(*)): этот
+            # запрос LIMIT страницы не останавливает.
+            for title, explained, limited in (
+                    ('страница', queryset[:page_size],
+                     not kwargs and not params),
+                    ('COUNT(*) для пагинации', queryset.order_by()
+                     .values('pk'), False),
+            ):
+                self.stdout.write(f'  {title}:')
+                full, index = self.explain(explained, limited)
+                full_scans += full
+                index_scans += index
+        self.stdout.write(f'Полных просмотров таблиц: {full_scans}')
+        self.stdout.write(f'Просмотров всего индекса: {index_scans}')
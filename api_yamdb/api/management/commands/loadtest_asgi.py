@@ -0,0 +1,247 @@
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from api.v1.authentication import get_token_for_user
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleGenre, User)
+
+MODES = (
+    ('sync', 'Синхронные view:'),
+    ('async', 'Асинхронные view:'),
+)
+
+
+def read_paths(titles, reviews):
+    """Адреса чтения: списки и карточки произведений, жанры, категории,
+    отзывы и комментарии."""
+    paths = [
+        '/api/v1/titles/',
+        '/api/v1/titles/?page=2',
+        '/api/v1/genres/',
+        '/api/v1/categories/',
+    ]
+    paths += [f'/api/v1/titles/{pk}/' for pk in range(1, titles + 1, 10)]
+    paths += [f'/api/v1/titles/{pk}/reviews/' for pk in range(1, 11)]
+    paths += [
+        f'/api/v1/titles/1/reviews/{pk}/comments/'
+        for pk in range(1, reviews + 1)
+    ]
+    return paths
+
+
+def simulate_latency(seconds):
+    """Задержка каждого запроса к БД, как до сервера БД по сети."""
+    def delay(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def add_delay(sender, connection, **kwargs):
+        if delay not in connection.execute_wrappers:
+            connection.execute_wrappers.append(delay)
+
+    connection_created.connect(add_delay, weak=False)
+
+
+async def call_asgi(application, path, token):
+    """GET-запрос к ASGI-приложению без сервера; возвращает статус."""
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [
+            (b'host', b'testserver'),
+            (b'authorization', f'Bearer {token}'.encode()),
+        ],
+        'client': ('127.0.0.1', 0),
+        'server': ('testserver', 80),
+    }
+    status = None
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    await application(scope, receive, send)
+    return status
+
+
+async def run_clients(application, paths, token, concurrency, seconds):
+    latencies, errors = [], 0
+    deadline = time.monotonic() + seconds
+
+    async def client(rng):
+        nonlocal errors
+        while time.monotonic() < deadline:
+            started = time.monotonic()
+            status = await call_asgi(application, rng.choice(paths), token)
+            if status != 200:
+                errors += 1
+            latencies.append(time.monotonic() - started)
+
+    await asyncio.gather(*(
+        client(random.Random(number)) for number in range(concurrency)
+    ))
+    return latencies, errors
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест чтения каталога под ASGI: запросы в секунду '
+        'и p99 с синхронными и асинхронными view (ASYNC_READ_VIEWS). '
+        'Запросы идут в ASGI-приложение в процессе, без сервера, '
+        'к временной базе; рабочая база не меняется.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=50,
+                            help='Одновременных клиентов.')
+        parser.add_argument('--seconds', type=float, default=5.0,
+                            help='Длительность каждого прогона.')
+        parser.add_argument('--titles', type=int, default=200,
+                            help='Произведений в тестовой базе.')
+        parser.add_argument('--reviews', type=int, default=20,
+                            help='Отзывов на произведение.')
+        parser.add_argument(
+            '--db-latency', type=float, default=0.0,
+            help='Задержка каждого запроса к БД в мс: SQLite в процессе '
+                 'не ждет сети, как сервер БД.'
+        )
+        # Служебные параметры прогона в отдельном процессе.
+        parser.add_argument('--run-database', help='Не задавать вручную.')
+        parser.add_argument('--run-token', help='Не задавать вручную.')
+
+    def use_database(self, path):
+        connections.close_all()
+        settings.DATABASES['default']['NAME'] = str(path)
+        connections['default'].settings_dict['NAME'] = str(path)
+
+    def seed(self, titles, reviews):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        Genre.objects.bulk_create(
+            Genre(name=f'Жанр {number}', slug=f'genre-{number}')
+            for number in range(10)
+        )
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {number}', year=1900 + number % 120,
+                  description='Описание', category=category)
+            for number in range(titles)
+        )
+        TitleGenre.objects.bulk_create(
+            TitleGenre(title_id=pk, genre_id=pk % 10 + 1)
+            for pk in range(1, titles + 1)
+        )
+        User.objects.bulk_create(
+            User(username=f'reader{number}', email=f'reader{number}@ya.ru')
+            for number in range(reviews)
+        )
+        authors = list(User.objects.order_by('id'))
+        Review.objects.bulk_create(
+            Review(title_id=pk, author=author, text='Отзыв', score=8)
+            for pk in range(1, min(titles, 10) + 1) for author in authors
+        )
+        Comment.objects.bulk_create(
+            Comment(review_id=pk, author=authors[0], text='Комментарий')
+            for pk in range(1, reviews + 1) for _ in range(10)
+        )
+        return str(get_token_for_user(authors[0]))
+
+    def run_mode(self, mode, database, token, options):
+        """Прогон в отдельном процессе: URLconf с нужными view."""
+        env = dict(os.environ, ASYNC_READ_VIEWS=str(int(mode == 'async')))
+        result = subprocess.run(
+            [
+                sys.executable, str(settings.BASE_DIR / 'manage.py'),
+                'loadtest_asgi', '--run-database', str(database),
+                '--run-token', token,
+                '--concurrency', str(options['concurrency']),
+                '--seconds', str(options['seconds']),
+                '--titles', str(options['titles']),
+                '--reviews', str(options['reviews']),
+                '--db-latency', str(options['db_latency']),
+            ],
+            env=env, capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise CommandError(result.stderr)
+        return json.loads(result.stdout)
+
+    def run(self, options):
+        from django.core.asgi import get_asgi_application
+
+        self.use_database(options['run_database'])
+        if options['db_latency']:
+            simulate_latency(options['db_latency'] / 1000)
+        application = get_asgi_application()
+        paths = read_paths(options['titles'], options['reviews'])
+        # Прогрев: соединения, кэш токенов, версии ресурсов.
+        asyncio.run(run_clients(
+            application, paths, options['run_token'],
+            options['concurrency'], 0.5,
+        ))
+        latencies, errors = asyncio.run(run_clients(
+            application, paths, options['run_token'],
+            options['concurrency'], options['seconds'],
+        ))
+        self.stdout.write(json.dumps({
+            'async': settings.ASYNC_READ_VIEWS,
+            'latencies': latencies,
+            'errors': errors,
+        }))
+
+    def report(self, title, result, seconds):
+        latencies = result['latencies']
+        quantiles = (statistics.quantiles(latencies, n=100)
+                     if len(latencies) > 1 else [0.0] * 99)
+        self.stdout.write(title)
+        self.stdout.write(
+            f'  {len(latencies) / seconds:.0f} запр/с, '
+            f'p50 {quantiles[49] * 1000:.1f} мс, '
+            f'p99 {quantiles[98] * 1000:.1f} мс, '
+            f'ошибок {result["errors"]}'
+        )
+
+    def handle(self, *args, **options):
+        if options['run_database']:
+            return self.run(options)
+        old_name = settings.DATABASES['default']['NAME']
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                database = Path(tmp) / 'loadtest.sqlite3'
+                self.use_database(database)
+                call_command('migrate', verbosity=0)
+                token = self.seed(options['titles'], options['reviews'])
+                connections.close_all()
+                for mode, title in MODES:
+                    result = self.run_mode(mode, database, token, options)
+                    if result['async'] != (mode == 'async'):
+                        raise CommandError(
+                            'ASYNC_READ_VIEWS не совпадает с режимом прогона.'
+                        )
+                    self.report(title, result, options['seconds'])
+        finally:
+            self.use_database(old_name)
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from api.v1.response_cache import get_stats, reset_stats
+
+
+class Command(BaseCommand):
+    help = 'Печатает счетчики попаданий и промахов кэша ответов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Обнулить счетчики после вывода.'
+        )
+
+    def handle(self, *args, **options):
+        stats = get_stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total if total else 0.0
+        self.stdout.write(
+            f'попаданий {stats["hits"]}, промахов {stats["misses"]}, '
+            f'доля попаданий {ratio:.1%}'
+        )
+        if options['reset']:
+            reset_stats()
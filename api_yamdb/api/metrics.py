@@ -0,0 +1,232 @@
+"""
+Метрики запросов в формате Prometheus.
+
+MetricsMiddleware считает для каждого маршрута (имя URL: titles-list,
+reviews-detail, sign_up, ...) запросы по методу и статусу, гистограмму
+времени ответа, число запросов к БД и их суммарное время. Запросы к БД
+считает общая с диагностикой обертка api.queries.record_query: она
+добавляет время к счетчикам текущего запроса (query_stats), в том числе
+из потоков асинхронных view.
+
+Счетчики копятся в памяти процесса, без обращений к общему хранилищу
+на каждый запрос. Раз в METRICS_FLUSH_SECONDS процесс записывает снимок
+своих счетчиков в кэш METRICS_CACHE, и /metrics суммирует снимки всех
+процессов. Снимок процесса, который перестал работать, хранится
+METRICS_PROCESS_TIMEOUT секунд.
+"""
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from rest_framework.views import APIView
+
+from api.queries import query_stats
+from api.v1.permissions import AdminOnlyPermission
+from api_yamdb.middleware import WrappingMiddleware
+
+SNAPSHOT_KEY = 'metrics:process:{}'
+PROCESSES_KEY = 'metrics:processes'
+UNMATCHED_ROUTE = 'unmatched'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Registry:
+    """Счетчики процесса и их снимки в общем кэше."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.process = uuid.uuid4().hex
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.requests = Counter()
+            # Маршрут -> [корзины гистограммы..., +Inf, сумма времени,
+            # запросов к БД, время БД].
+            self.routes = {}
+            self.flushed_at = time.monotonic()
+
+    def observe(self, route, method, status, seconds, queries, db_seconds):
+        buckets = settings.METRICS_BUCKETS
+        with self.lock:
+            self.requests[(route, method, status)] += 1
+            stats = self.routes.get(route)
+            if stats is None:
+                stats = self.routes[route] = [0] * (len(buckets) + 1) + [
+                    0.0, 0, 0.0]
+            stats[bisect_left(buckets, seconds)] += 1
+            stats[-3] += seconds
+            stats[-2] += queries
+            stats[-1] += db_seconds
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'requests': dict(self.requests),
+                'routes': {
+                    route: list(stats) for route, stats in self.routes.items()
+                },
+            }
+
+    def flush_due(self):
+        return (time.monotonic() - self.flushed_at
+                >= settings.METRICS_FLUSH_SECONDS)
+
+    def flush(self):
+        """Записывает снимок счетчиков процесса в общий кэш."""
+        self.flushed_at = time.monotonic()
+        cache = caches[settings.METRICS_CACHE]
+        cache.set(
+            SNAPSHOT_KEY.format(self.process), self.snapshot(),
+            settings.METRICS_PROCESS_TIMEOUT,
+        )
+        processes = cache.get(PROCESSES_KEY) or set()
+        if self.process not in processes:
+            # Запись списка не атомарна: процесс, чей номер потерялся
+            # при одновременной записи, добавит его при следующем сбросе.
+            cache.set(PROCESSES_KEY, processes | {self.process}, None)
+
+    def collect(self):
+        """Сумма снимков всех процессов."""
+        self.flush()
+        cache = caches[settings.METRICS_CACHE]
+        processes = cache.get(PROCESSES_KEY) or set()
+        snapshots = cache.get_many(
+            [SNAPSHOT_KEY.format(process) for process in processes]
+        )
+        if len(snapshots) < len(processes):
+            # Снимки остановленных процессов истекли.
+            alive = {key.rsplit(':', 1)[1] for key in snapshots}
+            cache.set(PROCESSES_KEY, alive, None)
+        requests, routes = Counter(), {}
+        for snapshot in snapshots.values():
+            requests.update(snapshot['requests'])
+            for route, stats in snapshot['routes'].items():
+                total = routes.setdefault(route, [0] * len(stats))
+                for index, value in enumerate(stats):
+                    total[index] += value
+        return len(snapshots), requests, routes
+
+
+registry = Registry()
+
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None or not match.url_name:
+        return UNMATCHED_ROUTE
+    return match.url_name
+
+
+class MetricsMiddleware(WrappingMiddleware):
+    def handle(self, request):
+        token = query_stats.set([0, 0.0])
+        stats = query_stats.get()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            query_stats.reset(token)
+        self.observe(request, response, started, stats)
+        return response
+
+    async def ahandle(self, request):
+        token = query_stats.set([0, 0.0])
+        stats = query_stats.get()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            query_stats.reset(token)
+        self.observe(request, response, started, stats)
+        return response
+
+    def observe(self, request, response, started, stats):
+        registry.observe(
+            route_name(request), request.method, str(response.status_code),
+            time.perf_counter() - started, *stats,
+        )
+        if registry.flush_due():
+            registry.flush()
+
+
+def escape(value):
+    return (value.replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+def labels(**values):
+    return '{' + ','.join(
+        f'{name}="{escape(str(value))}"' for name, value in values.items()
+    ) + '}'
+
+
+def render_metrics(processes, requests, routes):
+    """Счетчики в текстовом формате Prometheus."""
+    buckets = [str(bound) for bound in settings.METRICS_BUCKETS] + ['+Inf']
+    lines = [
+        '# HELP yamdb_metrics_processes Процессов, приславших счетчики.',
+        '# TYPE yamdb_metrics_processes gauge',
+        f'yamdb_metrics_processes {processes}',
+        '# HELP yamdb_http_requests_total Запросов по маршруту и статусу.',
+        '# TYPE yamdb_http_requests_total counter',
+    ]
+    for (route, method, status), count in sorted(requests.items()):
+        lines.append(
+            'yamdb_http_requests_total'
+            f'{labels(route=route, method=method, status=status)} {count}'
+        )
+    lines += [
+        '# HELP yamdb_http_request_duration_seconds Время ответа.',
+        '# TYPE yamdb_http_request_duration_seconds histogram',
+    ]
+    for route, stats in sorted(routes.items()):
+        cumulative = 0
+        for bound, count in zip(buckets, stats):
+            cumulative += count
+            lines.append(
+                'yamdb_http_request_duration_seconds_bucket'
+                f'{labels(route=route, le=bound)} {cumulative}'
+            )
+        lines += [
+            'yamdb_http_request_duration_seconds_sum'
+            f'{labels(route=route)} {stats[-3]}',
+            'yamdb_http_request_duration_seconds_count'
+            f'{labels(route=route)} {cumulative}',
+        ]
+    lines += [
+        '# HELP yamdb_db_queries_total Запросов к БД.',
+        '# TYPE yamdb_db_queries_total counter',
+    ]
+    lines += [
+        f'yamdb_db_queries_total{labels(route=route)} {stats[-2]}'
+        for route, stats in sorted(routes.items())
+    ]
+    lines += [
+        '# HELP yamdb_db_query_duration_seconds_total Время запросов к БД.',
+        '# TYPE yamdb_db_query_duration_seconds_total counter',
+    ]
+    lines += [
+        f'yamdb_db_query_duration_seconds_total{labels(route=route)} '
+        f'{stats[-1]}'
+        for route, stats in sorted(routes.items())
+    ]
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsView(APIView):
+    """
+    Метрики всех процессов в формате Prometheus. Только для админа.
+    /metrics
+    """
+    permission_classes = [AdminOnlyPermission]
+
+    def get(self, request):
+        return HttpResponse(
+            render_metrics(*registry.collect()), content_type=CONTENT_TYPE
+        )
@@ -0,0 +1,38 @@
+"""
+Учет запросов к БД для метрик (api.metrics) и диагностики (api.diagnostics).
+
+Обертка record_query ставится на каждое соединение одна (ApiConfig.ready):
+она замеряет запрос один раз и передает время всем, кто ведет учет
+в текущем запросе к API, - счетчикам метрик (query_stats) и журналу
+диагностики (query_log). Если учет не ведется, запрос выполняется сразу,
+без замера.
+"""
+import time
+from contextvars import ContextVar
+
+# [число запросов, время в секундах] к БД в текущем запросе.
+query_stats = ContextVar('query_stats', default=None)
+# Журнал запросов диагностики (api.diagnostics.QueryLog).
+query_log = ContextVar('query_log', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    stats = query_stats.get()
+    log = query_log.get()
+    if stats is None and log is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        seconds = time.perf_counter() - started
+        if stats is not None:
+            stats[0] += 1
+            stats[1] += seconds
+        if log is not None:
+            log.add(sql, seconds)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
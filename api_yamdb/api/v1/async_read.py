@@ -0,0 +1,121 @@
+"""
+Асинхронное чтение каталога под ASGI.
+
+Под ASGI Django 3.2 выполняет синхронные view через
+sync_to_async(thread_sensitive=True): все запросы процесса по очереди
+проходят через один поток, и медленный запрос к БД задерживает остальные.
+AsyncReadMixin отдает чтение (list, retrieve) асинхронной view:
+1. Проверка прав, ETag (ConditionalGetMixin) и сериализация выполняются
+   в цикле событий.
+2. Запросы к БД выполняются в пуле потоков (database_sync_to_async),
+   параллельно для разных запросов. Туда же уходят обращения к кэшу
+   (версии ресурсов, кэш ответов; cache_sync_to_async): у файлового кэша
+   это чтение и запись файлов, у Redis и Memcached - запросы по сети.
+Асинхронного ORM (aget, acount, async for) в Django 3.2 нет, в 4.1 он
+устроен так же: синхронный запрос в отдельном потоке. Запись остается
+синхронной. Асинхронные view включает ASYNC_READ_VIEWS (asgi.py включает
+настройку по умолчанию), под WSGI view синхронные.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from rest_framework.response import Response
+
+
+def database_sync_to_async(func):
+    """
+    Выполняет func в пуле потоков. Соединения с БД потока закрываются
+    так же, как в начале и в конце синхронного запроса.
+    """
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False)
+
+
+def cache_sync_to_async(func):
+    """Выполняет func, которая обращается к кэшу, в пуле потоков."""
+    return sync_to_async(func, thread_sensitive=False)
+
+
+class AsyncReadMixin:
+    """
+    Асинхронные действия чтения для ViewSet: для действия из async_actions
+    вызывается a<действие>, остальные выполняет синхронная view.
+    """
+    async_actions = ('list',)
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        if not settings.ASYNC_READ_VIEWS:
+            return view
+        return cls.as_async_view(view)
+
+    @classmethod
+    def as_async_view(cls, view):
+        actions = view.actions
+        if 'get' in actions and 'head' not in actions:
+            actions['head'] = actions['get']
+        sync_view = sync_to_async(view, thread_sensitive=True)
+
+        async def async_view(request, *args, **kwargs):
+            if actions.get(request.method.lower()) not in cls.async_actions:
+                return await sync_view(request, *args, **kwargs)
+            # Как во view из ViewSetMixin.as_view().
+            self = cls(**view.initkwargs)
+            self.action_map = actions
+            for method, action in actions.items():
+                setattr(self, method, getattr(self, action))
+            self.request = request
+            return await self.adispatch(request, *args, **kwargs)
+
+        functools.update_wrapper(async_view, view)
+        return async_view
+
+    async def adispatch(self, request, *args, **kwargs):
+        """dispatch() для асинхронного действия."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            # Аутентификация может обратиться к БД.
+            await database_sync_to_async(self.initial)(
+                request, *args, **kwargs
+            )
+            handler = getattr(self, f'a{self.action}')
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(
+            request, response, *args, **kwargs
+        )
+        return self.response
+
+    def fetch_list(self):
+        """Запросы к БД для списка: (есть ли пагинация, объекты)."""
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return False, list(queryset)
+        return True, page
+
+    async def alist(self, request, *args, **kwargs):
+        paginated, objects = await database_sync_to_async(self.fetch_list)()
+        serializer = self.get_serializer(objects, many=True)
+        if paginated:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await database_sync_to_async(self.get_object)()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
@@ -0,0 +1,181 @@
+"""
+JWT-аутентификация без запроса к таблице пользователей.
+
+Токен, который выдает TokenView, содержит клеймы, нужные проверкам прав:
+id, username, role и is_superuser. Проверенные токены хранятся в кэше
+процесса (ограничен по размеру и времени жизни JWT_CLAIMS_TTL), поэтому
+повторный запрос с тем же токеном не проверяет подпись и не ходит в БД.
+
+Роль из клеймов считается верной не дольше JWT_CLAIMS_TTL с момента
+выдачи токена, дальше она раз в JWT_CLAIMS_TTL перечитывается из БД.
+Изменение пользователя в этом процессе действует сразу (записи кэша
+сбрасываются, клеймы выданных раньше токенов перестают приниматься),
+в других процессах - не позже чем через JWT_CLAIMS_TTL.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import User
+
+# Поля пользователя, которые передаются в токене (кроме id).
+CLAIMS = ('username', 'role', 'is_superuser')
+USER_FIELDS = ('id',) + CLAIMS
+
+
+def get_token_for_user(user):
+    """Access-токен с клеймами для проверок прав."""
+    token = AccessToken.for_user(user)
+    for claim in CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+def build_user(values):
+    """
+    Пользователь из значений USER_FIELDS без запроса к БД.
+    Остальные поля отложены и загрузятся при обращении к ним.
+    """
+    values = dict(zip(USER_FIELDS, values))
+    # from_db ждет значения в порядке полей модели.
+    field_names = [
+        field.attname for field in User._meta.concrete_fields
+        if field.attname in values
+    ]
+    return User.from_db(
+        DEFAULT_DB_ALIAS, field_names, [values[name] for name in field_names]
+    )
+
+
+class TokenCache:
+    """Кэш проверенных токенов: ограничен по размеру, записи истекают."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        # Сырой токен -> (истекает в, значения USER_FIELDS, токен).
+        self.entries = OrderedDict()
+        # id пользователя -> время последнего изменения в этом процессе.
+        self.changed = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, raw_token):
+        with self.lock:
+            entry = self.entries.get(raw_token)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self.entries[raw_token]
+                return None
+            self.entries.move_to_end(raw_token)
+            return entry
+
+    def set(self, raw_token, expires_at, values, validated_token):
+        with self.lock:
+            self.entries[raw_token] = (expires_at, values, validated_token)
+            self.entries.move_to_end(raw_token)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def discard_user(self, user_id):
+        now = time.time()
+        with self.lock:
+            for raw_token in [
+                raw_token for raw_token, (_, values, _) in self.entries.items()
+                if values[0] == user_id
+            ]:
+                del self.entries[raw_token]
+            self.changed[user_id] = now
+            self.changed.move_to_end(user_id)
+            # Клеймам старше JWT_CLAIMS_TTL и так не верим.
+            while next(iter(self.changed.values())) + \
+                    settings.JWT_CLAIMS_TTL < now:
+                self.changed.popitem(last=False)
+
+    def changed_since(self, user_id, at_time):
+        with self.lock:
+            return self.changed.get(user_id, 0) >= at_time
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.changed.clear()
+
+
+token_cache = TokenCache(settings.JWT_CLAIMS_CACHE_SIZE)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    token_cache.discard_user(instance.pk)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Аутентификация по токену с клеймами (get_token_for_user).
+    Токены без клеймов (выданные раньше) тоже принимаются: пользователь
+    для них читается из БД и кэшируется так же.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        entry = token_cache.get(raw_token)
+        if entry is None:
+            validated_token = self.get_validated_token(raw_token)
+            expires_at, values = self.get_user_values(validated_token)
+            entry = (expires_at, values, validated_token)
+            token_cache.set(raw_token, *entry)
+        _, values, validated_token = entry
+        return build_user(values), validated_token
+
+    def get_user_values(self, validated_token):
+        """
+        Значения USER_FIELDS и время, до которого им можно верить.
+        Клеймы берутся из токена, если он выдан не раньше чем
+        JWT_CLAIMS_TTL назад, иначе - из БД.
+        """
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                'Токен не содержит идентификатора пользователя.'
+            )
+        now = time.time()
+        ttl = settings.JWT_CLAIMS_TTL
+        issued_at = validated_token.get('iat', 0)
+        if (all(claim in validated_token for claim in CLAIMS)
+                and issued_at + ttl > now
+                and not token_cache.changed_since(user_id, issued_at)):
+            values = (user_id,) + tuple(
+                validated_token[claim] for claim in CLAIMS
+            )
+            return min(validated_token['exp'], issued_at + ttl), values
+
+        row = User.objects.filter(pk=user_id).values_list(
+            *USER_FIELDS, 'is_active'
+        ).first()
+        if row is None:
+            raise AuthenticationFailed(
+                'Пользователь не найден.', code='user_not_found'
+            )
+        if not row[-1]:
+            raise AuthenticationFailed(
+                'Пользователь неактивен.', code='user_inactive'
+            )
+        return min(validated_token['exp'], now + ttl), row[:-1]
@@ -0,0 +1,144 @@
+"""
+Массовое создание произведений (POST v1/titles/bulk/).
+
+Каждый элемент списка проверяется сериализатором без запросов к БД,
+slug категорий и жанров всех элементов ищутся одним запросом на модель,
+произведения и их связи с жанрами пишутся пачками bulk_create в одной
+транзакции. Ошибочные элементы не мешают создать остальные: ответ
+содержит созданные произведения и ошибки по индексам элементов.
+"""
+from django.conf import settings
+from django.db import connection, transaction
+from rest_framework import serializers
+from rest_framework.relations import SlugRelatedField
+
+from reviews.models import Category, Genre, Title, TitleGenre
+from reviews.sqlite import retry_on_locked
+from reviews.versions import bump_model_versions
+from .serializers import BulkTitleSerializer
+
+
+def does_not_exist(value):
+    """Та же ошибка, что у SlugRelatedField в PostTitleSerializer."""
+    return SlugRelatedField.default_error_messages['does_not_exist'].format(
+        slug_name='slug', value=value
+    )
+
+
+def resolve_slugs(model, slugs):
+    """{slug: id} для всех slug одним запросом."""
+    if not slugs:
+        return {}
+    return dict(
+        model.objects.filter(slug__in=slugs).values_list('slug', 'id')
+    )
+
+
+def validate_items(items):
+    """
+    Проверяет элементы; отдает проверенные данные с id категории
+    и жанров и ошибки {индекс: ошибки}.
+    """
+    validated = {}
+    errors = {}
+    for index, item in enumerate(items):
+        serializer = BulkTitleSerializer(data=item)
+        if serializer.is_valid():
+            validated[index] = serializer.validated_data
+        else:
+            errors[index] = serializer.errors
+    categories = resolve_slugs(Category, {
+        data['category'] for data in validated.values()
+    })
+    genres = resolve_slugs(Genre, {
+        slug for data in validated.values() for slug in data['genre']
+    })
+    for index, data in list(validated.items()):
+        item_errors = {}
+        if data['category'] not in categories:
+            item_errors['category'] = [does_not_exist(data['category'])]
+        missing = [slug for slug in data['genre'] if slug not in genres]
+        if missing:
+            item_errors['genre'] = [does_not_exist(slug) for slug in missing]
+        if item_errors:
+            errors[index] = item_errors
+            del validated[index]
+            continue
+        data['category_id'] = categories[data['category']]
+        # Повтор жанра в одном элементе нарушил бы uq_title_genre.
+        data['genre_ids'] = list(dict.fromkeys(
+            genres[slug] for slug in data['genre']
+        ))
+    return validated, errors
+
+
+@retry_on_locked
+def insert_titles(validated):
+    """Пишет произведения и связи с жанрами; отдает id произведений."""
+    with transaction.atomic():
+        titles = [
+            Title(name=data['name'], year=data['year'],
+                  description=data.get('description'),
+                  category_id=data['category_id'])
+            for data in validated
+        ]
+        Title.objects.bulk_create(titles, settings.TITLES_BULK_BATCH_SIZE)
+        if connection.features.can_return_rows_from_bulk_insert:
+            ids = [title.id for title in titles]
+        else:
+            # SQLite не возвращает id из bulk_create. С первой вставки
+            # транзакция держит блокировку записи, поэтому последние
+            # len(titles) id - созданные здесь, в порядке вставки.
+            ids = sorted(
+                Title.objects.order_by('-id')
+                .values_list('id', flat=True)[:len(titles)]
+            )
+        TitleGenre.objects.bulk_create(
+            (
+                TitleGenre(title_id=title_id, genre_id=genre_id)
+                for title_id, data in zip(ids, validated)
+                for genre_id in data['genre_ids']
+            ),
+            settings.TITLES_BULK_BATCH_SIZE,
+        )
+        # bulk_create не отправляет сигналы, версии меняются здесь.
+        bump_model_versions(Title, TitleGenre)
+    return ids
+
+
+def bulk_create_titles(items):
+    """
+    Создает произведения из списка items.
+    Возвращает {'created': [...], 'errors': [{'index', 'errors'}]}.
+    """
+    if not isinstance(items, list) or not items:
+        raise serializers.ValidationError(
+            {'non_field_errors': ['Ожидается непустой список произведений.']}
+        )
+    if len(items) > settings.TITLES_BULK_MAX:
+        raise serializers.ValidationError({'non_field_errors': [
+            f'Не больше {settings.TITLES_BULK_MAX} произведений за запрос.'
+        ]})
+    validated, errors = validate_items(items)
+    created = []
+    if validated:
+        indexes = sorted(validated)
+        ids = insert_titles([validated[index] for index in indexes])
+        created = [
+            {
+                'id': title_id,
+                'name': validated[index]['name'],
+                'year': validated[index]['year'],
+                'description': validated[index].get('description'),
+                'genre': list(dict.fromkeys(validated[index]['genre'])),
+                'category': validated[index]['category'],
+            }
+            for index, title_id in zip(indexes, ids)
+        ]
+    return {
+        'created': created,
+        'errors': [
+            {'index': index, 'errors': errors[index]}
+            for index in sorted(errors)
+        ],
+    }
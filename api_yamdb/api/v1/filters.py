@@ -1,11 +1,21 @@
+from django.conf import settings
+from django.db.models import Case, IntegerField, Value, When
 from django_filters.rest_framework import CharFilter, FilterSet
+from rest_framework.exceptions import ValidationError
 
 from reviews.models import Title
+from reviews.search import search_titles
 
 
 class FilterTitleSet(FilterSet):
     genre = CharFilter('genre__slug')
     category = CharFilter('category__slug')
+    # Полнотекстовый поиск по названию и описанию, с сортировкой
+    # по релевантности.
+    search = CharFilter(method='filter_search')
+    # Произведения по списку id (?ids=1,2,3) в порядке из запроса:
+    # подборки на фронтенде получают их одним запросом.
+    ids = CharFilter(method='filter_ids')
 
     class Meta:
         model = Title
@@ -13,5 +23,32 @@ class FilterTitleSet(FilterSet):
             'category',
             'genre',
             'name',
-            'year'
+            'year',
+            'search',
+            'ids',
         )
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
+
+    def filter_ids(self, queryset, name, value):
+        try:
+            ids = [int(pk) for pk in value.split(',')]
+        except ValueError:
+            ids = []
+        if not ids or min(ids) < 1:
+            raise ValidationError(
+                {name: ['Ожидаются id произведений через запятую.']}
+            )
+        # Повторный id отдается один раз, на первом месте.
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > settings.TITLES_IDS_MAX:
+            raise ValidationError({name: [
+                f'Не больше {settings.TITLES_IDS_MAX} id за запрос.'
+            ]})
+        order = Case(
+            *(When(id=pk, then=Value(position))
+              for position, pk in enumerate(ids)),
+            output_field=IntegerField(),
+        )
+        return queryset.filter(id__in=ids).order_by(order)
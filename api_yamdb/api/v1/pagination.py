@@ -0,0 +1,113 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class PubDateKeysetPagination(BasePagination):
+    """
+    Пагинация по ключу (pub_date, id), от новых записей к старым.
+    Курсор хранит ключ последней выданной записи, поэтому любая страница
+    стоит одного запроса без COUNT и OFFSET, а новые записи, добавленные
+    между запросами, не сдвигают уже выданные страницы.
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.next_position = None
+        position = self.decode_cursor(request)
+
+        queryset = queryset.order_by('-pub_date', '-id')
+        if position is not None:
+            pub_date, pk = position
+            queryset = queryset.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=pk)
+            )
+        # Одна лишняя запись показывает, есть ли следующая страница.
+        results = list(queryset[:self.page_size + 1])
+        if len(results) > self.page_size:
+            results = results[:self.page_size]
+            last = results[-1]
+            self.next_position = (last.pub_date, last.pk)
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(self.next_position),
+        )
+
+    def encode_cursor(self, position):
+        pub_date, pk = position
+        raw = f'{pub_date.isoformat()}|{pk}'
+        return urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = urlsafe_b64decode(encoded.encode('ascii')).decode('ascii')
+            pub_date, pk = raw.rsplit('|', 1)
+            pub_date = parse_datetime(pub_date)
+            pk = int(pk)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if pub_date is None:
+            raise NotFound(self.invalid_cursor_message)
+        return pub_date, pk
+
+
+class ReviewCommentPagination(PageNumberPagination):
+    """
+    Пагинация отзывов и комментариев.
+    По умолчанию постраничная, как и во всем API. Если в запросе передан
+    параметр `cursor` (для первой страницы - пустой), включается
+    пагинация по ключу (pub_date, id).
+    """
+    keyset_class = PubDateKeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.keyset_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        self.keyset = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class TitlePagination(PageNumberPagination):
+    """
+    Пагинация произведений. Запрос по списку id (`?ids=1,2,3`, см.
+    FilterTitleSet) отдается целиком одним списком, без подсчета записей:
+    число id ограничено TITLES_IDS_MAX.
+    """
+    ids_query_param = 'ids'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # Пустой ?ids= фильтр пропускает, как и другие пустые фильтры.
+        if request.query_params.get(self.ids_query_param):
+            return None
+        return super().paginate_queryset(queryset, request, view)
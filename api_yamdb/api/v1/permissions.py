@@ -24,7 +24,7 @@ class AuthOwnerPermission(BasePermission):
         return request.user.is_authenticated
 
     def has_object_permission(self, request, view, obj):
-        return obj.author == request.user
+        return obj.author_id == request.user.id
 
 
 class CategoryAndGenresPermission(BasePermission):
@@ -80,7 +80,7 @@ class ReviewsAndCommentsPermission(BasePermission):
 
     def has_object_permission(self, request, view, obj):
         return (request.method in SAFE_METHODS
-                or (obj.author == request.user)
+                or (obj.author_id == request.user.id)
                 or (request.user.is_authenticated
                     and (request.user.role in [User.ADMIN, User.MODERATOR]
                          or request.user.is_superuser)))
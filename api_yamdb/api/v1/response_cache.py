@@ -0,0 +1,67 @@
+"""
+Кэш ответов анонимным пользователям на чтение каталога.
+
+Ключ включает версию ресурса (reviews.versions) и полный адрес запроса
+с фильтрами и страницей. Запись, меняющая ресурс, заменяет версию после
+коммита, поэтому следующий запрос идет по новому ключу и видит изменения,
+а старые записи просто истекают. Кэш задается настройкой RESPONSE_CACHE
+и, как и версии, общий для всех процессов сервера (см. reviews.checks).
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+
+RESPONSE_KEY = 'response:{resource}:{version}:{url}'
+COUNTER_KEY = 'response-cache:{}'
+COUNTERS = ('hits', 'misses')
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE]
+
+
+def cache_key(resource, version, url):
+    return RESPONSE_KEY.format(
+        resource=resource,
+        version=version,
+        url=hashlib.md5(url.encode('utf-8')).hexdigest(),
+    )
+
+
+def get_response_data(key):
+    data = get_cache().get(key)
+    count('hits' if data is not None else 'misses')
+    return data
+
+
+def set_response_data(key, data):
+    get_cache().set(key, data, settings.RESPONSE_CACHE_TIMEOUT)
+
+
+def count(counter):
+    cache = get_cache()
+    key = COUNTER_KEY.format(counter)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Счетчика еще нет (или он вытеснен).
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def get_stats():
+    """Счетчики попаданий и промахов: {'hits': n, 'misses': n}."""
+    values = get_cache().get_many(
+        [COUNTER_KEY.format(counter) for counter in COUNTERS]
+    )
+    return {
+        counter: values.get(COUNTER_KEY.format(counter), 0)
+        for counter in COUNTERS
+    }
+
+
+def reset_stats():
+    get_cache().delete_many(
+        [COUNTER_KEY.format(counter) for counter in COUNTERS]
+    )
@@ -2,8 +2,8 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.core.exceptions import ValidationError
 from django.core.validators import EmailValidator, MaxLengthValidator
-from django.db import transaction
-from django.shortcuts import get_object_or_404
+from django.db import IntegrityError
+from django.db.models import Q
 from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.exceptions import NotFound
@@ -53,33 +53,45 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         """
         Запрет повторного email и username.
+        Один запрос находит и конфликты, и уже зарегистрированного
+        пользователя с той же парой email и username.
         """
         email = attrs.get('email')
         username = attrs.get('username')
 
-        existing_email = User.objects.filter(email=email).exists()
-        existing_username = User.objects.filter(username=username).exists()
-
-        if existing_email and not existing_username:
+        matches = list(
+            User.objects.filter(Q(email=email) | Q(username=username))
+            .values_list('id', 'username', 'email')[:2]
+        )
+        for user_id, user_username, user_email in matches:
+            if user_username == username and user_email == email:
+                attrs['existing_id'] = user_id
+                return attrs
+        if any(user_email == email for _, _, user_email in matches):
             raise ValidationError('Пользователь с таким email уже существует.')
-        if existing_username and not existing_email:
+        if matches:
             raise ValidationError('Пользователь с таким username уже '
                                   'существует.')
         return attrs
 
-    @transaction.atomic  # Записывает в БД, только выполнив всю работу.
     def create(self, validated_data):
         """
-        Создание пользователя.
-        Сохранение введенных полей email, username и confirmation_code в БД.
+        Создание пользователя или новый код подтверждения для уже
+        зарегистрированного: один INSERT или один UPDATE. Если
+        пользователя удалили после проверки, он создается заново.
         """
-        user = User.objects.create(
-            email=validated_data['email'],
-            username=validated_data['username'],
-            confirmation_code=self.context['confirmation_code']
-        )
-        user.save()
-        return user
+        existing_id = validated_data.pop('existing_id', None)
+        if existing_id is not None and User.objects.filter(
+                pk=existing_id
+        ).update(confirmation_code=validated_data['confirmation_code']):
+            return User(pk=existing_id, **validated_data)
+        try:
+            return User.objects.create(**validated_data)
+        except IntegrityError:
+            # Параллельная регистрация успела занять email или username.
+            raise serializers.ValidationError(
+                'Пользователь с таким email или username уже существует.'
+            )
 
 
 class TokenSerializer(serializers.ModelSerializer):
@@ -159,16 +171,23 @@ class PostTitleSerializer(serializers.ModelSerializer):
         return value
 
 
+class BulkTitleSerializer(PostTitleSerializer):
+    """
+    Элемент массового создания произведений (api.v1.bulk).
+    Slug только проверяются по формату: существование категорий и жанров
+    всех элементов проверяется одним запросом на модель.
+    """
+
+    category = serializers.SlugField()
+    genre = serializers.ListField(child=serializers.SlugField())
+
+
 class GetTitleSerializer(serializers.ModelSerializer):
     """Сериализатор для получения произведений."""
 
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(read_only=True, many=True)
-    rating = serializers.IntegerField(
-        source='rating_avg',
-        read_only=True,
-        default=None
-    )
+    rating = serializers.IntegerField(read_only=True, default=None)
 
     class Meta:
         model = Title
@@ -184,20 +203,6 @@ class ReviewSerializer(serializers.ModelSerializer):
         read_only=True
     )
 
-    def validate(self, data):
-        request = self.context['request']
-        title_id = self.context['view'].kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        if request.method == 'POST':
-            if Review.objects.filter(
-                    author=request.user,
-                    title=title
-            ).exists():
-                raise ValidationError(
-                    'На одно произведение можно оставить только один отзыв'
-                )
-        return data
-
     class Meta:
         fields = ('id', 'author', 'score', 'text', 'pub_date')
         model = Review
@@ -0,0 +1,136 @@
+"""
+Ограничение частоты запросов к регистрации, выдаче токенов и созданию
+отзывов и комментариев.
+
+Счетчики скользящего окна хранятся в кэше THROTTLE_CACHE, общем для всех
+процессов: для каждого ключа считаются запросы в текущем и предыдущем
+окне, оценка - текущее окно плюс доля предыдущего, еще попадающая
+в последние `duration` секунд. Счетчик увеличивается атомарным incr до
+проверки (см. reviews.checks), поэтому параллельные запросы не превышают
+лимит. Проверка идет в initial(), до сериализатора и запросов к БД;
+отказ - ответ 429 с Retry-After. Лимиты задаются
+в REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'].
+"""
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """Скользящее окно на двух счетчиках; ключ задает get_ident_value."""
+
+    @property
+    def cache(self):
+        return caches[settings.THROTTLE_CACHE]
+
+    def get_ident_value(self, request):
+        raise NotImplementedError
+
+    def get_cache_key(self, request, view):
+        ident = self.get_ident_value(request)
+        if ident in (None, ''):
+            return None
+        return f'{self.scope}:{ident}'
+
+    def window_key(self, window):
+        return f'throttle:{self.key}:{window}'
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = time.time()
+        window, elapsed = divmod(now, self.duration)
+        window = int(window)
+        current_key = self.window_key(window)
+        previous_key = self.window_key(window - 1)
+        # Окно хранится, пока оно нужно как предыдущее.
+        if not self.cache.add(current_key, 1, 2 * self.duration):
+            try:
+                self.cache.incr(current_key)
+            except ValueError:
+                # Ключ истек между add и incr.
+                self.cache.add(current_key, 1, 2 * self.duration)
+        counts = self.cache.get_many([current_key, previous_key])
+        self.current = counts.get(current_key, 1)
+        self.previous = counts.get(previous_key, 0)
+        self.elapsed = elapsed
+
+        weight = 1 - elapsed / self.duration
+        return self.previous * weight + self.current <= self.num_requests
+
+    def wait(self):
+        """Через сколько секунд следующий запрос уложится в лимит."""
+        allowed = self.num_requests - 1
+        if self.current > allowed:
+            # Нужно дождаться следующего окна, а в нем - пока доля
+            # текущего окна не станет меньше лимита.
+            share = 1 - allowed / self.current
+            seconds = self.duration - self.elapsed + share * self.duration
+        else:
+            share = 1 - (allowed - self.current) / self.previous
+            seconds = share * self.duration - self.elapsed
+        return max(1, math.ceil(seconds))
+
+
+class IpThrottle(SlidingWindowThrottle):
+    """Лимит на адрес клиента."""
+
+    def get_ident_value(self, request):
+        return self.get_ident(request)
+
+
+class RequestFieldThrottle(SlidingWindowThrottle):
+    """Лимит на значение поля запроса (email, username)."""
+    field = None
+
+    def get_ident_value(self, request):
+        value = request.data.get(self.field)
+        if not isinstance(value, str) or not value.strip():
+            return None
+        # Значение приходит от клиента: в ключ кэша идет его хэш.
+        return hashlib.md5(
+            value.strip().lower().encode('utf-8')
+        ).hexdigest()
+
+
+class CreateByUserThrottle(SlidingWindowThrottle):
+    """Лимит на создание записей одним пользователем."""
+
+    def get_ident_value(self, request):
+        if request.method != 'POST' or not request.user.is_authenticated:
+            return None
+        return request.user.pk
+
+
+class SignupEmailThrottle(RequestFieldThrottle):
+    scope = 'signup_email'
+    field = 'email'
+
+
+class SignupIpThrottle(IpThrottle):
+    scope = 'signup_ip'
+
+
+class TokenUsernameThrottle(RequestFieldThrottle):
+    scope = 'token_username'
+    field = 'username'
+
+
+class TokenIpThrottle(IpThrottle):
+    scope = 'token_ip'
+
+
+class ReviewCreateThrottle(CreateByUserThrottle):
+    scope = 'review_create'
+
+
+class CommentCreateThrottle(CreateByUserThrottle):
+    scope = 'comment_create'
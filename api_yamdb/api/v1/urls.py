@@ -1,9 +1,9 @@
 from django.urls import include, path
 from rest_framework import routers
 
-from api.v1.views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                          RegisterView, ReviewViewSet, TitleViewSet, TokenView,
-                          UsersViewSet)
+from api.v1.views import (CategoryViewSet, CommentViewSet, ExportView,
+                          GenreViewSet, RegisterView, ReviewViewSet,
+                          TitleViewSet, TokenView, UsersViewSet)
 
 v1_router = routers.DefaultRouter()
 v1_router.register(
@@ -44,4 +44,10 @@ urlpatterns = [
     path('v1/auth/signup/', RegisterView.as_view(), name='sign_up'),
     # Получение JWT-токена.
     path('v1/auth/token/', TokenView.as_view(), name='token'),
+    # Потоковая выгрузка данных.
+    path(
+        'v1/export/<str:resource>.<str:export_format>',
+        ExportView.as_view(),
+        name='export'
+    ),
 ]
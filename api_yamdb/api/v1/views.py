@@ -2,18 +2,28 @@ import uuid
 
 from django.contrib.auth import get_user_model
 from django.core.mail import send_mail
-from django.db.models import Avg
-from django.shortcuts import get_object_or_404
+from django.db import IntegrityError, transaction
+from django.http import Http404, StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import CreateAPIView, GenericAPIView
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
-
-from reviews.models import Category, Genre, Review, Title
+from rest_framework.views import APIView
+
+from reviews.csv_export import CONTENT_TYPES, EXPORT_SPECS, stream_export
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.versions import title_resource
+from .async_read import AsyncReadMixin
+from .authentication import get_token_for_user
+from .bulk import bulk_create_titles
 from .filters import FilterTitleSet
-from .viewsets import CreateListDestroy
+from .pagination import ReviewCommentPagination, TitlePagination
+from .throttling import (CommentCreateThrottle, ReviewCreateThrottle,
+                         SignupEmailThrottle, SignupIpThrottle,
+                         TokenIpThrottle, TokenUsernameThrottle)
+from .viewsets import ConditionalGetMixin, CreateListDestroy
 from .permissions import (AdminOnlyPermission, AuthOwnerPermission,
                           ReviewsAndCommentsPermission, TitlesPermission)
 from .serializers import (CategorySerializer, CommentSerializer,
@@ -32,6 +42,7 @@ class RegisterView(CreateAPIView):
     """
     permission_classes = [permissions.AllowAny]
     serializer_class = UserRegistrationSerializer
+    throttle_classes = [SignupIpThrottle, SignupEmailThrottle]
 
     def generate_confirmation_code(self):
         """
@@ -55,33 +66,20 @@ class RegisterView(CreateAPIView):
         email = serializer.validated_data['email']
         username = serializer.validated_data['username']
 
-        existing_user = User.objects.filter(email=email,
-                                            username=username).first()
-
-        # Если пользователь уже существует:
-        # Создает новый код подтверждения и обновляет его в БД.
-        if existing_user:
-            confirmation_code = self.generate_confirmation_code()
-            existing_user.confirmation_code = confirmation_code
-            existing_user.save()
-
-        # Если пользователь не существует:
-        else:
-            # Создает новый код подтверждения.
-            confirmation_code = self.generate_confirmation_code()
-            # Добавляет confirmation_code в контекст,
-            # Сериализатор сохранит его в БД, вместе с новым пользователем.
-            serializer.context['confirmation_code'] = confirmation_code
-            self.perform_create(serializer)
+        # Новый код подтверждения. Сериализатор создаст пользователя
+        # или обновит код уже зарегистрированного (одним запросом);
+        # письмо с кодом ставится в очередь в той же транзакции.
+        confirmation_code = self.generate_confirmation_code()
+        with transaction.atomic():
+            serializer.save(confirmation_code=confirmation_code)
+            send_mail(
+                from_email=None,
+                message=f'Код подтверждения: {confirmation_code}',
+                subject='Confirmation Code',
+                recipient_list=(email,)
+            )
 
         response_data = {'username': username, 'email': email}
-
-        send_mail(
-            from_email=None,
-            message=f'Код подтверждения: {confirmation_code}',
-            subject='Confirmation Code',
-            recipient_list=(email,)
-        )
         return Response(response_data, status=status.HTTP_200_OK)
 
 
@@ -92,14 +90,14 @@ class TokenView(GenericAPIView):
     """
     permission_classes = [permissions.AllowAny]
     serializer_class = TokenSerializer
+    throttle_classes = [TokenIpThrottle, TokenUsernameThrottle]
 
     def post(self, request):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = request.user
+        user = serializer.validated_data['user']
 
-        refresh = RefreshToken.for_user(user)
-        token = {'access': str(refresh.access_token)}
+        token = {'access': str(get_token_for_user(user))}
         return Response(token)
 
 
@@ -121,7 +119,8 @@ class UsersViewSet(viewsets.ModelViewSet):
         Получение и Изменение своего профиля.
         Эндпойнт .v1/users/me/
         """
-        user = request.user
+        # request.user собран из клеймов токена, профиль читается из БД.
+        user = User.objects.get(pk=request.user.pk)
         msg = 'У вас нет разрешения изменять роль пользователя.'
 
         if request.method == 'PATCH':
@@ -144,6 +143,7 @@ class GenreViewSet(CreateListDestroy):
 
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    version_resource = 'genres'
 
 
 class CategoryViewSet(CreateListDestroy):
@@ -151,52 +151,168 @@ class CategoryViewSet(CreateListDestroy):
 
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    version_resource = 'categories'
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """View-функция для произведений."""
 
     queryset = (Title.objects.all().select_related('category')
                 .prefetch_related('genre')
-                .annotate(rating_avg=Avg('reviews__score'))
                 .order_by('id'))
     permission_classes = [TitlesPermission]
     filter_backends = (DjangoFilterBackend,)
     filterset_class = FilterTitleSet
+    pagination_class = TitlePagination
+    version_resource = 'titles'
+    async_actions = ('list', 'retrieve')
 
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return GetTitleSerializer
         return PostTitleSerializer
 
+    def get_version_resources(self):
+        if self.action != 'retrieve':
+            return super().get_version_resources()
+        # У карточки своя версия: отзыв на одно произведение не сбрасывает
+        # кэш и ETag карточек остальных.
+        pk = self.kwargs.get('pk', '')
+        return ('title-details',
+                title_resource(int(pk) if pk.isdigit() else pk))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.read(super().retrieve)(request, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.aread(super().aretrieve)(request, *args, **kwargs)
+
+    @action(detail=False, methods=['POST'],
+            permission_classes=[AdminOnlyPermission])
+    def bulk(self, request):
+        """
+        Массовое создание произведений.
+        Эндпойнт v1/titles/bulk/, тело - список произведений.
+        """
+        result = bulk_create_titles(request.data)
+        if result['created']:
+            return Response(result, status=status.HTTP_201_CREATED)
+        return Response(result, status=status.HTTP_400_BAD_REQUEST)
+
 
-class ReviewViewSet(viewsets.ModelViewSet):
+def is_duplicate_review(error, title_id, author):
+    """
+    Нарушено ли ограничение uq_title_author. Вид ошибки берется из данных
+    драйвера, а не из текста: имя ограничения (PostgreSQL) или код ошибки
+    SQLite; если драйвер их не сообщает, отзыв ищется запросом.
+    """
+    cause = error.__cause__
+    constraint = getattr(getattr(cause, 'diag', None), 'constraint_name', None)
+    if constraint is not None:
+        return constraint == 'uq_title_author'
+    code = getattr(cause, 'sqlite_errorname', None)
+    if code is not None:
+        # Других уникальных ограничений, кроме первичного ключа (у него
+        # свой код), у отзыва нет.
+        return code == 'SQLITE_CONSTRAINT_UNIQUE'
+    return Review.objects.filter(title_id=title_id, author=author).exists()
+
+
+class ReviewViewSet(AsyncReadMixin, viewsets.ModelViewSet):
     """View-функция для отзывов."""
 
     serializer_class = ReviewSerializer
+    pagination_class = ReviewCommentPagination
+    throttle_classes = [ReviewCreateThrottle]
 
     permission_classes = [ReviewsAndCommentsPermission]
 
     def get_queryset(self):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        title_id = self.kwargs.get('title_id')
+        if (self.action == 'list'
+                and not Title.objects.filter(id=title_id).exists()):
+            raise Http404
+        # Для действий с одним отзывом произведение отдельно не загружается:
+        # отзыв ищется сразу по паре (title_id, id).
+        # Автор подтягивается тем же запросом, и только его username.
+        return (Review.objects.filter(title_id=title_id)
+                .select_related('author')
+                .only('id', 'title_id', 'text', 'score', 'pub_date',
+                      'author__username'))
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
-
-
-class CommentViewSet(viewsets.ModelViewSet):
+        # Существование произведения проверяет внешний ключ при фиксации
+        # транзакции, повторный отзыв - ограничение uq_title_author. Во
+        # внешней транзакции проверка ключа отложится до ее конца, поэтому
+        # там произведение проверяется отдельным запросом.
+        title_id = self.kwargs.get('title_id')
+        if (transaction.get_connection().in_atomic_block
+                and not Title.objects.filter(id=title_id).exists()):
+            raise Http404
+        try:
+            with transaction.atomic():
+                serializer.save(author=self.request.user, title_id=title_id)
+        except IntegrityError as error:
+            if is_duplicate_review(error, title_id, self.request.user):
+                raise ValidationError(
+                    'На одно произведение можно оставить только один отзыв'
+                )
+            if not Title.objects.filter(id=title_id).exists():
+                raise Http404
+            raise
+
+
+class CommentViewSet(AsyncReadMixin, viewsets.ModelViewSet):
     """View-функция для комментариев."""
 
     serializer_class = CommentSerializer
+    pagination_class = ReviewCommentPagination
+    throttle_classes = [CommentCreateThrottle]
 
     permission_classes = [ReviewsAndCommentsPermission]
 
+    def check_review_exists(self):
+        if not Review.objects.filter(
+                id=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id')
+        ).exists():
+            raise Http404
+
     def get_queryset(self):
-        review = get_object_or_404(Review, id=self.kwargs.get('review_id'))
-        return review.comments.all()
+        if self.action == 'list':
+            self.check_review_exists()
+        return (Comment.objects
+                .filter(review_id=self.kwargs.get('review_id'),
+                        review__title_id=self.kwargs.get('title_id'))
+                .select_related('author')
+                .only('id', 'review_id', 'text', 'pub_date',
+                      'author__username'))
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review, id=self.kwargs.get('review_id'))
-        serializer.save(author=self.request.user, review=review)
+        self.check_review_exists()
+        serializer.save(
+            author=self.request.user,
+            review_id=self.kwargs.get('review_id')
+        )
+
+
+class ExportView(APIView):
+    """
+    Потоковая выгрузка таблицы в CSV или NDJSON. Только для админа.
+    v1/export/<resource>.<csv|ndjson>
+    Тело ответа формируется по мере чтения БД кусками, поэтому память
+    не зависит от размера таблицы.
+    """
+    permission_classes = [AdminOnlyPermission]
+
+    def get(self, request, resource, export_format):
+        if resource not in EXPORT_SPECS or export_format not in CONTENT_TYPES:
+            raise Http404
+        response = StreamingHttpResponse(
+            stream_export(resource, export_format),
+            content_type=CONTENT_TYPES[export_format],
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{resource}.{export_format}"'
+        )
+        return response
@@ -1,10 +1,147 @@
+from calendar import timegm
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import condition
 from rest_framework import filters, mixins, viewsets
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
 
+from api_yamdb.replicas import reading_from_replica, use_primary
+from reviews.versions import get_combined_version
+from .async_read import AsyncReadMixin, cache_sync_to_async
 from .permissions import CategoryAndGenresPermission
+from .response_cache import (cache_key, get_response_data,
+                             set_response_data)
+
+
+class ConditionalGetMixin(AsyncReadMixin):
+    """
+    Чтение по версии ресурса (reviews.versions).
+    1. ETag и Last-Modified: если версия не изменилась, ответ 304
+       отдается до запроса к БД и сериализации.
+    2. Ответы анонимным пользователям кэшируются (api.v1.response_cache).
+    Если ресурс изменился недавно, реплика могла еще не получить
+    изменения: такой запрос читает из основной БД, чтобы старые данные
+    не попали в кэш и к клиенту под новой версией.
+    Права проверяются раньше, в initial().
+    Оборачивает list и alist; другие действия оборачиваются через read()
+    и aread().
+    """
+    version_resource = None
+
+    def get_version_resources(self):
+        """Ресурсы, от версий которых зависит ответ."""
+        return (self.version_resource,)
+
+    def get_version(self, request):
+        if getattr(request, '_resource_version', None) is None:
+            request._resource_version = get_combined_version(
+                *self.get_version_resources()
+            )
+            _, modified = request._resource_version
+            if reading_from_replica() and timezone.now() - modified < \
+                    timedelta(seconds=settings.REPLICA_PIN_SECONDS):
+                use_primary()
+        return request._resource_version
+
+    def get_etag(self, request, *args, **kwargs):
+        token, _ = self.get_version(request)
+        # JSON и браузерная версия API - разные представления.
+        return f'{self.version_resource}-{token}-' \
+               f'{request.accepted_renderer.format}'
+
+    def get_last_modified(self, request, *args, **kwargs):
+        _, modified = self.get_version(request)
+        return modified
+
+    def response_cache_key(self, request):
+        token, _ = self.get_version(request)
+        return cache_key(
+            self.version_resource, token, request.build_absolute_uri()
+        )
+
+    def cached_response(self, key):
+        data = get_response_data(key)
+        if data is None:
+            return None
+        response = Response(data)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    def cache_response(self, key, response):
+        if response.status_code == 200:
+            set_response_data(key, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def cached(self, view):
+        def cached_view(request, *args, **kwargs):
+            if not request.user.is_anonymous:
+                return view(request, *args, **kwargs)
+            key = self.response_cache_key(request)
+            response = self.cached_response(key)
+            if response is None:
+                response = self.cache_response(
+                    key, view(request, *args, **kwargs)
+                )
+            return response
+        return cached_view
+
+    def acached(self, view):
+        async def cached_view(request, *args, **kwargs):
+            if not request.user.is_anonymous:
+                return await view(request, *args, **kwargs)
+            key = await cache_sync_to_async(self.response_cache_key)(
+                request
+            )
+            response = await cache_sync_to_async(self.cached_response)(key)
+            if response is None:
+                response = await cache_sync_to_async(self.cache_response)(
+                    key, await view(request, *args, **kwargs)
+                )
+            return response
+        return cached_view
+
+    def read(self, view):
+        return condition(
+            etag_func=self.get_etag,
+            last_modified_func=self.get_last_modified
+        )(self.cached(view))
+
+    def aread(self, view):
+        """read() для асинхронного действия: то же, что condition()."""
+        async def read_view(request, *args, **kwargs):
+            # Версия читается из кэша один раз и запоминается в запросе.
+            await cache_sync_to_async(self.get_version)(request)
+            etag = quote_etag(self.get_etag(request))
+            last_modified = timegm(
+                self.get_last_modified(request).utctimetuple()
+            )
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+            if response is None:
+                response = await self.acached(view)(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD'):
+                if not response.has_header('Last-Modified'):
+                    response['Last-Modified'] = http_date(last_modified)
+                response.setdefault('ETag', etag)
+            return response
+        return read_view
+
+    def list(self, request, *args, **kwargs):
+        return self.read(super().list)(request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.aread(super().alist)(request, *args, **kwargs)
 
 
-class CreateListDestroy(mixins.CreateModelMixin,
+class CreateListDestroy(ConditionalGetMixin,
+                        mixins.CreateModelMixin,
                         mixins.DestroyModelMixin,
                         mixins.ListModelMixin,
                         viewsets.GenericViewSet):
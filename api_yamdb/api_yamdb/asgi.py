@@ -3,5 +3,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+# Чтение каталога - асинхронными view (api.v1.async_read).
+os.environ.setdefault('ASYNC_READ_VIEWS', '1')
 
 application = get_asgi_application()
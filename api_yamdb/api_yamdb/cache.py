@@ -0,0 +1,68 @@
+"""
+Файловый кэш с атомарными add и incr для всех процессов сервера.
+
+FileBasedCache выполняет add как has_key и затем set, а incr - как get
+и затем set, поэтому одновременные запросы из разных процессов теряют
+увеличения счетчиков (api.v1.throttling). Здесь add и incr выполняются
+под исключительной блокировкой файла в папке кэша, общей для процессов
+на одной машине; incr к тому же сохраняет срок жизни ключа.
+"""
+import os
+import pickle
+import tempfile
+import time
+import zlib
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.files import locks
+from django.core.files.move import file_move_safe
+
+LOCK_FILENAME = 'atomic.lock'
+
+
+class AtomicFileBasedCache(FileBasedCache):
+
+    @contextmanager
+    def lock(self):
+        self._createdir()
+        with open(os.path.join(self._dir, LOCK_FILENAME), 'ab') as lock_file:
+            locks.lock(lock_file, locks.LOCK_EX)
+            try:
+                yield
+            finally:
+                locks.unlock(lock_file)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        with self.lock():
+            return super().add(key, value, timeout, version)
+
+    def incr(self, key, delta=1, version=None):
+        fname = self._key_to_file(key, version)
+        with self.lock():
+            try:
+                with open(fname, 'rb') as cache_file:
+                    expiry = pickle.load(cache_file)
+                    value = pickle.loads(zlib.decompress(cache_file.read()))
+            except FileNotFoundError:
+                value = None
+            if value is None or expiry is not None and expiry < time.time():
+                raise ValueError(f"Key '{key}' not found")
+            value += delta
+            # Как в set: запись во временный файл и переименование, чтобы
+            # get без блокировки не прочитал файл наполовину.
+            fd, tmp_path = tempfile.mkstemp(dir=self._dir)
+            renamed = False
+            try:
+                with open(fd, 'wb') as tmp_file:
+                    tmp_file.write(pickle.dumps(expiry, self.pickle_protocol))
+                    tmp_file.write(zlib.compress(
+                        pickle.dumps(value, self.pickle_protocol)
+                    ))
+                file_move_safe(tmp_path, fname, allow_overwrite=True)
+                renamed = True
+            finally:
+                if not renamed:
+                    os.remove(tmp_path)
+        return value
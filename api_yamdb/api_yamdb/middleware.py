@@ -0,0 +1,32 @@
+"""
+Общая основа middleware проекта.
+
+MiddlewareMixin выполняет process_request и process_response под ASGI
+в отдельном потоке и не дает обернуть get_response целиком (контекстные
+переменные, try/finally). Middleware проекта оборачивают get_response,
+поэтому переопределяют handle и ahandle, а режим выбирает MiddlewareMixin.
+"""
+import asyncio
+
+from django.utils.deprecation import MiddlewareMixin
+
+
+class WrappingMiddleware(MiddlewareMixin):
+    """
+    Middleware вокруг get_response: handle для синхронной цепочки,
+    ahandle для асинхронной, без перехода в поток.
+    """
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        return self.handle(request)
+
+    async def __acall__(self, request):
+        return await self.ahandle(request)
+
+    def handle(self, request):
+        raise NotImplementedError
+
+    async def ahandle(self, request):
+        raise NotImplementedError
@@ -0,0 +1,151 @@
+"""
+Чтение с реплик БД.
+
+ReplicaMiddleware выбирает для безопасного запроса к API (GET, HEAD,
+OPTIONS) одну из реплик DATABASE_REPLICAS по кругу или наименее
+загруженную (REPLICA_STRATEGY), и ReplicaRouter направляет на нее все
+чтения этого запроса. Запись и все остальное идет в основную БД.
+
+Клиент, который только что писал, REPLICA_PIN_SECONDS читает из основной
+БД: отметка хранится в общем кэше по токену (или адресу) клиента, поэтому
+действует во всех процессах. Код, которому нужны свежие данные, может
+переключить текущий запрос на основную БД через use_primary().
+
+Без DATABASE_REPLICAS все запросы идут в основную БД. Под ASGI middleware
+работает асинхронно и не переводит асинхронные view в синхронный режим;
+отметки о записи читаются и пишутся в пуле потоков, не блокируя цикл
+событий.
+"""
+import hashlib
+import itertools
+import threading
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+
+from api_yamdb.middleware import WrappingMiddleware
+
+PIN_KEY = 'replica-pin:{}'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Алиас БД для чтений текущего запроса; None - основная БД.
+read_alias = ContextVar('read_alias', default=None)
+
+
+def use_primary():
+    """Оставшиеся чтения текущего запроса идут в основную БД."""
+    read_alias.set(None)
+
+
+def reading_from_replica():
+    return read_alias.get() is not None
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        return read_alias.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # На репликах те же данные, что и в основной БД.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Реплики получают схему вместе с данными (sync_replica).
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaBalancer:
+    """Выбор реплики в процессе: по кругу или с наименьшим числом запросов."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.replicas = None
+        self.in_flight = {}
+
+    def acquire(self):
+        with self.lock:
+            replicas = tuple(settings.DATABASE_REPLICAS)
+            if replicas != self.replicas:
+                self.replicas = replicas
+                self.cycle = itertools.cycle(replicas)
+                self.in_flight = dict.fromkeys(replicas, 0)
+            if settings.REPLICA_STRATEGY == 'least_loaded':
+                alias = min(replicas, key=self.in_flight.__getitem__)
+            else:
+                alias = next(self.cycle)
+            self.in_flight[alias] += 1
+            return alias
+
+    def release(self, alias):
+        with self.lock:
+            if alias in self.in_flight:
+                self.in_flight[alias] -= 1
+
+
+balancer = ReplicaBalancer()
+
+
+def client_key(request):
+    """Ключ клиента для отметки о записи: токен, иначе адрес."""
+    ident = (request.META.get('HTTP_AUTHORIZATION')
+             or request.META.get('REMOTE_ADDR', ''))
+    return PIN_KEY.format(hashlib.md5(ident.encode('utf-8')).hexdigest())
+
+
+class ReplicaMiddleware(WrappingMiddleware):
+    def handle(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        alias, token = self.choose_database(self.wants_replica(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            self.release(alias, token)
+        if self.wrote(request, response):
+            self.pin(request)
+        return response
+
+    async def ahandle(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+        alias, token = self.choose_database(await sync_to_async(
+            self.wants_replica, thread_sensitive=False
+        )(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.release(alias, token)
+        if self.wrote(request, response):
+            await sync_to_async(self.pin, thread_sensitive=False)(request)
+        return response
+
+    def wants_replica(self, request):
+        return (request.method in SAFE_METHODS
+                and request.path.startswith(settings.REPLICA_PATH_PREFIX)
+                and caches[settings.REPLICA_PIN_CACHE].get(
+                    client_key(request)) is None)
+
+    def choose_database(self, wants_replica):
+        alias = balancer.acquire() if wants_replica else None
+        return alias, read_alias.set(alias)
+
+    def release(self, alias, token):
+        read_alias.reset(token)
+        if alias is not None:
+            balancer.release(alias)
+
+    def wrote(self, request, response):
+        return (request.method not in SAFE_METHODS
+                and response.status_code < 400)
+
+    def pin(self, request):
+        caches[settings.REPLICA_PIN_CACHE].set(
+            client_key(request), 1, settings.REPLICA_PIN_SECONDS
+        )
@@ -31,7 +31,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
+    'api.diagnostics.DiagnosticsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'api_yamdb.replicas.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -60,6 +63,10 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
+ASGI_APPLICATION = 'api_yamdb.asgi.application'
+# Асинхронное чтение каталога (api.v1.async_read). Включается в asgi.py,
+# под WSGI асинхронные view только добавили бы накладные расходы.
+ASYNC_READ_VIEWS = os.getenv('ASYNC_READ_VIEWS', '') == '1'
 
 # Database
 
@@ -67,8 +74,43 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    },
+    # Локальная реплика: копия основной БД (команда sync_replica).
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db_replica.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    },
 }
+DATABASE_ROUTERS = ['api_yamdb.replicas.ReplicaRouter']
+# Реплики для чтения (api_yamdb.replicas), например
+# DATABASE_REPLICAS=replica. Без них все запросы идут в основную БД.
+DATABASE_REPLICAS = [
+    alias for alias in os.getenv('DATABASE_REPLICAS', '').split(',') if alias
+]
+# Выбор реплики: 'round_robin' или 'least_loaded'.
+REPLICA_STRATEGY = 'round_robin'
+# Сколько секунд после записи клиент читает из основной БД.
+REPLICA_PIN_SECONDS = 5
+REPLICA_PIN_CACHE = 'default'
+# Какие запросы читают с реплик.
+REPLICA_PATH_PREFIX = '/api/'
+
+# PRAGMA для каждого нового соединения SQLite (reviews.sqlite).
+# WAL: читатели не блокируются писателем; synchronous=NORMAL в режиме WAL
+# не теряет целостность при сбое; cache_size < 0 - размер в КиБ.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -64 * 1024,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,
+}
+# Повторы записи, если база занята: число повторов и начальная
+# задержка в секундах (удваивается, выбирается случайно до границы).
+SQLITE_WRITE_RETRIES = 5
+SQLITE_RETRY_DELAY = 0.05
 
 # Password validation
 
@@ -117,35 +159,125 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     # Авторизация по JWT-токену.
+    # Права проверяются по клеймам токена, без запроса к БД.
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.v1.authentication.ClaimsJWTAuthentication',
     ],
     # Глобальная настройка пагинации ответов.
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination'
                                 '.PageNumberPagination',
-    'PAGE_SIZE': 5
+    'PAGE_SIZE': 5,
+    # Лимиты частоты запросов (api.v1.throttling).
+    'DEFAULT_THROTTLE_RATES': {
+        'signup_email': '5/hour',
+        'signup_ip': '30/hour',
+        'token_username': '10/min',
+        'token_ip': '30/min',
+        'review_create': '30/min',
+        'comment_create': '60/min',
+    },
 }
 # -----------------------------------------------------------------------------
 # Указание, что вместо стандартной модели пользователя
 # нужно использовать кастомную модель из приложения users.
 AUTH_USER_MODEL = 'reviews.User'
 # -----------------------------------------------------------------------------
+# Письма ставятся в очередь (reviews.outbox), запрос не ждет отправки.
+# Отправляет их команда send_outbox через OUTBOX_EMAIL_BACKEND.
+EMAIL_BACKEND = 'reviews.outbox.OutboxBackend'
 # Подключение бэкэнда имитирующего отправку писем.
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+OUTBOX_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 # Папка куда будут складываться эти письма.
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 # Бэкенд для реальной отправки писем. Нужно добавить логин\пароль.
-# EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# OUTBOX_EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 # EMAIL_HOST = 'smtp.gmail.com'
 # EMAIL_USE_TLS = False
 # EMAIL_PORT = 465
 # EMAIL_USE_SSL = True
 # EMAIL_HOST_USER = 'your@djangoapp.com'
 # EMAIL_HOST_PASSWORD = 'your password'
+
+# Очередь писем: размер пачки, число попыток, задержка перед первым
+# повтором (дальше удваивается) и сколько секунд письмо заблокировано
+# за обработчиком.
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_DELAY = 60
+OUTBOX_LOCK_SECONDS = 5 * 60
+# -----------------------------------------------------------------------------
+# Кэш. Версии ресурсов (reviews.versions), кэш ответов и счетчики
+# ограничения частоты запросов должны быть общими для всех процессов
+# сервера, поэтому по умолчанию кэш хранится в файлах (CACHE_DIR), с
+# атомарными счетчиками (api_yamdb.cache). На нескольких машинах нужен
+# Redis или Memcached. Неподходящие кэши отклоняет manage.py check.
+CACHES = {
+    'default': {
+        'BACKEND': 'api_yamdb.cache.AtomicFileBasedCache',
+        'LOCATION': os.getenv('CACHE_DIR', BASE_DIR / 'cache'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+# Кэш для версий ресурсов, по которым строятся ETag и Last-Modified.
+VERSION_STAMP_CACHE = 'default'
+# Кэш ответов анонимным пользователям на чтение каталога (api.v1).
+RESPONSE_CACHE = 'default'
+RESPONSE_CACHE_TIMEOUT = 5 * 60
+# Кэш счетчиков ограничения частоты запросов (api.v1.throttling).
+THROTTLE_CACHE = 'default'
+# -----------------------------------------------------------------------------
+# Массовое создание произведений (POST v1/titles/bulk/): сколько
+# произведений можно передать за запрос и размер пачки вставки.
+TITLES_BULK_MAX = 1000
+TITLES_BULK_BATCH_SIZE = 500
+# Сколько произведений можно запросить списком id (GET v1/titles/?ids=).
+TITLES_IDS_MAX = 50
+# -----------------------------------------------------------------------------
+# Метрики для Prometheus (api.metrics, /metrics).
+# Границы корзин гистограммы времени ответа, в секундах.
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Кэш для снимков счетчиков процессов; как часто процесс пишет снимок
+# и сколько хранится снимок процесса, который перестал работать.
+METRICS_CACHE = 'default'
+METRICS_FLUSH_SECONDS = 10
+METRICS_PROCESS_TIMEOUT = 24 * 60 * 60
+# -----------------------------------------------------------------------------
+# Диагностика запросов к БД (api.diagnostics): заголовки X-DB-*
+# и Server-Timing, лог медленных и повторяющихся (N+1) запросов.
+# Выключена по умолчанию, включается DB_DIAGNOSTICS=1.
+DB_DIAGNOSTICS = os.getenv('DB_DIAGNOSTICS', '') == '1'
+# Запрос дольше стольких миллисекунд пишется в лог как медленный.
+DB_SLOW_QUERY_MS = 100
+# Столько похожих запросов за один запрос к API - вероятная проблема N+1.
+DB_REPEATED_QUERY_THRESHOLD = 5
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'db_diagnostics': {
+            'class': 'logging.FileHandler',
+            'filename': BASE_DIR / 'slow_queries.log',
+            'encoding': 'utf-8',
+            # Файл создается при первой записи.
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'api.diagnostics': {
+            'handlers': ['db_diagnostics'],
+            'level': 'WARNING',
+        },
+    },
+}
 # -----------------------------------------------------------------------------
 # Настройки библиотеки Simple_JWT.
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=7),  # Время жизни токена 7 дней,
 }
+# Сколько секунд роль из токена (и из кэша проверенных токенов) считается
+# верной: изменение роли вступает в силу не позже этого срока.
+JWT_CLAIMS_TTL = 60
+# Сколько проверенных токенов держать в памяти процесса.
+JWT_CLAIMS_CACHE_SIZE = 10000
 # -----------------------------------------------------------------------------
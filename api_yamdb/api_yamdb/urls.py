@@ -2,9 +2,13 @@ from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import TemplateView
 
+from api.metrics import MetricsView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.v1.urls')),
+    # Метрики для Prometheus.
+    path('metrics', MetricsView.as_view(), name='metrics'),
     path(
         'redoc/',
         TemplateView.as_view(template_name='redoc.html'),
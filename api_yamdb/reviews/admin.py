@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Category, Comment, Genre, Review, Title, TitleGenre, User
+from .models import (Category, Comment, Genre, OutboxEmail, Review, Title,
+                     TitleGenre, User)
 
 # Добавление своей модели в админку.
 admin.site.register(User)
@@ -10,3 +11,10 @@ admin.site.register(Title)
 admin.site.register(TitleGenre)
 admin.site.register(Review)
 admin.site.register(Comment)
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('id', 'status', 'attempts', 'created', 'sent_at',
+                    'last_error')
+    list_filter = ('status',)
@@ -0,0 +1,38 @@
+"""
+Проверки настроек кэша (manage.py check, runserver, migrate).
+
+Версии ресурсов (VERSION_STAMP_CACHE), кэш ответов (RESPONSE_CACHE) и
+счетчики ограничения частоты запросов (THROTTLE_CACHE) должны быть общими
+для всех процессов сервера. У кэша в памяти процесса (LocMemCache) каждый
+процесс видит только свои записи: процессы отдавали бы устаревшие ETag и
+ответы, а лимит запросов умножался бы на число процессов. Поэтому такие
+кэши отклоняют reviews.E001 и api.E001, а для счетчиков api.E002 требует
+еще и атомарный incr. Снимки метрик (METRICS_CACHE) и отметки о записи
+для реплик (REPLICA_PIN_CACHE) по умолчанию хранятся в том же кэше.
+"""
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+PROCESS_LOCAL_BACKENDS = ('django.core.cache.backends.locmem.LocMemCache',)
+
+
+def process_local_cache_errors(setting_names, error_id):
+    """Ошибки для настроек, которые указывают на кэш в памяти процесса."""
+    errors = []
+    for name in setting_names:
+        alias = getattr(settings, name)
+        backend = settings.CACHES.get(alias, {}).get('BACKEND')
+        if backend in PROCESS_LOCAL_BACKENDS:
+            errors.append(Error(
+                f'{name} указывает на кэш {alias!r} в памяти процесса '
+                f'({backend}).',
+                hint='Укажите кэш, общий для всех процессов сервера: '
+                     'FileBasedCache, DatabaseCache, Redis или Memcached.',
+                id=error_id,
+            ))
+    return errors
+
+
+@register(Tags.caches)
+def check_version_stamp_cache(app_configs, **kwargs):
+    return process_local_cache_errors(['VERSION_STAMP_CACHE'], 'reviews.E001')
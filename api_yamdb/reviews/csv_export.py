@@ -0,0 +1,147 @@
+"""
+Потоковая выгрузка данных в CSV и NDJSON.
+
+Таблицы читаются кусками по первичному ключу (id > последний id LIMIT n),
+поэтому память не растет с размером таблицы. CSV выгружается в схемах
+static/data и снова загружается командой import_csv.
+
+Под ASGI Django 3.2 перебирает StreamingHttpResponse в цикле событий, где
+запросы к БД запрещены (SynchronousOnlyOperation), поэтому там каждый кусок
+читается в отдельном потоке (query_runner).
+"""
+import asyncio
+import csv
+import json
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+
+from .csv_import import SPECS
+from .models import Title, TitleGenre
+
+EXPORT_CHUNK_SIZE = 2000
+FORMATS = ('csv', 'ndjson')
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+# Имя выгрузки совпадает с именем файла импорта без расширения.
+EXPORT_SPECS = {spec.filename.rsplit('.', 1)[0]: spec for spec in SPECS}
+
+
+class Echo:
+    """Буфер для csv.writer, который сразу отдает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+@contextmanager
+def query_runner():
+    """
+    Функция, которая выполняет queryset и отдает список строк. В цикле
+    событий запрос выполняется в отдельном потоке, его соединение с БД
+    закрывается на выходе из блока with.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        yield list
+        return
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        yield lambda queryset: executor.submit(list, queryset).result()
+    finally:
+        executor.submit(connections.close_all).result()
+        executor.shutdown()
+
+
+def iterate_chunks(queryset, chunk_size=EXPORT_CHUNK_SIZE, fetch=list):
+    """
+    Отдает queryset.values_list(...) кусками по chunk_size строк.
+    Первое поле в values_list должно быть id; fetch выполняет запрос
+    куска (см. query_runner).
+    """
+    queryset = queryset.order_by('pk')
+    last_id = None
+    while True:
+        chunk = queryset if last_id is None else queryset.filter(
+            pk__gt=last_id
+        )
+        chunk = fetch(chunk[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1][0]
+
+
+def csv_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def export_rows(name, chunk_size=EXPORT_CHUNK_SIZE):
+    """Строки выгрузки: словари колонка CSV -> значение."""
+    spec = EXPORT_SPECS[name]
+    with query_runner() as fetch:
+        if name == 'titles':
+            yield from export_title_documents(chunk_size, fetch)
+            return
+        columns = list(spec.columns)
+        attnames = [attname for attname, _ in spec.columns.values()]
+        queryset = spec.model.objects.values_list(*attnames)
+        for chunk in iterate_chunks(queryset, chunk_size, fetch):
+            for row in chunk:
+                yield dict(zip(columns, row))
+
+
+def export_title_documents(chunk_size=EXPORT_CHUNK_SIZE, fetch=list):
+    """
+    Произведения вместе с категорией, жанрами и рейтингом.
+    Жанры подгружаются одним запросом на кусок.
+    """
+    queryset = Title.objects.values_list(
+        'id', 'name', 'year', 'description', 'category_id',
+        'category__slug', 'rating_sum', 'rating_count'
+    )
+    for chunk in iterate_chunks(queryset, chunk_size, fetch):
+        genres = {}
+        for title_id, slug in fetch(TitleGenre.objects.filter(
+                title_id__in=[row[0] for row in chunk]
+        ).order_by('id').values_list('title_id', 'genre__slug')):
+            genres.setdefault(title_id, []).append(slug)
+        for (title_id, name, year, description, category_id,
+             category_slug, rating_sum, rating_count) in chunk:
+            yield {
+                'id': title_id,
+                'name': name,
+                'year': year,
+                'category': category_id,
+                'description': description,
+                'category_slug': category_slug,
+                'genre': genres.get(title_id, []),
+                # Как в API: целая часть средней оценки.
+                'rating': (rating_sum // rating_count
+                           if rating_count else None),
+            }
+
+
+def stream_export(name, export_format, chunk_size=EXPORT_CHUNK_SIZE):
+    """Генератор строк файла выгрузки в формате csv или ndjson."""
+    rows = export_rows(name, chunk_size)
+    if export_format == 'ndjson':
+        for row in rows:
+            yield json.dumps(
+                row, cls=DjangoJSONEncoder, ensure_ascii=False
+            ) + '\n'
+        return
+    columns = list(EXPORT_SPECS[name].columns)
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([csv_value(row[column]) for column in columns])
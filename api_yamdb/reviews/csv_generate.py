@@ -0,0 +1,289 @@
+"""
+Синтетические CSV в схемах static/data для опытов с производительностью.
+
+Строки пишутся в файл по одной, в памяти держатся только накопленные веса
+пользователей, поэтому можно создать десятки миллионов строк. Популярность
+произведений и отзывов и активность пользователей распределены по Ципфу:
+вес k-го по популярности элемента пропорционален 1 / k ** skew. Отзывы
+делятся между произведениями пропорционально весам, комментарии - между
+отзывами, авторы выбираются по весам пользователей. Чтобы популярные
+записи не шли подряд, место в рейтинге переводится в id перестановкой
+(rank * step mod n). Один и тот же seed дает одни и те же файлы.
+"""
+import csv
+import math
+import random
+import time
+from array import array
+from bisect import bisect
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from .csv_import import SPECS_BY_FILENAME
+from .models import User
+
+WORDS = (
+    'фильм', 'книга', 'сюжет', 'герой', 'финал', 'автор', 'актер', 'музыка',
+    'сцена', 'история', 'смысл', 'режиссер', 'роман', 'альбом', 'сериал',
+    'отличный', 'скучный', 'сильный', 'неожиданный', 'затянутый', 'яркий',
+    'честный', 'странный', 'лучший', 'слабый', 'атмосферный', 'смешной',
+    'очень', 'совсем', 'вполне', 'снова', 'почти', 'точно', 'местами',
+    'понравился', 'удивил', 'разочаровал', 'рекомендую', 'пересмотрю',
+    'и', 'но', 'а', 'не', 'в', 'на', 'про', 'как', 'это', 'все',
+)
+# Время в UTC.
+START = datetime(2015, 1, 1)
+SPAN = timedelta(days=365 * 8).total_seconds()
+COMMENT_DELAY = timedelta(days=30).total_seconds()
+TEXTS = 1000
+# Доли модераторов и администраторов среди пользователей.
+ROLES = ((0.002, User.ADMIN), (0.02, User.MODERATOR))
+
+
+def zipf_weight(rank, skew):
+    return (rank + 1) ** -skew
+
+
+def pub_date(seconds):
+    # Формат static/data: 2019-09-24T21:08:21.567Z.
+    moment = START + timedelta(seconds=seconds)
+    return moment.isoformat(timespec='milliseconds') + 'Z'
+
+
+def sentences(rng, low, high):
+    """Набор текстов: собирать текст для каждой строки слишком долго."""
+    return [
+        ' '.join(rng.choices(WORDS, k=rng.randint(low, high))).capitalize()
+        + '.'
+        for _ in range(TEXTS)
+    ]
+
+
+class Scatter:
+    """Взаимно-однозначное соответствие места в рейтинге (0..n-1) и id."""
+
+    def __init__(self, size, rng):
+        self.size = size
+        step = rng.randrange(1, size) if size > 1 else 1
+        while math.gcd(step, size) != 1:
+            step += 1
+        self.step = step
+        self.inverse = pow(step, -1, size)
+        self.offset = rng.randrange(size)
+
+    def id(self, rank):
+        return (rank * self.step + self.offset) % self.size + 1
+
+    def rank(self, pk):
+        return (pk - 1 - self.offset) * self.inverse % self.size
+
+
+class ZipfSampler:
+    """Случайное место в рейтинге с вероятностью по Ципфу."""
+
+    def __init__(self, size, skew):
+        self.size = size
+        self.cumulative = array('d', accumulate(
+            zipf_weight(rank, skew) for rank in range(size)
+        ))
+
+    def __call__(self, rng):
+        rank = bisect(self.cumulative, rng.random() * self.cumulative[-1])
+        return min(rank, self.size - 1)
+
+
+def distribute(total, size, skew, scatter, cap=None):
+    """
+    Делит total между id 1..size пропорционально весам по Ципфу.
+    Самые популярные получают не больше cap, их излишек делится между
+    остальными. Дробные остатки переносятся на следующие id, поэтому сумма
+    равна total. Отдает (id, число).
+    """
+    remaining = sum(zipf_weight(rank, skew) for rank in range(size))
+    capped = 0
+    norm = total / remaining
+    if cap is not None:
+        # Веса убывают с местом, поэтому в cap упираются первые места.
+        while (capped < size
+               and norm * zipf_weight(capped, skew) > cap):
+            remaining -= zipf_weight(capped, skew)
+            capped += 1
+            norm = (total - capped * cap) / remaining if remaining else 0
+    # Последний id без ограничения получает остаток от округлений.
+    last = next(
+        (pk for pk in range(size, 0, -1) if scatter.rank(pk) >= capped), 0
+    )
+    given = 0
+    carry = 0.0
+    for pk in range(1, size + 1):
+        rank = scatter.rank(pk)
+        if pk == last:
+            # После него идут только id с ограничением cap.
+            count = max(total - given - (cap or 0) * (size - pk), 0)
+        elif rank < capped:
+            count = cap
+        else:
+            exact = norm * zipf_weight(rank, skew) + carry
+            count = int(exact)
+            carry = exact - count
+        if cap is not None:
+            count = min(count, cap)
+        given += count
+        yield pk, count
+
+
+class CsvGenerator:
+    """
+    Пишет в output_dir category.csv, genre.csv, titles.csv,
+    genre_title.csv, users.csv, review.csv и comments.csv.
+    """
+
+    def __init__(self, output_dir, titles=10000, users=1000, reviews=100000,
+                 comments=200000, categories=5, genres=20, max_genres=3,
+                 title_skew=1.0, review_skew=1.0, user_skew=1.0, seed=0):
+        if min(titles, users, categories, genres, max_genres) < 1:
+            raise ValueError(
+                'Произведений, пользователей, категорий и жанров должно '
+                'быть хотя бы по одному.'
+            )
+        if reviews > titles * users:
+            raise ValueError(
+                'Отзывов больше, чем пар произведение-пользователь: у '
+                'пользователя один отзыв на произведение.'
+            )
+        if comments and not reviews:
+            raise ValueError('Комментариям нужны отзывы.')
+        self.output_dir = output_dir
+        self.titles = titles
+        self.users = users
+        self.reviews = reviews
+        self.comments = comments
+        self.categories = categories
+        self.genres = genres
+        self.max_genres = min(max_genres, genres)
+        self.title_skew = title_skew
+        self.review_skew = review_skew
+        self.user_skew = user_skew
+        self.seed = seed
+        self.user_ids = Scatter(users, self.random('users-rank'))
+        self.user_sampler = None
+
+    def random(self, filename):
+        """Свой генератор на файл: файлы не зависят от порядка записи."""
+        return random.Random(f'{self.seed}:{filename}')
+
+    def category_rows(self, rng):
+        for pk in range(1, self.categories + 1):
+            yield pk, f'Категория {pk}', f'category-{pk}'
+
+    def genre_rows(self, rng):
+        for pk in range(1, self.genres + 1):
+            yield pk, f'Жанр {pk}', f'genre-{pk}'
+
+    def titles_rows(self, rng):
+        for pk in range(1, self.titles + 1):
+            yield (pk, f'Произведение {pk}', rng.randint(1900, 2025),
+                   rng.randint(1, self.categories))
+
+    def genre_title_rows(self, rng):
+        pk = 0
+        for title in range(1, self.titles + 1):
+            count = rng.randint(1, self.max_genres)
+            for genre in sorted(rng.sample(range(1, self.genres + 1), count)):
+                pk += 1
+                yield pk, title, genre
+
+    def users_rows(self, rng):
+        for pk in range(1, self.users + 1):
+            chance = rng.random()
+            role = next(
+                (role for share, role in ROLES if chance < share), User.USER
+            )
+            yield pk, f'user{pk}', f'user{pk}@yamdb.fake', role, '', '', ''
+
+    def author(self, rng):
+        if self.user_sampler is None:
+            self.user_sampler = ZipfSampler(self.users, self.user_skew)
+        return self.user_ids.id(self.user_sampler(rng))
+
+    def authors(self, rng, count):
+        """
+        count разных авторов по весам пользователей. Если популярные уже
+        заняты и выборка по весам повторяется, недостающие берутся подряд
+        со случайного id.
+        """
+        chosen = {}
+        for _ in range(4 * count):
+            if len(chosen) == count:
+                return chosen
+            chosen[self.author(rng)] = None
+        start = rng.randrange(self.users)
+        for offset in range(self.users):
+            if len(chosen) == count:
+                break
+            chosen[(start + offset) % self.users + 1] = None
+        return chosen
+
+    def review_rows(self, rng):
+        texts = sentences(rng, 10, 80)
+        pk = 0
+        counts = distribute(
+            self.reviews, self.titles, self.title_skew,
+            Scatter(self.titles, rng), cap=self.users
+        )
+        for title, count in counts:
+            for author in self.authors(rng, count):
+                pk += 1
+                yield (pk, title, rng.choice(texts), author,
+                       rng.randint(1, 10), pub_date(self.review_time(pk)))
+
+    def review_time(self, pk):
+        """Дата отзыва растет с id: комментарий к нему можно датировать
+        позже, не храня даты отзывов."""
+        return SPAN * (pk - 1) / self.reviews
+
+    def comments_rows(self, rng):
+        texts = sentences(rng, 3, 30)
+        pk = 0
+        counts = distribute(
+            self.comments, self.reviews, self.review_skew,
+            Scatter(self.reviews, rng)
+        ) if self.comments else ()
+        for review, count in counts:
+            for _ in range(count):
+                pk += 1
+                seconds = (self.review_time(review)
+                           + rng.random() * COMMENT_DELAY)
+                yield (pk, review, rng.choice(texts), self.author(rng),
+                       pub_date(seconds))
+
+    def write(self, filename, rows):
+        spec = SPECS_BY_FILENAME[filename]
+        # Схемы как в static/data: без необязательных колонок.
+        columns = [column for column in spec.columns
+                   if column not in spec.optional_columns]
+        path = self.output_dir / filename
+        count = 0
+        with open(path, 'w', encoding='utf-8', newline='') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        return count
+
+    def generate(self):
+        """Пишет все файлы; отдает (имя файла, строк, секунд)."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        for filename, rows in (
+            ('category.csv', self.category_rows),
+            ('genre.csv', self.genre_rows),
+            ('titles.csv', self.titles_rows),
+            ('genre_title.csv', self.genre_title_rows),
+            ('users.csv', self.users_rows),
+            ('review.csv', self.review_rows),
+            ('comments.csv', self.comments_rows),
+        ):
+            started = time.monotonic()
+            count = self.write(filename, rows(self.random(filename)))
+            yield filename, count, time.monotonic() - started
@@ -0,0 +1,623 @@
+"""
+Импорт CSV из static/data в базу.
+
+Файлы читаются построчно, внешние ключи проверяются по заранее загруженным
+множествам id, строки пишутся пачками (executemany) в транзакциях.
+Разбор, проверка и подготовка значений для БД можно вынести в пул
+процессов (ParallelCsvImporter); запись всегда идет в одном процессе
+в порядке зависимостей между файлами.
+
+В режиме изменений (delta) для каждой строки хранится хэш содержимого
+(ImportedRow): неизменившиеся строки пропускаются, изменившиеся
+обновляются, а записи, чьих строк больше нет в файле, удаляются.
+"""
+import csv
+import hashlib
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby, islice
+
+import django
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.core.exceptions import ValidationError
+from django.core.management.color import no_style
+from django.db import (DEFAULT_DB_ALIAS, IntegrityError, connection,
+                       connections, transaction)
+from django.utils.dateparse import parse_datetime
+
+from .models import (Category, Comment, Genre, ImportedRow, Review, Title,
+                     TitleGenre, User)
+from .ratings import rebuild_title_ratings
+from .sqlite import retry_on_locked
+from .versions import bump_model_versions
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def integer(value):
+    return int(value)
+
+
+def optional_integer(value):
+    return int(value) if value else None
+
+
+def text(value):
+    return value
+
+
+def optional_text(value):
+    return value or None
+
+
+def datetime(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(f'Неверная дата: {value!r}')
+    return parsed
+
+
+def error_message(error):
+    if isinstance(error, ValidationError):
+        return '; '.join(error.messages)
+    return str(error)
+
+
+class CsvSpec:
+    """
+    Описание одного CSV-файла: модель, колонки и внешние ключи.
+    columns: колонка CSV -> (attname поля модели, функция преобразования).
+    foreign_keys: attname -> модель, на которую ссылается поле.
+    optional_columns: колонки, которых может не быть в файле (тогда
+    значение - пустая строка).
+    defaults: значения полей, которых нет в CSV; остальные поля модели
+    со значением по умолчанию получают его, как при сохранении через ORM.
+    Разобранная строка - кортеж значений, готовых для INSERT,
+    в порядке self.fields.
+    """
+
+    def __init__(self, filename, model, columns, foreign_keys=None,
+                 defaults=None, optional_columns=()):
+        self.filename = filename
+        self.model = model
+        self.columns = columns
+        self.optional_columns = set(optional_columns)
+        self.foreign_keys = foreign_keys or {}
+        self.defaults = defaults or {}
+        self.fields = [attname for attname, _ in columns.values()]
+        self.fields += list(self.defaults)
+        # Значения из CSV и defaults однозначно определяются строкой файла,
+        # по ним считается хэш; поля по умолчанию модели (например,
+        # date_joined) в хэш не входят.
+        self.content_length = len(self.fields)
+        self.update_indexes = [
+            index for index, (attname, _) in enumerate(columns.values())
+            if attname != 'id'
+        ]
+        self.default_fields = [
+            field for field in model._meta.concrete_fields
+            if field.has_default() and field.attname not in self.fields
+        ]
+        self.fields += [field.attname for field in self.default_fields]
+        self.id_index = self.fields.index('id')
+        self.foreign_key_indexes = [
+            (self.fields.index(attname), attname, fk_model)
+            for attname, fk_model in self.foreign_keys.items()
+        ]
+        self.column_fields = [
+            (column, model._meta.get_field(attname), convert,
+             attname not in self.foreign_keys,
+             column in self.optional_columns)
+            for column, (attname, convert) in columns.items()
+        ]
+        self.default_values = [
+            (model._meta.get_field(attname), value)
+            for attname, value in self.defaults.items()
+        ]
+
+    def __repr__(self):
+        return f'<CsvSpec {self.filename}>'
+
+    @property
+    def dependencies(self):
+        return set(self.foreign_keys.values()) - {self.model}
+
+    def parse_rows(self, rows):
+        """
+        Разбирает пары (номер строки, строка CSV).
+        Возвращает список (номер строки, значения, текст ошибки).
+        """
+        # Прокси django.db.connection дорог в горячем цикле.
+        db = connections[DEFAULT_DB_ALIAS]
+        results = []
+        for line_number, row in rows:
+            try:
+                results.append((line_number, self.parse_row(row, db), None))
+            except (KeyError, ValueError, ValidationError) as error:
+                results.append((line_number, None, error_message(error)))
+        return results
+
+    @property
+    def insert_sql(self):
+        quote_name = connection.ops.quote_name
+        columns = ', '.join(
+            quote_name(self.model._meta.get_field(attname).column)
+            for attname in self.fields
+        )
+        placeholders = ', '.join(['%s'] * len(self.fields))
+        return (f'INSERT INTO {quote_name(self.model._meta.db_table)} '
+                f'({columns}) VALUES ({placeholders})')
+
+    @property
+    def update_sql(self):
+        quote_name = connection.ops.quote_name
+        columns = [self.model._meta.get_field(self.fields[index]).column
+                   for index in self.update_indexes]
+        assignments = ', '.join(
+            f'{quote_name(column)} = %s' for column in columns
+        )
+        return (f'UPDATE {quote_name(self.model._meta.db_table)} '
+                f'SET {assignments} WHERE {quote_name("id")} = %s')
+
+    def update_params(self, values):
+        """Параметры update_sql: поля из CSV, затем id."""
+        return tuple(values[index] for index in self.update_indexes) + (
+            values[self.id_index],
+        )
+
+    def row_hash(self, values):
+        content = repr(values[:self.content_length]).encode('utf-8')
+        return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+    def parse_row(self, row, db):
+        """
+        Преобразует строку CSV в значения для INSERT и проверяет их
+        валидаторами полей. Запросов к БД не делает.
+        """
+        values = []
+        for column, field, convert, validate, optional in self.column_fields:
+            value = convert(row.get(column, '') if optional else row[column])
+            # Пустое значение необязательной колонки - NULL без проверки
+            # (у TextField без blank=True проверка отвергла бы его).
+            if validate and not (optional and value is None):
+                value = field.clean(value, None)
+            values.append(field.get_db_prep_save(value, db))
+        for field, value in self.default_values:
+            values.append(field.get_db_prep_save(value, db))
+        for field in self.default_fields:
+            values.append(field.get_db_prep_save(field.get_default(), db))
+        return tuple(values)
+
+    def check_foreign_keys(self, values, id_maps):
+        for index, attname, model in self.foreign_key_indexes:
+            value = values[index]
+            if value is not None and value not in id_maps[model]:
+                raise ValidationError(
+                    f'{model.__name__} с id={value} не найден '
+                    f'(поле {attname}).'
+                )
+
+
+SPECS = (
+    CsvSpec('category.csv', Category, {
+        'id': ('id', integer),
+        'name': ('name', text),
+        'slug': ('slug', text),
+    }),
+    CsvSpec('genre.csv', Genre, {
+        'id': ('id', integer),
+        'name': ('name', text),
+        'slug': ('slug', text),
+    }),
+    CsvSpec('titles.csv', Title, {
+        'id': ('id', integer),
+        'name': ('name', text),
+        'year': ('year', integer),
+        'category': ('category_id', optional_integer),
+        'description': ('description', optional_text),
+    }, foreign_keys={'category_id': Category},
+        optional_columns=('description',)),
+    CsvSpec('genre_title.csv', TitleGenre, {
+        'id': ('id', integer),
+        'title_id': ('title_id', integer),
+        'genre_id': ('genre_id', integer),
+    }, foreign_keys={'title_id': Title, 'genre_id': Genre}),
+    CsvSpec('users.csv', User, {
+        'id': ('id', integer),
+        'username': ('username', text),
+        'email': ('email', text),
+        'role': ('role', text),
+        'bio': ('bio', optional_text),
+        'first_name': ('first_name', text),
+        'last_name': ('last_name', text),
+    }, defaults={'password': UNUSABLE_PASSWORD_PREFIX}),
+    CsvSpec('review.csv', Review, {
+        'id': ('id', integer),
+        'title_id': ('title_id', integer),
+        'text': ('text', text),
+        'author': ('author_id', integer),
+        'score': ('score', integer),
+        'pub_date': ('pub_date', datetime),
+    }, foreign_keys={'title_id': Title, 'author_id': User}),
+    CsvSpec('comments.csv', Comment, {
+        'id': ('id', integer),
+        'review_id': ('review_id', integer),
+        'text': ('text', text),
+        'author': ('author_id', integer),
+        'pub_date': ('pub_date', datetime),
+    }, foreign_keys={'review_id': Review, 'author_id': User}),
+)
+SPECS_BY_FILENAME = {spec.filename: spec for spec in SPECS}
+
+
+def ordered_specs(specs):
+    """
+    Топологическая сортировка файлов по внешним ключам: файл идет после
+    всех файлов, на модели которых он ссылается.
+    """
+    pending = list(specs)
+    models = {spec.model for spec in pending}
+    done = set()
+    ordered = []
+    while pending:
+        ready = [spec for spec in pending
+                 if not (spec.dependencies & models) - done]
+        if not ready:
+            raise ValueError(f'Циклическая зависимость между {pending}')
+        for spec in ready:
+            pending.remove(spec)
+            done.add(spec.model)
+            ordered.append(spec)
+    return ordered
+
+
+class ImportStats:
+    """Счетчики импорта одного файла."""
+
+    def __init__(self, filename, delta=False):
+        self.filename = filename
+        self.delta = delta
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.deleted = 0
+        self.unchanged = 0
+        self.skipped = 0
+        self.errors = 0
+        # id записей, импортированных ранее, но отсутствующих в файле.
+        self.missing = set()
+        self.started = time.monotonic()
+        self.elapsed = 0.0
+
+    @property
+    def changed(self):
+        return self.created + self.updated + self.deleted
+
+    def finish(self):
+        self.elapsed = time.monotonic() - self.started
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        if self.delta:
+            counters = (
+                f'создано {self.created}, обновлено {self.updated}, '
+                f'удалено {self.deleted}, без изменений {self.unchanged}'
+            )
+        else:
+            counters = f'создано {self.created}, уже было {self.skipped}'
+        return (
+            f'{self.filename}: строк {self.rows}, {counters}, '
+            f'ошибок {self.errors}; '
+            f'{self.elapsed:.2f} с, {self.rows_per_second:.0f} строк/с'
+        )
+
+
+def read_rows(path):
+    """Построчно читает CSV, не загружая файл в память."""
+    with open(path, encoding='utf-8', newline='') as csv_file:
+        for line_number, row in enumerate(csv.DictReader(csv_file), 2):
+            yield line_number, row
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def load_id_maps(specs):
+    """
+    Множества существующих id для моделей из specs и моделей,
+    на которые они ссылаются.
+    """
+    models = set()
+    for spec in specs:
+        models.add(spec.model)
+        models.update(spec.foreign_keys.values())
+    return {
+        model: set(model.objects.values_list('pk', flat=True).iterator())
+        for model in models
+    }
+
+
+class CsvImporter:
+    """
+    Импортирует файлы по SPECS в порядке зависимостей, в одном процессе.
+    on_error(spec, line_number, message) вызывается для каждой
+    ошибочной строки.
+    delta: импорт изменений по хэшам строк (см. описание модуля).
+    dry_run: только подсчитать изменения, ничего не записывая.
+    """
+
+    def __init__(self, data_dir, batch_size=DEFAULT_BATCH_SIZE,
+                 on_error=None, specs=SPECS, delta=False, dry_run=False):
+        self.data_dir = data_dir
+        self.batch_size = batch_size
+        self.on_error = on_error or (lambda spec, line_number, message: None)
+        self.specs = specs
+        self.delta = delta
+        self.dry_run = dry_run
+        self.id_maps = {}
+
+    def path(self, spec):
+        return self.data_dir / spec.filename
+
+    def run(self):
+        """Импортирует все файлы. Возвращает список ImportStats."""
+        specs = ordered_specs(
+            spec for spec in self.specs if self.path(spec).exists()
+        )
+        self.id_maps = load_id_maps(specs)
+        results = self.import_files(specs)
+        if self.delta:
+            self.delete_missing(specs, results)
+        if not self.dry_run:
+            self.finish(specs, results)
+        return results
+
+    def import_files(self, specs):
+        return [
+            self.write_file(spec, self.parse_file(spec)) for spec in specs
+        ]
+
+    def parse_file(self, spec):
+        for line_number, row in read_rows(self.path(spec)):
+            yield from spec.parse_rows([(line_number, row)])
+
+    def finish(self, specs, results):
+        changed = {stats.filename for stats in results if stats.changed}
+        models = [spec.model for spec in specs if spec.filename in changed]
+        # Запись идет в обход ORM и сигналов, поэтому рейтинги
+        # пересчитываются целиком, версии ресурсов (reviews.versions)
+        # заменяются явно; счетчики id (кроме SQLite) выставляются
+        # после вставки явных id.
+        if Review in models:
+            rebuild_title_ratings()
+        bump_model_versions(*models)
+        sequence_sql = connection.ops.sequence_reset_sql(no_style(), models)
+        if sequence_sql:
+            with connection.cursor() as cursor:
+                for sql in sequence_sql:
+                    cursor.execute(sql)
+
+    def write_file(self, spec, parsed_rows):
+        """
+        Пишет разобранные строки одного файла пачками по batch_size.
+        parsed_rows: (номер строки, значения, текст ошибки).
+        """
+        if self.delta:
+            return self.write_file_delta(spec, parsed_rows)
+        stats = ImportStats(spec.filename)
+        batch = []
+        for line_number, values, error in parsed_rows:
+            stats.rows += 1
+            if error is not None:
+                self.add_error(spec, line_number, error, stats)
+                continue
+            self.add_row(spec, line_number, values, batch, stats)
+            if len(batch) >= self.batch_size:
+                self.write_batch(spec, batch, stats)
+                batch = []
+        self.write_batch(spec, batch, stats)
+        stats.finish()
+        return stats
+
+    def write_file_delta(self, spec, parsed_rows):
+        """
+        Пишет только новые и изменившиеся строки. Строка не изменилась,
+        если ее хэш совпадает с сохраненным и запись все еще есть в БД.
+        """
+        stats = ImportStats(spec.filename, delta=True)
+        stored = dict(
+            ImportedRow.objects.filter(source=spec.filename)
+            .values_list('object_id', 'content_hash').iterator()
+        )
+        existing = self.id_maps[spec.model]
+        seen = set()
+        inserts, updates = [], []
+        for line_number, values, error in parsed_rows:
+            stats.rows += 1
+            if error is not None:
+                self.add_error(spec, line_number, error, stats)
+                continue
+            object_id = values[spec.id_index]
+            seen.add(object_id)
+            if (object_id in existing
+                    and stored.get(object_id) == spec.row_hash(values)):
+                stats.unchanged += 1
+                continue
+            try:
+                spec.check_foreign_keys(values, self.id_maps)
+            except ValidationError as error:
+                self.add_error(spec, line_number, error_message(error), stats)
+                continue
+            if object_id in existing:
+                updates.append((line_number, values))
+            else:
+                existing.add(object_id)
+                inserts.append((line_number, values))
+            for batch, update in ((inserts, False), (updates, True)):
+                if len(batch) >= self.batch_size:
+                    self.write_batch(spec, batch, stats, update)
+                    batch.clear()
+        self.write_batch(spec, inserts, stats)
+        self.write_batch(spec, updates, stats, update=True)
+        # Если часть строк не разобрана, их id неизвестны: удалять
+        # по такому файлу нельзя.
+        if not stats.errors:
+            stats.missing = set(stored) - seen
+        stats.finish()
+        return stats
+
+    def delete_missing(self, specs, results):
+        """
+        Удаляет записи, строк которых больше нет в файлах. Идет в обратном
+        порядке зависимостей через ORM, чтобы сработали каскады и сигналы.
+        """
+        stats_by_filename = {stats.filename: stats for stats in results}
+        for spec in reversed(specs):
+            stats = stats_by_filename[spec.filename]
+            missing = sorted(stats.missing)
+            if self.dry_run:
+                stats.deleted = len(missing)
+                continue
+            for start in range(0, len(missing), self.batch_size):
+                chunk = missing[start:start + self.batch_size]
+                with transaction.atomic():
+                    spec.model.objects.filter(pk__in=chunk).delete()
+                    ImportedRow.objects.filter(
+                        source=spec.filename, object_id__in=chunk
+                    ).delete()
+                stats.deleted += len(chunk)
+
+    def add_error(self, spec, line_number, message, stats):
+        stats.errors += 1
+        self.on_error(spec, line_number, message)
+
+    def add_row(self, spec, line_number, values, batch, stats):
+        existing = self.id_maps[spec.model]
+        try:
+            spec.check_foreign_keys(values, self.id_maps)
+        except ValidationError as error:
+            self.add_error(spec, line_number, error_message(error), stats)
+            return
+        if values[spec.id_index] in existing:
+            stats.skipped += 1
+            return
+        existing.add(values[spec.id_index])
+        batch.append((line_number, values))
+
+    def write_batch(self, spec, batch, stats, update=False):
+        if not batch:
+            return
+        if self.dry_run:
+            self.count_written(stats, len(batch), update)
+            return
+        try:
+            self.execute(spec, batch, update)
+            self.count_written(stats, len(batch), update)
+        except IntegrityError:
+            # В пачке есть строка, нарушающая ограничение БД:
+            # пачка повторяется построчно, чтобы найти такие строки.
+            self.write_rows(spec, batch, stats, update)
+
+    def write_rows(self, spec, batch, stats, update):
+        for line_number, values in batch:
+            try:
+                self.execute(spec, [(line_number, values)], update)
+                self.count_written(stats, 1, update)
+            except IntegrityError as error:
+                if not update:
+                    self.id_maps[spec.model].discard(values[spec.id_index])
+                self.add_error(spec, line_number, str(error), stats)
+
+    def count_written(self, stats, count, update):
+        if update:
+            stats.updated += count
+        else:
+            stats.created += count
+
+    @retry_on_locked
+    def execute(self, spec, batch, update=False):
+        if update:
+            sql = spec.update_sql
+            params = [spec.update_params(values) for _, values in batch]
+        else:
+            sql = spec.insert_sql
+            params = [values for _, values in batch]
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, params)
+            if self.delta:
+                self.save_hashes(cursor, spec, batch)
+
+    def save_hashes(self, cursor, spec, batch):
+        quote_name = connection.ops.quote_name
+        cursor.executemany(
+            f'INSERT INTO {quote_name(ImportedRow._meta.db_table)} '
+            '(source, object_id, content_hash) VALUES (%s, %s, %s) '
+            'ON CONFLICT (source, object_id) '
+            'DO UPDATE SET content_hash = excluded.content_hash',
+            [(spec.filename, values[spec.id_index], spec.row_hash(values))
+             for _, values in batch]
+        )
+
+
+def parse_chunk(filename, rows):
+    """Разбор части файла в процессе пула."""
+    return SPECS_BY_FILENAME[filename].parse_rows(rows)
+
+
+class ParallelCsvImporter(CsvImporter):
+    """
+    Разбор и проверка строк идут в пуле процессов кусками по chunk_size,
+    сразу по нескольким файлам: очередь кусков сквозная, поэтому пока
+    пишется один файл, следующие (независимые от записи) уже разбираются.
+    Запись остается последовательной, в порядке зависимостей.
+    Память ограничена окном из workers * 2 кусков в работе.
+    """
+
+    def __init__(self, data_dir, workers, chunk_size=DEFAULT_CHUNK_SIZE,
+                 **kwargs):
+        super().__init__(data_dir, **kwargs)
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.window = workers * 2
+
+    def import_files(self, specs):
+        # Процессы не обращаются к БД: им нужны только модели и валидаторы.
+        with ProcessPoolExecutor(self.workers,
+                                 initializer=django.setup) as pool:
+            stats = {}
+            chunks = self.submit_chunks(pool, specs)
+            for spec, futures in groupby(chunks, key=lambda item: item[0]):
+                parsed_rows = (
+                    row for _, future in futures for row in future.result()
+                )
+                stats[spec] = self.write_file(spec, parsed_rows)
+        # Пустые файлы не дают ни одного куска.
+        return [stats.get(spec) or self.write_file(spec, ())
+                for spec in specs]
+
+    def submit_chunks(self, pool, specs):
+        """
+        Отправляет куски всех файлов в пул по порядку и отдает пары
+        (spec, future) в том же порядке, держа в работе не больше window.
+        """
+        in_flight = deque()
+        for spec in specs:
+            for chunk in chunked(read_rows(self.path(spec)), self.chunk_size):
+                in_flight.append(
+                    (spec, pool.submit(parse_chunk, spec.filename, chunk))
+                )
+                if len(in_flight) >= self.window:
+                    yield in_flight.popleft()
+        while in_flight:
+            yield in_flight.popleft()
@@ -0,0 +1,74 @@
+import os
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from reviews.csv_import import (DEFAULT_BATCH_SIZE, DEFAULT_CHUNK_SIZE,
+                                CsvImporter, ParallelCsvImporter)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает последовательный импорт CSV и импорт с пулом процессов. '
+        'Работает на временной тестовой базе, рабочая база не меняется.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--data-dir', type=Path,
+            default=settings.BASE_DIR / 'static' / 'data',
+            help='Папка с CSV-файлами (например, сгенерированный дамп).'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Процессов для параллельного импорта.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        data_dir = options['data_dir']
+        importers = (
+            ('последовательно', CsvImporter(
+                data_dir, batch_size=options['batch_size']
+            )),
+            (f'пул из {options["workers"]} процессов', ParallelCsvImporter(
+                data_dir, options['workers'],
+                chunk_size=options['chunk_size'],
+                batch_size=options['batch_size'],
+            )),
+        )
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            timings = [self.measure(name, importer)
+                       for name, importer in importers]
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        sequential, parallel = timings
+        self.stdout.write(self.style.SUCCESS(
+            f'Ускорение: {sequential / parallel:.2f}x'
+        ))
+
+    def measure(self, name, importer):
+        call_command('flush', interactive=False, verbosity=0)
+        started = time.monotonic()
+        results = importer.run()
+        elapsed = time.monotonic() - started
+        rows = sum(stats.rows for stats in results)
+        self.stdout.write(self.style.MIGRATE_HEADING(name))
+        for stats in results:
+            self.stdout.write(f'  {stats}')
+        self.stdout.write(
+            f'  всего: {rows} строк за {elapsed:.2f} с, '
+            f'{rows / elapsed:.0f} строк/с'
+        )
+        return elapsed
@@ -0,0 +1,142 @@
+import multiprocessing
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+
+from reviews.models import Category, Title
+from reviews.sqlite import retry_on_locked
+
+
+def read_titles(rng, titles):
+    list(
+        Title.objects.filter(year__gte=rng.randint(1900, 2020))
+        .select_related('category')[:10]
+    )
+
+
+@retry_on_locked
+def write_title(rng, titles):
+    # Чтение и запись в одной транзакции: так под нагрузкой и возникает
+    # `database is locked`.
+    with transaction.atomic():
+        title = Title.objects.get(pk=rng.randint(1, titles))
+        title.description = f'Изменено {time.time()}'
+        title.save(update_fields=['description'])
+
+
+def run_worker(role, seconds, titles, queue):
+    rng = random.Random()
+    operation = write_title if role == 'write' else read_titles
+    ops = errors = 0
+    latencies = []
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        started = time.monotonic()
+        try:
+            operation(rng, titles)
+        except OperationalError:
+            errors += 1
+            continue
+        latencies.append(time.monotonic() - started)
+        ops += 1
+    connections.close_all()
+    queue.put((role, ops, errors, latencies))
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает конкурентное чтение и запись в SQLite без настройки '
+        'и с SQLITE_PRAGMAS и повторами. Работает на временных копиях '
+        'базы, рабочая база не меняется.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4,
+                            help='Процессов-читателей.')
+        parser.add_argument('--writers', type=int, default=2,
+                            help='Процессов-писателей.')
+        parser.add_argument('--seconds', type=float, default=5.0,
+                            help='Длительность каждого прогона.')
+        parser.add_argument('--titles', type=int, default=1000,
+                            help='Произведений в тестовой базе.')
+
+    def use_database(self, path, tuned):
+        connections.close_all()
+        settings.DATABASES['default']['NAME'] = str(path)
+        connections['default'].settings_dict['NAME'] = str(path)
+        settings.SQLITE_PRAGMAS = self.pragmas if tuned else {}
+        settings.SQLITE_WRITE_RETRIES = self.retries if tuned else 0
+
+    def seed(self, titles):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {number}', year=1900 + number % 120,
+                  category=category)
+            for number in range(titles)
+        )
+
+    def run(self, options):
+        context = multiprocessing.get_context('fork')
+        queue = context.Queue()
+        roles = (['read'] * options['readers']
+                 + ['write'] * options['writers'])
+        processes = [
+            context.Process(target=run_worker, args=(
+                role, options['seconds'], options['titles'], queue
+            ))
+            for role in roles
+        ]
+        for process in processes:
+            process.start()
+        results = [queue.get() for _ in processes]
+        for process in processes:
+            process.join()
+        return results
+
+    def report(self, mode, results, seconds):
+        self.stdout.write(mode)
+        for role, name in (('read', 'чтение'), ('write', 'запись')):
+            ops = sum(result[1] for result in results if result[0] == role)
+            errors = sum(result[2] for result in results if result[0] == role)
+            latencies = sorted(
+                latency for result in results if result[0] == role
+                for latency in result[3]
+            )
+            p95 = (statistics.quantiles(latencies, n=20)[-1] * 1000
+                   if len(latencies) > 1 else 0.0)
+            self.stdout.write(
+                f'  {name}: {ops / seconds:.0f} оп/с, p95 {p95:.1f} мс, '
+                f'ошибок блокировки {errors}'
+            )
+
+    def handle(self, *args, **options):
+        self.pragmas = settings.SQLITE_PRAGMAS
+        self.retries = settings.SQLITE_WRITE_RETRIES
+        old_name = settings.DATABASES['default']['NAME']
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                seed = Path(tmp) / 'seed.sqlite3'
+                self.use_database(seed, tuned=False)
+                call_command('migrate', verbosity=0)
+                self.seed(options['titles'])
+                for mode, tuned in (('Без настройки:', False),
+                                    ('WAL, PRAGMA и повторы:', True)):
+                    path = Path(tmp) / f'{int(tuned)}.sqlite3'
+                    connections.close_all()
+                    shutil.copy(seed, path)
+                    self.use_database(path, tuned)
+                    # Соединение открывается до запуска процессов, чтобы
+                    # PRAGMA journal_mode переключила файл базы в WAL.
+                    connections['default'].ensure_connection()
+                    connections.close_all()
+                    self.report(mode, self.run(options), options['seconds'])
+        finally:
+            self.use_database(old_name, tuned=True)
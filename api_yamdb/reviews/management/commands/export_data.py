@@ -0,0 +1,45 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.csv_export import (EXPORT_CHUNK_SIZE, EXPORT_SPECS, FORMATS,
+                                stream_export)
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает данные в CSV (схемы static/data, пригодны для import_csv) '
+        'или NDJSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'names', nargs='*',
+            help=f'Что выгружать: {", ".join(EXPORT_SPECS)} (по умолчанию - '
+                 f'все).'
+        )
+        parser.add_argument(
+            '--output-dir', type=Path, required=True,
+            help='Папка для файлов выгрузки.'
+        )
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument(
+            '--chunk-size', type=int, default=EXPORT_CHUNK_SIZE,
+            help='Строк, читаемых из БД за один запрос.'
+        )
+
+    def handle(self, *args, **options):
+        names = options['names'] or list(EXPORT_SPECS)
+        unknown = set(names) - set(EXPORT_SPECS)
+        if unknown:
+            raise CommandError(f'Неизвестные выгрузки: {", ".join(unknown)}')
+        output_dir = options['output_dir']
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for name in names:
+            path = output_dir / f'{name}.{options["format"]}'
+            with open(path, 'w', encoding='utf-8', newline='') as file:
+                for line in stream_export(
+                        name, options['format'], options['chunk_size']
+                ):
+                    file.write(line)
+            self.stdout.write(self.style.SUCCESS(f'{path}'))
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.csv_generate import CsvGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        'Создает синтетические CSV в схемах static/data заданного объема '
+        '(для import_csv и опытов с производительностью).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-dir', type=Path, required=True,
+            help='Папка для CSV-файлов.'
+        )
+        parser.add_argument('--titles', type=int, default=10000,
+                            help='Произведений.')
+        parser.add_argument('--users', type=int, default=1000,
+                            help='Пользователей.')
+        parser.add_argument('--reviews', type=int, default=100000,
+                            help='Отзывов.')
+        parser.add_argument('--comments', type=int, default=200000,
+                            help='Комментариев.')
+        parser.add_argument('--categories', type=int, default=5,
+                            help='Категорий.')
+        parser.add_argument('--genres', type=int, default=20,
+                            help='Жанров.')
+        parser.add_argument('--max-genres', type=int, default=3,
+                            help='Больше всего жанров у произведения.')
+        parser.add_argument(
+            '--title-skew', type=float, default=1.0,
+            help='Показатель Ципфа для отзывов на произведение '
+                 '(0 - поровну).'
+        )
+        parser.add_argument(
+            '--review-skew', type=float, default=1.0,
+            help='Показатель Ципфа для комментариев к отзыву.'
+        )
+        parser.add_argument(
+            '--user-skew', type=float, default=1.0,
+            help='Показатель Ципфа для отзывов и комментариев пользователя.'
+        )
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Seed: одинаковый дает одинаковые файлы.')
+
+    def handle(self, *args, **options):
+        try:
+            generator = CsvGenerator(
+                options['output_dir'],
+                titles=options['titles'],
+                users=options['users'],
+                reviews=options['reviews'],
+                comments=options['comments'],
+                categories=options['categories'],
+                genres=options['genres'],
+                max_genres=options['max_genres'],
+                title_skew=options['title_skew'],
+                review_skew=options['review_skew'],
+                user_skew=options['user_skew'],
+                seed=options['seed'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        for filename, rows, seconds in generator.generate():
+            self.stdout.write(self.style.SUCCESS(
+                f'{filename}: строк {rows}; {seconds:.2f} с, '
+                f'{rows / seconds if seconds else 0:.0f} строк/с'
+            ))
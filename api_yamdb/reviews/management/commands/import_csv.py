@@ -0,0 +1,66 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from reviews.csv_import import (DEFAULT_BATCH_SIZE, DEFAULT_CHUNK_SIZE,
+                                CsvImporter, ParallelCsvImporter)
+
+
+class Command(BaseCommand):
+    help = 'Импортирует CSV-файлы из static/data в базу данных.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--data-dir', type=Path,
+            default=settings.BASE_DIR / 'static' / 'data',
+            help='Папка с CSV-файлами.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Количество строк в одной пачке вставки.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=0,
+            help='Процессов для разбора строк (0 - без пула процессов).'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help='Строк в одном куске для пула процессов.'
+        )
+        parser.add_argument(
+            '--delta', action='store_true',
+            help='Импорт изменений: записать только новые и изменившиеся '
+                 'строки и удалить записи, строк которых больше нет.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать сводку изменений, ничего не записывая.'
+        )
+        parser.add_argument(
+            '--print-errors', action='store_true',
+            help='Печатать каждую ошибочную строку.'
+        )
+
+    def handle(self, *args, **options):
+        kwargs = {
+            'batch_size': options['batch_size'],
+            'on_error': self.print_error if options['print_errors'] else None,
+            'delta': options['delta'],
+            'dry_run': options['dry_run'],
+        }
+        if options['workers'] > 0:
+            importer = ParallelCsvImporter(
+                options['data_dir'], options['workers'],
+                chunk_size=options['chunk_size'], **kwargs
+            )
+        else:
+            importer = CsvImporter(options['data_dir'], **kwargs)
+        if options['dry_run']:
+            self.stdout.write('Пробный запуск: изменения не записываются.')
+        for stats in importer.run():
+            style = self.style.WARNING if stats.errors else self.style.SUCCESS
+            self.stdout.write(style(str(stats)))
+
+    def print_error(self, spec, line_number, message):
+        self.stderr.write(f'{spec.filename}:{line_number}: {message}')
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.ratings import rebuild_title_ratings
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает хранимые рейтинги произведений по отзывам.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = rebuild_title_ratings()
+        self.stdout.write(
+            self.style.SUCCESS(f'Рейтинги пересчитаны: {updated} произв.')
+        )
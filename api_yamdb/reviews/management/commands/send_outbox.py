@@ -0,0 +1,55 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from reviews.outbox import drain
+
+
+def drain_in_thread(batch_size):
+    try:
+        return drain(batch_size)
+    finally:
+        # У каждого потока свое соединение с БД.
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из очереди (reviews.outbox) пачками; '
+        'с --loop работает постоянно.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Количество параллельных обработчиков.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.OUTBOX_BATCH_SIZE,
+            help='Писем в пачке (на одно соединение с почтовым сервером).'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, проверять очередь каждые --interval с.'
+        )
+        parser.add_argument('--interval', type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        workers = max(options['workers'], 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while True:
+                results = list(executor.map(
+                    drain_in_thread, [options['batch_size']] * workers
+                ))
+                sent, retried, failed = map(sum, zip(*results))
+                if sent or retried or failed or not options['loop']:
+                    self.stdout.write(
+                        f'отправлено {sent}, отложено {retried}, '
+                        f'не отправлено {failed}'
+                    )
+                if not options['loop']:
+                    return
+                time.sleep(options['interval'])
@@ -0,0 +1,60 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную БД SQLite в реплики: локальная замена '
+        'репликации для проверки чтения с реплик.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'aliases', nargs='*',
+            help='Алиасы реплик (по умолчанию - DATABASE_REPLICAS).'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Повторять копирование каждые --interval с.'
+        )
+        parser.add_argument('--interval', type=float, default=1.0)
+
+    def handle(self, *args, **options):
+        aliases = options['aliases'] or settings.DATABASE_REPLICAS
+        if not aliases:
+            raise CommandError(
+                'Не заданы реплики: укажите их аргументами или в '
+                'DATABASE_REPLICAS.'
+            )
+        primary = connections[DEFAULT_DB_ALIAS]
+        for alias in [DEFAULT_DB_ALIAS, *aliases]:
+            if connections[alias].vendor != 'sqlite':
+                raise CommandError(
+                    f'{alias}: копирование поддерживается только для SQLite, '
+                    f'для других СУБД используйте их репликацию.'
+                )
+        while True:
+            primary.ensure_connection()
+            for alias in aliases:
+                started = time.monotonic()
+                connections[alias].close()
+                target = sqlite3.connect(
+                    str(connections[alias].settings_dict['NAME'])
+                )
+                try:
+                    # Backup API дает согласованный снимок и при записи
+                    # в основную БД в это же время.
+                    primary.connection.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(
+                    f'{alias}: скопировано за '
+                    f'{time.monotonic() - started:.2f} с'
+                )
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
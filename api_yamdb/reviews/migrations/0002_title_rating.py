@@ -0,0 +1,36 @@
+# Generated by Django 3.2 on 2026-10-17 17:11
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_title_ratings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    aggregates = (Review.objects.order_by().values('title_id')
+                  .annotate(total=Sum('score'), count=Count('id')))
+    for row in aggregates.iterator():
+        Title.objects.filter(pk=row['title_id']).update(
+            rating_sum=row['total'], rating_count=row['count']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Количество оценок'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_title_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+from django.db import migrations
+
+# Полнотекстовый индекс по названию и описанию произведений (SQLite FTS5).
+# Таблица хранит только индекс (external content), данные читаются из
+# reviews_title. Синхронизацию выполняют триггеры, поэтому индекс
+# обновляется при любой записи, включая bulk-операции и импорт.
+CREATE_SQL = (
+    """
+    CREATE VIRTUAL TABLE reviews_title_fts USING fts5(
+        name, description,
+        content='reviews_title', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER reviews_title_fts_ai AFTER INSERT ON reviews_title BEGIN
+        INSERT INTO reviews_title_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER reviews_title_fts_ad AFTER DELETE ON reviews_title BEGIN
+        INSERT INTO reviews_title_fts(
+            reviews_title_fts, rowid, name, description
+        ) VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    # Только name и description: обновление рейтинга индекс не трогает.
+    """
+    CREATE TRIGGER reviews_title_fts_au
+    AFTER UPDATE OF name, description ON reviews_title BEGIN
+        INSERT INTO reviews_title_fts(
+            reviews_title_fts, rowid, name, description
+        ) VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO reviews_title_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    "INSERT INTO reviews_title_fts(reviews_title_fts) VALUES ('rebuild')",
+)
+
+DROP_SQL = (
+    'DROP TRIGGER IF EXISTS reviews_title_fts_au',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_ad',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_ai',
+    'DROP TABLE IF EXISTS reviews_title_fts',
+)
+
+
+def run_sqlite(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_sqlite(CREATE_SQL), run_sqlite(DROP_SQL)),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 3.2 on 2026-10-17 17:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_title_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportedRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=50, verbose_name='Файл CSV')),
+                ('object_id', models.BigIntegerField(verbose_name='id записи')),
+                ('content_hash', models.CharField(max_length=32, verbose_name='Хэш строки')),
+            ],
+            options={
+                'verbose_name': 'Импортированная строка',
+                'verbose_name_plural': 'Импортированные строки',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='importedrow',
+            constraint=models.UniqueConstraint(fields=('source', 'object_id'), name='uq_importedrow_source_object'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.utils import timezone
 
 from .validators import validate_year
 
@@ -95,14 +96,37 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='Slug категории'
     )
+    # Агрегаты оценок хранятся в таблице произведения и обновляются
+    # при каждом изменении отзыва (см. reviews/signals.py).
+    rating_sum = models.PositiveIntegerField(
+        default=0, verbose_name='Сумма оценок'
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0, verbose_name='Количество оценок'
+    )
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        # Индексы под фильтры FilterTitleSet (category, year, name).
+        indexes = [
+            models.Index(
+                fields=['category', 'year'], name='title_category_year_idx'
+            ),
+            models.Index(fields=['year'], name='title_year_idx'),
+            models.Index(fields=['name'], name='title_name_idx'),
+        ]
 
     def __str__(self):
         return self.name[:LEN_NAME]
 
+    @property
+    def rating(self):
+        """Средняя оценка произведения или None, если отзывов нет."""
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
 
 class TitleGenre(models.Model):
     """Модель произведение-жанр."""
@@ -127,6 +151,12 @@ class TitleGenre(models.Model):
                 name='uq_title_genre'
             )
         ]
+        # Покрывающий индекс для поиска произведений по жанру.
+        indexes = [
+            models.Index(
+                fields=['genre', 'title'], name='titlegenre_genre_title_idx'
+            ),
+        ]
 
 
 class Review(models.Model):
@@ -166,10 +196,25 @@ class Review(models.Model):
                 name='uq_title_author'
             )
         ]
+        # Отзывы произведения от новых к старым.
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', '-id'],
+                name='review_title_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:LEN_TEXT]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Оценка на момент загрузки нужна, чтобы при сохранении
+        # скорректировать рейтинг произведения на разницу.
+        instance._loaded_score = instance.__dict__.get('score')
+        return instance
+
 
 class Comment(models.Model):
     """Модель комментария к отзыву."""
@@ -194,6 +239,88 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['-pub_date']
+        # Комментарии к отзыву от новых к старым.
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date', '-id'],
+                name='comment_review_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:LEN_TEXT]
+
+
+class ImportedRow(models.Model):
+    """
+    Хэш содержимого строки CSV, из которой импортирована запись.
+    По нему импорт изменений (import_csv --delta) пропускает
+    неизменившиеся строки.
+    """
+
+    source = models.CharField(max_length=50, verbose_name='Файл CSV')
+    object_id = models.BigIntegerField(verbose_name='id записи')
+    content_hash = models.CharField(max_length=32, verbose_name='Хэш строки')
+
+    class Meta:
+        verbose_name = 'Импортированная строка'
+        verbose_name_plural = 'Импортированные строки'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['source', 'object_id'],
+                name='uq_importedrow_source_object'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.source}:{self.object_id}'
+
+
+class OutboxEmail(models.Model):
+    """
+    Письмо в очереди на отправку (reviews.outbox).
+    Запрос только сохраняет письмо, отправляет его команда send_outbox.
+    """
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ожидает отправки'),
+        (SENDING, 'Отправляется'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Не отправлено'),
+    )
+
+    # Поля EmailMessage: subject, body, from_email, to, cc, bcc, ...
+    message = models.JSONField(verbose_name='Письмо')
+    status = models.CharField(
+        max_length=10, choices=STATUSES, default=PENDING,
+        verbose_name='Статус'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='Попыток отправки'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    created = models.DateTimeField(auto_now_add=True)
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now, verbose_name='Следующая попытка'
+    )
+    # Письмо, взятое обработчиком, блокируется до locked_until; если
+    # обработчик упал, после этого времени письмо возьмет другой.
+    locked_until = models.DateTimeField(null=True, blank=True)
+    claim = models.CharField(max_length=32, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt_at'], name='outbox_due_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.message.get("subject", "")[:LEN_TEXT]} ({self.status})'
@@ -0,0 +1,153 @@
+"""
+Очередь исходящих писем.
+
+OutboxBackend - почтовый бэкенд Django, который не отправляет письма,
+а сохраняет их в таблицу OutboxEmail: send_mail() в любом месте проекта
+возвращается сразу после одного INSERT. Команда send_outbox забирает
+письма пачками и отправляет каждую пачку через одно соединение настоящего
+бэкенда (OUTBOX_EMAIL_BACKEND). Неудачная отправка повторяется
+с растущей задержкой, после OUTBOX_MAX_ATTEMPTS письмо получает статус
+failed. Статус и ошибка хранятся у каждого письма.
+"""
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+MESSAGE_FIELDS = (
+    'subject', 'body', 'from_email', 'to', 'cc', 'bcc', 'reply_to',
+    'extra_headers',
+)
+
+
+def serialize_message(message):
+    if message.attachments:
+        raise ValueError('Вложения через очередь писем не поддерживаются.')
+    data = {field: getattr(message, field) for field in MESSAGE_FIELDS}
+    data['alternatives'] = [
+        list(alternative)
+        for alternative in getattr(message, 'alternatives', ())
+    ]
+    return data
+
+
+def deserialize_message(data, connection=None):
+    return EmailMultiAlternatives(
+        subject=data['subject'],
+        body=data['body'],
+        from_email=data['from_email'],
+        to=data['to'],
+        cc=data['cc'],
+        bcc=data['bcc'],
+        reply_to=data['reply_to'],
+        headers=data['extra_headers'],
+        alternatives=[tuple(item) for item in data['alternatives']],
+        connection=connection,
+    )
+
+
+class OutboxBackend(BaseEmailBackend):
+    """Почтовый бэкенд, который ставит письма в очередь."""
+
+    def send_messages(self, email_messages):
+        emails = [
+            OutboxEmail(message=serialize_message(message))
+            for message in email_messages
+            if message.recipients()
+        ]
+        OutboxEmail.objects.bulk_create(emails)
+        return len(emails)
+
+
+def claim_batch(batch_size=None):
+    """
+    Забирает пачку писем, которые пора отправлять, одним UPDATE и
+    возвращает их. Параллельные обработчики получают разные письма.
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    now = timezone.now()
+    claim = uuid.uuid4().hex
+    due = OutboxEmail.objects.filter(
+        Q(status=OutboxEmail.PENDING, next_attempt_at__lte=now)
+        | Q(status=OutboxEmail.SENDING, locked_until__lt=now)
+    ).order_by('next_attempt_at', 'id').values('id')[:batch_size]
+    claimed = OutboxEmail.objects.filter(
+        Q(status=OutboxEmail.PENDING) | Q(locked_until__lt=now),
+        id__in=due,
+    ).update(
+        status=OutboxEmail.SENDING,
+        claim=claim,
+        locked_until=now + timedelta(seconds=settings.OUTBOX_LOCK_SECONDS),
+    )
+    if not claimed:
+        return []
+    return list(OutboxEmail.objects.filter(claim=claim))
+
+
+def retry_delay(attempts):
+    """Задержка перед следующей попыткой: растет вдвое с каждой."""
+    return timedelta(seconds=settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def send_batch(emails):
+    """
+    Отправляет пачку через одно соединение и записывает статус каждого
+    письма. Возвращает (отправлено, отложено, не отправлено).
+    """
+    sent, errors = [], {}
+    connection = get_connection(settings.OUTBOX_EMAIL_BACKEND)
+    try:
+        connection.open()
+        for email in emails:
+            try:
+                deserialize_message(email.message, connection).send()
+            except Exception as error:
+                errors[email] = f'{type(error).__name__}: {error}'
+            else:
+                sent.append(email.id)
+    except Exception as error:
+        # Не удалось соединиться: вся пачка уходит на повтор.
+        for email in emails:
+            if email.id not in sent:
+                errors[email] = f'{type(error).__name__}: {error}'
+    finally:
+        connection.close()
+
+    now = timezone.now()
+    OutboxEmail.objects.filter(id__in=sent).update(
+        status=OutboxEmail.SENT, sent_at=now, attempts=F('attempts') + 1,
+        last_error='', claim='', locked_until=None,
+    )
+    retried = failed = 0
+    for email, error in errors.items():
+        attempts = email.attempts + 1
+        if attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            status, failed = OutboxEmail.FAILED, failed + 1
+        else:
+            status, retried = OutboxEmail.PENDING, retried + 1
+        OutboxEmail.objects.filter(id=email.id).update(
+            status=status, attempts=attempts, last_error=error,
+            next_attempt_at=now + retry_delay(attempts),
+            claim='', locked_until=None,
+        )
+    return len(sent), retried, failed
+
+
+def drain(batch_size=None):
+    """
+    Отправляет пачками все письма, которые пора отправлять.
+    Возвращает суммарные (отправлено, отложено, не отправлено).
+    """
+    totals = [0, 0, 0]
+    while True:
+        emails = claim_batch(batch_size)
+        if not emails:
+            return tuple(totals)
+        for index, count in enumerate(send_batch(emails)):
+            totals[index] += count
@@ -0,0 +1,22 @@
+from django.db.models import Count, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Review, Title
+from .versions import bump_model_versions
+
+
+def rebuild_title_ratings():
+    """
+    Пересчитывает агрегаты оценок всех произведений по таблице отзывов.
+    Возвращает количество обновленных произведений.
+    """
+    reviews = Review.objects.filter(title=OuterRef('pk')).order_by()
+    score_sum = reviews.values('title').annotate(total=Sum('score'))
+    score_count = reviews.values('title').annotate(total=Count('id'))
+    bump_model_versions(Review)
+    return Title.objects.update(
+        rating_sum=Coalesce(Subquery(score_sum.values('total')), Value(0)),
+        rating_count=Coalesce(
+            Subquery(score_count.values('total')), Value(0)
+        ),
+    )
@@ -0,0 +1,50 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+FTS_TABLE = 'reviews_title_fts'
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def build_match_query(text):
+    """
+    Строка поиска пользователя -> запрос FTS5.
+    Каждое слово ищется по префиксу, все слова обязательны. Слова берутся
+    в кавычки, поэтому синтаксис FTS5 во вводе не интерпретируется.
+    """
+    return ' '.join(f'"{word}"*' for word in WORD_PATTERN.findall(text))
+
+
+def search_titles(queryset, text):
+    """
+    Оставляет в queryset произведения, подходящие под строку поиска,
+    и сортирует их по релевантности (bm25).
+    """
+    match = build_match_query(text)
+    if not match:
+        return queryset
+    if connection.vendor != 'sqlite':
+        # Индекс FTS5 есть только в SQLite.
+        for word in WORD_PATTERN.findall(text):
+            queryset = queryset.filter(
+                Q(name__icontains=word) | Q(description__icontains=word)
+            )
+        return queryset
+    table = queryset.model._meta.db_table
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = {table}.id', f'{FTS_TABLE} MATCH %s'],
+        params=[match],
+        select={'search_rank': f'{FTS_TABLE}.rank'},
+    ).order_by('search_rank', 'id')
+
+
+def rebuild_search_index():
+    """Перестраивает индекс FTS5 по текущему содержимому reviews_title."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+        )
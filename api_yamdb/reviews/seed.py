@@ -0,0 +1,99 @@
+"""
+Наполнение базы каталогом заданного объема для бенчмарков.
+
+Записи создаются через модели пачками bulk_create с явными id и не
+держатся в памяти целиком, поэтому можно создать и миллион произведений.
+Значения выбираются генератором случайных чисел с заданным seed: одни и те
+же параметры дают одну и ту же базу. Отзывы пишутся в обход сигналов,
+поэтому рейтинги пересчитываются в конце, как после импорта CSV.
+"""
+import random
+from itertools import islice
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from .models import Category, Comment, Genre, Review, Title, TitleGenre, User
+from .ratings import rebuild_title_ratings
+from .versions import bump_model_versions
+
+SEED_BATCH_SIZE = 5000
+CATEGORIES = ('Фильм', 'Книга', 'Музыка', 'Сериал', 'Игра')
+GENRES = 20
+MAX_USERS = 1000
+
+
+def bulk_insert(model, objects, batch_size):
+    objects = iter(objects)
+    created = 0
+    while True:
+        batch = list(islice(objects, batch_size))
+        if not batch:
+            return created
+        model.objects.bulk_create(batch)
+        created += len(batch)
+
+
+def seed_catalog(titles, reviews_per_title=3, comments_per_review=2,
+                 seed=0, batch_size=SEED_BATCH_SIZE):
+    """
+    Создает категории, жанры, пользователей, titles произведений,
+    по reviews_per_title отзывов на каждое и по comments_per_review
+    комментариев к каждому отзыву. Возвращает {модель: число записей}.
+    """
+    rng = random.Random(seed)
+    users = max(reviews_per_title, min(titles, MAX_USERS))
+    counts = {}
+    with transaction.atomic():
+        counts[Category] = bulk_insert(Category, (
+            Category(id=number, name=name, slug=f'category-{number}')
+            for number, name in enumerate(CATEGORIES, 1)
+        ), batch_size)
+        counts[Genre] = bulk_insert(Genre, (
+            Genre(id=number, name=f'Жанр {number}', slug=f'genre-{number}')
+            for number in range(1, GENRES + 1)
+        ), batch_size)
+        counts[User] = bulk_insert(User, (
+            User(id=number, username=f'user{number}',
+                 email=f'user{number}@yamdb.fake',
+                 password=UNUSABLE_PASSWORD_PREFIX)
+            for number in range(1, users + 1)
+        ), batch_size)
+        counts[Title] = bulk_insert(Title, (
+            Title(id=number, name=f'Произведение {number}',
+                  year=rng.randint(1900, 2020),
+                  description=f'Описание произведения {number}',
+                  category_id=rng.randint(1, len(CATEGORIES)))
+            for number in range(1, titles + 1)
+        ), batch_size)
+        counts[TitleGenre] = bulk_insert(TitleGenre, (
+            TitleGenre(title_id=title, genre_id=genre)
+            for title in range(1, titles + 1)
+            for genre in rng.sample(range(1, GENRES + 1), rng.randint(1, 2))
+        ), batch_size)
+        # У произведения отзывы разных авторов: ограничение uq_title_author.
+        counts[Review] = bulk_insert(Review, (
+            Review(id=(title - 1) * reviews_per_title + number + 1,
+                   title_id=title,
+                   author_id=(title + number) % users + 1,
+                   text=f'Отзыв {number + 1} на произведение {title}',
+                   score=rng.randint(1, 10))
+            for title in range(1, titles + 1)
+            for number in range(reviews_per_title)
+        ), batch_size)
+        counts[Comment] = bulk_insert(Comment, (
+            Comment(review_id=review, author_id=rng.randint(1, users),
+                    text=f'Комментарий {number + 1} к отзыву {review}')
+            for review in range(1, counts[Review] + 1)
+            for number in range(comments_per_review)
+        ), batch_size)
+        rebuild_title_ratings()
+        models = list(counts)
+        bump_model_versions(*models)
+        sequence_sql = connection.ops.sequence_reset_sql(no_style(), models)
+        if sequence_sql:
+            with connection.cursor() as cursor:
+                for sql in sequence_sql:
+                    cursor.execute(sql)
+    return counts
@@ -0,0 +1,142 @@
+from contextvars import ContextVar
+
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+
+from .models import Review, Title, TitleGenre, User
+from .versions import (RESOURCES_BY_MODEL, bump_instance_versions,
+                       bump_model_versions, bump_versions_on_commit,
+                       title_resource)
+
+
+def update_title_rating(title_id, score_delta, count_delta):
+    """
+    Атомарно изменяет хранимые агрегаты оценок произведения.
+    Выполняется одним UPDATE, без чтения строки произведения.
+    Возвращает количество обновленных строк (0 - произведения нет).
+    """
+    return Title.objects.filter(pk=title_id).update(
+        rating_sum=F('rating_sum') + score_delta,
+        rating_count=F('rating_count') + count_delta,
+    )
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_score(sender, instance, **kwargs):
+    """
+    Запоминает прежнюю оценку, если отзыв загружен без поля score
+    (defer, only): тогда from_db записал в _loaded_score None.
+    """
+    if (instance._state.adding
+            or getattr(instance, '_loaded_score', None) is not None):
+        return
+    instance._loaded_score = (
+        Review.objects.filter(pk=instance.pk)
+        .values_list('score', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        update_title_rating(instance.title_id, instance.score, 1)
+    else:
+        old_score = getattr(instance, '_loaded_score', None)
+        if old_score is not None and old_score != instance.score:
+            update_title_rating(
+                instance.title_id, instance.score - old_score, 0
+            )
+    instance._loaded_score = instance.score
+
+
+# Удаляемые сейчас авторы и произведения: их отзывы удаляются каскадом,
+# и рейтинг за них уже пересчитан (автор) или не нужен (произведение).
+cascade_parents = ContextVar('cascade_parents', default=None)
+
+
+def get_cascade_parents():
+    parents = cascade_parents.get()
+    if parents is None:
+        parents = set()
+        cascade_parents.set(parents)
+    return parents
+
+
+def is_cascaded(review):
+    parents = cascade_parents.get()
+    return bool(parents) and (
+        (User, review.author_id) in parents
+        or (Title, review.title_id) in parents
+    )
+
+
+@receiver(pre_delete, sender=User)
+def user_deleting(sender, instance, **kwargs):
+    """
+    Вычитает отзывы автора из рейтингов одним UPDATE с суммой и числом
+    оценок по каждому произведению, вместо UPDATE на каждый отзыв.
+    """
+    reviews = Review.objects.filter(author_id=instance.pk)
+    totals = (reviews.filter(title_id=OuterRef('pk'))
+              .values('title_id'))
+    Title.objects.filter(id__in=reviews.values('title_id')).update(
+        rating_sum=F('rating_sum') - Subquery(
+            totals.annotate(total=Sum('score')).values('total')
+        ),
+        rating_count=F('rating_count') - Subquery(
+            totals.annotate(total=Count('id')).values('total')
+        ),
+    )
+    bump_model_versions(Review)
+    get_cascade_parents().add((User, instance.pk))
+
+
+@receiver(pre_delete, sender=Title)
+def title_deleting(sender, instance, **kwargs):
+    get_cascade_parents().add((Title, instance.pk))
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Title)
+def parent_deleted(sender, instance, **kwargs):
+    # Отзывы удаляются раньше модели, на которую ссылаются.
+    get_cascade_parents().discard((sender, instance.pk))
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    if not is_cascaded(instance):
+        update_title_rating(instance.title_id, -instance.score, -1)
+
+
+def model_changed(sender, instance=None, **kwargs):
+    if sender is Review and is_cascaded(instance):
+        # Версии заменил обработчик удаления автора или произведения.
+        return
+    bump_instance_versions(instance)
+
+
+for model in RESOURCES_BY_MODEL:
+    post_save.connect(model_changed, sender=model)
+    post_delete.connect(model_changed, sender=model)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, action, instance, reverse, pk_set,
+                         **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        bump_versions_on_commit('titles', title_resource(instance.pk))
+    elif pk_set:
+        # genre.title_set.add(...): меняются произведения из pk_set.
+        bump_versions_on_commit(
+            'titles', *(title_resource(pk) for pk in sorted(pk_set))
+        )
+    else:
+        # genre.title_set.clear(): какие произведения затронуты, неизвестно.
+        bump_model_versions(TitleGenre)
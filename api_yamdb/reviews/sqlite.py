@@ -0,0 +1,83 @@
+"""
+Настройка соединений SQLite для работы под несколькими процессами.
+
+1. configure_connection (сигнал connection_created) выполняет для каждого
+   нового соединения PRAGMA из SQLITE_PRAGMAS: WAL, чтобы читатели не ждали
+   писателя, synchronous, размер кэша, mmap, temp_store и busy_timeout.
+2. retry_locked_statement повторяет отдельный запрос вне транзакции,
+   если база занята: такой запрос при ошибке ничего не изменил.
+3. retry_on_locked повторяет целиком функцию с транзакцией: внутри
+   транзакции повтор одного запроса не помогает (снимок данных устарел),
+   транзакцию нужно откатить и начать заново.
+Повторы идут с экспоненциальной задержкой со случайным разбросом, чтобы
+процессы, столкнувшиеся на блокировке, не повторяли запросы одновременно.
+"""
+import functools
+import random
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+
+LOCKED_MESSAGES = ('database is locked', 'database table is locked',
+                   'database is busy')
+
+
+def is_locked_error(error):
+    return isinstance(error, OperationalError) and any(
+        message in str(error) for message in LOCKED_MESSAGES
+    )
+
+
+def retry_delays():
+    """Задержки перед повторами: случайные, с растущей верхней границей."""
+    base = settings.SQLITE_RETRY_DELAY
+    for attempt in range(settings.SQLITE_WRITE_RETRIES):
+        yield random.uniform(0, base * 2 ** attempt)
+
+
+def retry_locked_statement(execute, sql, params, many, context):
+    if context['connection'].in_atomic_block:
+        return execute(sql, params, many, context)
+    for delay in retry_delays():
+        try:
+            return execute(sql, params, many, context)
+        except OperationalError as error:
+            if not is_locked_error(error):
+                raise
+        time.sleep(delay)
+    return execute(sql, params, many, context)
+
+
+def retry_on_locked(func=None, using=DEFAULT_DB_ALIAS):
+    """
+    Декоратор для функции, которая сама открывает транзакцию.
+    Внутри чужой транзакции функция выполняется один раз: повторять
+    нужно внешнюю транзакцию.
+    """
+    if func is None:
+        return functools.partial(retry_on_locked, using=using)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if connections[using].in_atomic_block:
+            return func(*args, **kwargs)
+        for delay in retry_delays():
+            try:
+                return func(*args, **kwargs)
+            except OperationalError as error:
+                if not is_locked_error(error):
+                    raise
+            time.sleep(delay)
+        return func(*args, **kwargs)
+    return wrapper
+
+
+def configure_connection(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+    if retry_locked_statement not in connection.execute_wrappers:
+        connection.execute_wrappers.append(retry_locked_statement)
@@ -0,0 +1,123 @@
+"""
+Версии ресурсов для условных GET-запросов (ETag / Last-Modified).
+
+Версия - пара (токен, время изменения) в кэше VERSION_STAMP_CACHE, общем
+для всех процессов сервера (см. reviews.checks).
+Любая запись в модели ресурса заменяет версию новой после коммита
+транзакции, поэтому проверка If-None-Match обходится без запросов к БД.
+Если версии нет в кэше (перезапуск, вытеснение), создается новая: клиенты
+в худшем случае один раз получат полный ответ.
+
+Списки произведений зависят от всех записей каталога и имеют одну версию
+titles. Карточка произведения - две: title:<id> меняют запись самого
+произведения, его жанров и отзывов на него, а title-details - правка
+категорий и жанров и массовые операции (импорт, массовое создание,
+пересчет рейтингов), после которых меняются многие карточки сразу.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Category, Genre, Review, Title, TitleGenre
+
+VERSION_KEY = 'resource-version:{}'
+# Версии каких ресурсов API меняет запись в модели.
+# Произведения содержат категорию, жанры и рейтинг по отзывам.
+RESOURCES_BY_MODEL = {
+    Category: ('categories', 'titles', 'title-details'),
+    Genre: ('genres', 'titles', 'title-details'),
+    Title: ('titles', 'title-details'),
+    TitleGenre: ('titles', 'title-details'),
+    Review: ('titles', 'title-details'),
+}
+# Поле с id произведения у моделей, запись одной строки которых меняет
+# только карточку этого произведения.
+TITLE_ID_FIELDS = {
+    Title: 'pk',
+    TitleGenre: 'title_id',
+    Review: 'title_id',
+}
+
+
+def get_cache():
+    return caches[settings.VERSION_STAMP_CACHE]
+
+
+def new_version():
+    return uuid.uuid4().hex[:16], timezone.now()
+
+
+def title_resource(title_id):
+    """Ресурс карточки одного произведения."""
+    return f'title:{title_id}'
+
+
+def get_version(resource):
+    """Текущая версия ресурса: (токен, время изменения)."""
+    cache = get_cache()
+    key = VERSION_KEY.format(resource)
+    version = cache.get(key)
+    if version is None:
+        version = new_version()
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def get_combined_version(*resources):
+    """
+    Версия ответа, который зависит от нескольких ресурсов: токены через
+    точку и самое позднее время изменения.
+    """
+    versions = [get_version(resource) for resource in resources]
+    return (
+        '.'.join(token for token, _ in versions),
+        max(modified for _, modified in versions),
+    )
+
+
+def bump_versions(*resources):
+    """Заменяет версии ресурсов новыми."""
+    version = new_version()
+    get_cache().set_many(
+        {VERSION_KEY.format(resource): version for resource in resources},
+        None
+    )
+
+
+def bump_versions_on_commit(*resources):
+    """
+    Заменяет версии после коммита текущей транзакции (или сразу, вне
+    транзакции). Иначе параллельный запрос мог бы выдать старые данные
+    под новой версией, и клиент хранил бы их до следующей записи.
+    """
+    transaction.on_commit(lambda: bump_versions(*resources))
+
+
+def bump_model_versions(*models):
+    """Заменяет после коммита версии ресурсов, зависящих от моделей."""
+    resources = {
+        resource
+        for model in models
+        for resource in RESOURCES_BY_MODEL.get(model, ())
+    }
+    if resources:
+        bump_versions_on_commit(*sorted(resources))
+
+
+def bump_instance_versions(instance):
+    """
+    Заменяет после коммита версии ресурсов, зависящих от одной записи:
+    у произведения, его жанров и отзывов - список и карточка этого
+    произведения, у остальных моделей - как в bump_model_versions.
+    """
+    field = TITLE_ID_FIELDS.get(type(instance))
+    if field is None:
+        bump_model_versions(type(instance))
+        return
+    bump_versions_on_commit(
+        'titles', title_resource(getattr(instance, field))
+    )
@@ -0,0 +1,31 @@
+import pytest
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.test import override_settings
+from django.utils.module_loading import import_string
+
+from api.v1.authentication import token_cache
+
+
+@pytest.fixture(scope='session', autouse=True)
+def cache_dir(tmp_path_factory):
+    # Файловый кэш тестов - во временной папке, а не в CACHE_DIR
+    # разработчика или сервера: clear_caches очищает его перед каждым тестом.
+    cache_settings = {
+        alias: {**options, 'LOCATION': str(tmp_path_factory.mktemp(alias))}
+        if issubclass(import_string(options['BACKEND']), FileBasedCache)
+        else options
+        for alias, options in settings.CACHES.items()
+    }
+    with override_settings(CACHES=cache_settings):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_caches(cache_dir):
+    # Между тестами база очищается без сигналов, поэтому версии ресурсов
+    # кэш ответов и кэш проверенных токенов тоже сбрасываются.
+    for cache in caches.all():
+        cache.clear()
+    token_cache.clear()
@@ -0,0 +1,39 @@
+import pytest
+
+CSV_FILES = {
+    'category.csv': (
+        'id,name,slug\n'
+        '1,Фильм,movie\n'
+        '2,Кино,movie\n'
+        '3,Книга,book\n'
+    ),
+    'genre.csv': 'id,name,slug\n1,Драма,drama\n',
+    'titles.csv': (
+        'id,name,year,category\n'
+        '1,Побег из Шоушенка,1994,1\n'
+        '2,Без категории,1990,77\n'
+    ),
+    'genre_title.csv': 'id,title_id,genre_id\n1,1,1\n2,2,1\n',
+    'users.csv': (
+        'id,username,email,role,bio,first_name,last_name\n'
+        '100,bingobongo,bingobongo@yamdb.fake,user,,,\n'
+        '101,capt_obvious,capt_obvious@yamdb.fake,admin,,,\n'
+    ),
+    'review.csv': (
+        'id,title_id,text,author,score,pub_date\n'
+        '1,1,"Отлично,\nмногострочно",100,10,2019-09-24T21:08:21.567Z\n'
+        '2,1,Хорошо,101,6,2019-09-25T21:08:21.567Z\n'
+        '3,1,Слишком,101,11,2019-09-25T21:08:21.567Z\n'
+    ),
+    'comments.csv': (
+        'id,review_id,text,author,pub_date\n'
+        '1,1,Согласен,101,2020-01-13T23:20:02.422Z\n'
+    ),
+}
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for filename, content in CSV_FILES.items():
+        (tmp_path / filename).write_text(content, encoding='utf-8')
+    return tmp_path
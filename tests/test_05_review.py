@@ -1,8 +1,13 @@
 from http import HTTPStatus
 
+from types import SimpleNamespace
+
 import pytest
 from django.db.utils import IntegrityError
 
+from api.v1.serializers import ReviewSerializer
+from api.v1.views import is_duplicate_review
+
 from tests.utils import (check_fields, check_pagination, create_reviews,
                          create_single_review, create_titles)
 
@@ -384,3 +389,41 @@ class Test05ReviewAPI:
                 f'Проверьте, что DELETE-запрос {role} к чужому отзыву через '
                 f'`{url_template}` удаляет отзыв.'
             )
+
+    def test_06_review_integrity_errors(self, admin_client, user, user_client,
+                                        monkeypatch):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data = {'text': 'Неплохо', 'score': 6}
+
+        def fail(*args, **kwargs):
+            raise IntegrityError('ошибка без данных драйвера')
+
+        # Драйвер не сообщает вид ошибки: повторный отзыв ищется запросом.
+        create_single_review(user_client, titles[0]['id'], 'Первый', 5)
+        monkeypatch.setattr(ReviewSerializer, 'save', fail)
+        assert user_client.post(url, data=data).status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), 'Повторный отзыв должен возвращать 400.'
+        with pytest.raises(IntegrityError):
+            admin_client.post(url, data=data)
+        assert admin_client.post(
+            '/api/v1/titles/100500/reviews/', data=data
+        ).status_code == HTTPStatus.NOT_FOUND, (
+            'Отзыв на несуществующее произведение должен возвращать 404.'
+        )
+
+        def postgres_error(constraint):
+            cause = Exception()
+            cause.diag = SimpleNamespace(constraint_name=constraint)
+            error = IntegrityError()
+            error.__cause__ = cause
+            return error
+
+        assert is_duplicate_review(
+            postgres_error('uq_title_author'), titles[0]['id'], user
+        )
+        assert not is_duplicate_review(
+            postgres_error('reviews_review_score_check'), titles[0]['id'],
+            user
+        ), 'Другие ошибки целостности не должны считаться повтором отзыва.'
@@ -0,0 +1,139 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title, User
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def get_rating(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['rating']
+
+    def test_01_rating_follows_review_changes(self, admin_client, admin,
+                                              user_client, user,
+                                              moderator_client, moderator):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        assert self.get_rating(admin_client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения обновляется '
+            'при создании отзыва.'
+        )
+
+        response = user_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[1]["id"]}/',
+            data={'score': 8}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_rating(admin_client, title_id) == 6, (
+            'Проверьте, что рейтинг произведения обновляется '
+            'при изменении оценки отзыва.'
+        )
+
+        admin_client.delete(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/'
+        )
+        assert self.get_rating(admin_client, title_id) == 6, (
+            'Проверьте, что рейтинг произведения обновляется '
+            'при удалении отзыва.'
+        )
+
+        moderator.delete()
+        assert self.get_rating(admin_client, title_id) == 8, (
+            'Проверьте, что рейтинг произведения обновляется '
+            'при каскадном удалении отзывов пользователя.'
+        )
+
+        user.reviews.all().delete()
+        assert self.get_rating(admin_client, title_id) is None, (
+            'Если у произведения не осталось отзывов, '
+            'рейтинг должен быть `None`.'
+        )
+
+    def test_02_rebuild_ratings_command(self, admin_client, admin, user_client,
+                                        user):
+        author_map = {admin: admin_client, user: user_client}
+        _, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        user.reviews.update(score=9)
+        call_command('rebuild_ratings', stdout=StringIO())
+        assert self.get_rating(admin_client, title_id) == 7, (
+            'Проверьте, что команда `rebuild_ratings` пересчитывает '
+            'рейтинги произведений.'
+        )
+
+    def test_03_deferred_score_edit(self, admin_client, admin, user_client,
+                                    user):
+        author_map = {admin: admin_client, user: user_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        title = Title.objects.get(pk=titles[0]['id'])
+        review = Review.objects.defer('score').get(pk=reviews[0]['id'])
+        old_score = Review.objects.get(pk=review.pk).score
+        review.score = old_score + 3
+        review.save()
+        title.refresh_from_db()
+        assert title.rating_sum == sum(
+            Review.objects.filter(title=title).values_list('score', flat=True)
+        ), (
+            'Рейтинг должен обновляться при изменении оценки отзыва, '
+            'загруженного без поля score.'
+        )
+
+        review = Review.objects.only('id', 'title_id').get(pk=review.pk)
+        review.score = old_score
+        review.save()
+        title.refresh_from_db()
+        assert title.rating_sum == sum(
+            Review.objects.filter(title=title).values_list('score', flat=True)
+        ), 'Проверьте изменение оценки отзыва, загруженного через only().'
+
+    def test_04_cascade_delete_queries(self):
+        titles = [Title.objects.create(name=f'Произведение {number}',
+                                       year=2000) for number in range(6)]
+        authors = [User.objects.create(username=f'reader{number}',
+                                       email=f'reader{number}@yamdb.fake')
+                   for number in range(3)]
+        for title in titles:
+            for score, author in enumerate(authors, 5):
+                Review.objects.create(title=title, author=author,
+                                      text='ok', score=score)
+
+        def title_updates(queries):
+            return [query['sql'] for query in queries.captured_queries
+                    if query['sql'].startswith('UPDATE "reviews_title"')]
+
+        with CaptureQueriesContext(connection) as queries:
+            authors[0].delete()
+        assert len(title_updates(queries)) == 1, (
+            'Удаление автора должно пересчитывать рейтинги одним UPDATE, '
+            'а не UPDATE на каждый отзыв.'
+        )
+        for title in Title.objects.all():
+            assert (title.rating_sum, title.rating_count) == (6 + 7, 2)
+
+        with CaptureQueriesContext(connection) as queries:
+            titles[0].delete()
+        assert not title_updates(queries), (
+            'Рейтинг удаляемого произведения не нужно пересчитывать.'
+        )
+        assert not Review.objects.filter(title_id=titles[0].id).exists()
+
+        review = Review.objects.filter(author=authors[1]).first()
+        review.delete()
+        title = Title.objects.get(pk=review.title_id)
+        assert (title.rating_sum, title.rating_count) == (7, 1), (
+            'Удаление отдельного отзыва должно менять рейтинг.'
+        )
@@ -0,0 +1,92 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Review, Title, User
+from tests.utils import create_reviews, create_single_comment
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09KeysetPagination:
+
+    def test_01_comments_cursor_pagination(self, admin_client,
+                                           user_client, user):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        url = (f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+               f'{reviews[0]["id"]}/comments/')
+        created = [
+            create_single_comment(
+                user_client, titles[0]['id'], reviews[0]['id'], f'text {idx}'
+            ).json()['id']
+            for idx in range(7)
+        ]
+
+        response = user_client.get(url, {'cursor': ''})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data and data['next'], (
+            f'Проверьте, что параметр `cursor` включает для `{url}` '
+            'пагинацию по ключу без подсчета общего количества записей.'
+        )
+        seen = [comment['id'] for comment in data['results']]
+
+        # Новый комментарий не должен сдвигать следующие страницы.
+        create_single_comment(
+            user_client, titles[0]['id'], reviews[0]['id'], 'late text'
+        )
+        response = user_client.get(data['next'])
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        seen += [comment['id'] for comment in data['results']]
+        assert data['next'] is None
+        assert seen == sorted(created, reverse=True), (
+            f'Проверьте, что пагинация по ключу для `{url}` выдает записи '
+            'от новых к старым без пропусков и повторов.'
+        )
+
+        response = user_client.get(url, {'cursor': 'broken'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_reviews_cursor_pagination(self, user_client):
+        title = Title.objects.create(name='Побег из Шоушенка', year=1994)
+        other = Title.objects.create(name='Крестный отец', year=1972)
+        authors = [
+            User.objects.create(username=f'reader{idx}',
+                                email=f'reader{idx}@yamdb.fake')
+            for idx in range(9)
+        ]
+        created = [
+            Review.objects.create(
+                title=title, author=author, text=f'text {idx}', score=5
+            ).id
+            for idx, author in enumerate(authors[:7])
+        ]
+        # Отзывы другого произведения не должны попадать в выдачу.
+        Review.objects.create(title=other, author=authors[0], text='x',
+                              score=5)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+
+        response = user_client.get(url, {'cursor': ''})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data and data['next'], (
+            f'Проверьте, что параметр `cursor` включает для `{url}` '
+            'пагинацию по ключу без подсчета общего количества записей.'
+        )
+        seen = [review['id'] for review in data['results']]
+
+        # Новый отзыв не должен сдвигать следующие страницы.
+        Review.objects.create(title=title, author=authors[8],
+                              text='late text', score=5)
+        response = user_client.get(data['next'])
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        seen += [review['id'] for review in data['results']]
+        assert data['next'] is None
+        assert seen == sorted(created, reverse=True), (
+            f'Проверьте, что пагинация по ключу для `{url}` выдает записи '
+            'от новых к старым без пропусков и повторов.'
+        )
+
+        response = user_client.get(url, {'cursor': 'broken'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
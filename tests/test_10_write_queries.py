@@ -0,0 +1,134 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+
+from api.v1.serializers import UserRegistrationSerializer
+from reviews.models import OutboxEmail, Review
+from tests.utils import create_reviews, create_titles
+
+
+@pytest.fixture
+def user_session_client(user):
+    # Аутентификация без обращения к БД, чтобы считать только запросы
+    # самого эндпоинта.
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10WriteQueries:
+
+    def test_01_review_write_queries(self, admin_client, user,
+                                     user_session_client,
+                                     django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data = {'text': 'Неплохо', 'score': 6}
+
+        # BEGIN, INSERT отзыва и UPDATE рейтинга произведения.
+        with django_assert_num_queries(3):
+            response = user_session_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.CREATED
+        review_id = response.json()['id']
+
+        with django_assert_num_queries(2):
+            response = user_session_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Повторный отзыв на произведение должен возвращать 400.'
+        )
+
+        with django_assert_num_queries(2):
+            response = user_session_client.patch(
+                f'{url}{review_id}/', data={'text': 'Хорошо'}
+            )
+        assert response.status_code == HTTPStatus.OK
+
+        # Отсутствие произведения обнаруживает внешний ключ при фиксации,
+        # после ошибки произведение ищется запросом.
+        with django_assert_num_queries(4):
+            response = user_session_client.post(
+                '/api/v1/titles/100500/reviews/', data=data
+            )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Отзыв на несуществующее произведение должен возвращать 404.'
+        )
+        assert Review.objects.count() == 1
+
+    def test_02_comment_write_queries(self, admin_client, user,
+                                      user_client, user_session_client,
+                                      django_assert_num_queries):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        url = (f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+               f'{reviews[0]["id"]}/comments/')
+
+        with django_assert_num_queries(2):
+            response = user_session_client.post(url, data={'text': 'Да'})
+        assert response.status_code == HTTPStatus.CREATED
+
+        with django_assert_num_queries(2):
+            response = user_session_client.delete(
+                f'{url}{response.json()["id"]}/'
+            )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+
+    def test_03_signup_queries(self, client, django_user_model,
+                               django_assert_num_queries, settings):
+        # Письмо ставится в очередь, как на сервере, а не в память.
+        settings.EMAIL_BACKEND = 'reviews.outbox.OutboxBackend'
+        url = '/api/v1/auth/signup/'
+        data = {'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+
+        # SELECT по email или username, затем в одной транзакции INSERT
+        # пользователя и письма.
+        with django_assert_num_queries(4):
+            response = client.post(url, data=data)
+        assert response.status_code == HTTPStatus.OK
+        code = django_user_model.objects.get().confirmation_code
+
+        # Повторная регистрация: SELECT, затем в одной транзакции UPDATE
+        # кода подтверждения и INSERT письма.
+        with django_assert_num_queries(4):
+            response = client.post(url, data=data)
+        assert response.status_code == HTTPStatus.OK
+        assert django_user_model.objects.get().confirmation_code != code, (
+            'Повторная регистрация должна выдавать новый код.'
+        )
+
+        for conflict in (
+                {'email': data['email'], 'username': 'other_username'},
+                {'email': 'other@yamdb.fake', 'username': data['username']},
+        ):
+            with django_assert_num_queries(1):
+                response = client.post(url, data=conflict)
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Занятый другим пользователем email или username должен '
+                'возвращать 400.'
+            )
+        assert django_user_model.objects.count() == 1
+
+    def test_04_signup_user_deleted(self, client, django_user_model,
+                                    monkeypatch, settings):
+        settings.EMAIL_BACKEND = 'reviews.outbox.OutboxBackend'
+        url = '/api/v1/auth/signup/'
+        data = {'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+        client.post(url, data=data)
+        validate = UserRegistrationSerializer.validate
+
+        def validate_then_delete(serializer, attrs):
+            attrs = validate(serializer, attrs)
+            django_user_model.objects.all().delete()
+            return attrs
+
+        monkeypatch.setattr(
+            UserRegistrationSerializer, 'validate', validate_then_delete
+        )
+        response = client.post(url, data=data)
+        assert response.status_code == HTTPStatus.OK
+        user = django_user_model.objects.get()
+        message = OutboxEmail.objects.order_by('id').last().message
+        assert user.confirmation_code in message['body'], (
+            'Если пользователя удалили во время регистрации, он должен '
+            'быть создан заново с отправленным кодом.'
+        )
@@ -0,0 +1,76 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from api.v1.pagination import ReviewCommentPagination
+from reviews.models import Comment, Review, Title
+
+PAGE_SIZE = 100
+
+
+@pytest.fixture
+def big_page(monkeypatch):
+    monkeypatch.setattr(ReviewCommentPagination, 'page_size', PAGE_SIZE)
+
+
+@pytest.fixture
+def title_with_reviews(django_user_model):
+    title = Title.objects.create(name='Солярис', year=1972)
+    authors = [
+        django_user_model.objects.create(username=f'author{idx}',
+                                         email=f'author{idx}@yamdb.fake')
+        for idx in range(PAGE_SIZE)
+    ]
+    reviews = [
+        Review.objects.create(title=title, author=author, text='ok', score=7)
+        for author in authors
+    ]
+    Comment.objects.bulk_create(
+        Comment(review=reviews[0], author=author, text='ok')
+        for author in authors
+    )
+    return title, reviews[0]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ListQueries:
+
+    def test_01_reviews_list_constant_queries(self, client, big_page,
+                                              title_with_reviews,
+                                              django_assert_num_queries):
+        title, _ = title_with_reviews
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        # Проверка произведения, COUNT и выборка страницы вместе с авторами.
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.json()['results']) == PAGE_SIZE, (
+            f'Проверьте, что `{url}` отдает страницу отзывов целиком.'
+        )
+
+    def test_02_comments_list_constant_queries(self, client, big_page,
+                                               title_with_reviews,
+                                               django_assert_num_queries):
+        title, review = title_with_reviews
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.json()['results']) == PAGE_SIZE, (
+            f'Проверьте, что `{url}` отдает страницу комментариев целиком.'
+        )
+
+    def test_03_explain_includes_count(self, title_with_reviews):
+        out = StringIO()
+        call_command('explain_queries', stdout=out)
+        output = out.getvalue()
+        assert output.count('COUNT(*) для пагинации') == 8, (
+            'Для каждого списка должен выводиться и план подсчета строк '
+            'пагинатором.'
+        )
+        assert 'Просмотров всего индекса: 4' in output, (
+            'COUNT(*) списков без фильтров читает весь индекс, это должно '
+            'быть видно в отчете.'
+        )
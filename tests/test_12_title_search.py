@@ -0,0 +1,49 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12TitleSearch:
+    url = '/api/v1/titles/'
+
+    def search(self, client, **params):
+        response = client.get(self.url, params)
+        assert response.status_code == HTTPStatus.OK
+        return [title['id'] for title in response.json()['results']]
+
+    def test_01_search_titles(self, client, admin_client):
+        titles, categories, _ = create_titles(admin_client)
+
+        assert self.search(client, search='ОРЕШ') == [titles[1]['id']], (
+            f'Проверьте, что параметр `search` для `{self.url}` ищет '
+            'произведения по началу слова в названии без учета регистра.'
+        )
+        assert self.search(client, search='back') == [titles[0]['id']], (
+            f'Проверьте, что параметр `search` для `{self.url}` ищет '
+            'произведения по описанию.'
+        )
+        assert self.search(
+            client, search='орешек', category=categories[0]['slug']
+        ) == [], (
+            f'Проверьте, что параметр `search` для `{self.url}` '
+            'сочетается с остальными фильтрами.'
+        )
+        assert self.search(client, search='"(*') == [titles[0]['id'],
+                                                     titles[1]['id']]
+
+        admin_client.patch(
+            f'{self.url}{titles[1]["id"]}/', data={'name': 'Хищник'}
+        )
+        assert self.search(client, search='хищник') == [titles[1]['id']], (
+            'Проверьте, что поисковый индекс обновляется '
+            'при изменении произведения.'
+        )
+
+        admin_client.delete(f'{self.url}{titles[1]["id"]}/')
+        assert self.search(client, search='хищник') == [], (
+            'Проверьте, что поисковый индекс обновляется '
+            'при удалении произведения.'
+        )
@@ -0,0 +1,89 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Category, Review, Title, TitleGenre
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ImportCsv:
+
+    def test_01_import_csv(self, data_dir):
+        out, err = StringIO(), StringIO()
+        call_command('import_csv', data_dir=data_dir, batch_size=2,
+                     print_errors=True, stdout=out, stderr=err)
+
+        assert set(Category.objects.values_list('slug', flat=True)) == {
+            'movie', 'book'
+        }, 'Строка с повторяющимся slug должна попасть в ошибки.'
+        assert list(Title.objects.values_list('id', flat=True)) == [1], (
+            'Строка со ссылкой на несуществующую категорию '
+            'должна попасть в ошибки.'
+        )
+        assert list(TitleGenre.objects.values_list('title_id', 'genre_id')) \
+            == [(1, 1)], 'Проверьте импорт `genre_title.csv`.'
+        assert Review.objects.count() == 2, (
+            'Отзыв с оценкой вне диапазона 1-10 должен попасть в ошибки.'
+        )
+        assert Review.objects.get(pk=1).pub_date.year == 2019, (
+            'Проверьте, что `pub_date` берется из CSV.'
+        )
+        assert Title.objects.get(pk=1).rating == 8, (
+            'Проверьте, что после импорта отзывов рейтинги пересчитаны.'
+        )
+        assert 'category.csv:3' in err.getvalue()
+        assert 'ошибок 1' in out.getvalue()
+
+        out = StringIO()
+        call_command('import_csv', data_dir=data_dir, stdout=out)
+        assert 'создано 1' not in out.getvalue(), (
+            'Повторный импорт не должен создавать записи.'
+        )
+        assert Review.objects.count() == 2
+
+    def test_02_import_csv_parallel(self, data_dir):
+        out = StringIO()
+        call_command('import_csv', data_dir=data_dir, workers=2,
+                     chunk_size=1, stdout=out, stderr=StringIO())
+        assert Category.objects.count() == 2
+        assert list(Title.objects.values_list('id', flat=True)) == [1]
+        assert TitleGenre.objects.count() == 1
+        assert Review.objects.count() == 2, (
+            'Проверьте, что импорт с пулом процессов дает тот же '
+            'результат, что и последовательный.'
+        )
+        assert Title.objects.get(pk=1).rating == 8
+
+    def test_03_import_csv_delta(self, data_dir):
+        call_command('import_csv', data_dir=data_dir, delta=True,
+                     stdout=StringIO(), stderr=StringIO())
+        (data_dir / 'review.csv').write_text(
+            'id,title_id,text,author,score,pub_date\n'
+            '1,1,Передумал,100,4,2019-09-24T21:08:21.567Z\n',
+            encoding='utf-8'
+        )
+
+        out = StringIO()
+        call_command('import_csv', data_dir=data_dir, delta=True,
+                     dry_run=True, stdout=out, stderr=StringIO())
+        assert 'review.csv: строк 1, создано 0, обновлено 1, удалено 1, ' \
+               'без изменений 0' in out.getvalue(), (
+                   'Проверьте сводку изменений в пробном запуске.'
+               )
+        assert Review.objects.count() == 2, (
+            'Пробный запуск не должен ничего записывать.'
+        )
+
+        out = StringIO()
+        call_command('import_csv', data_dir=data_dir, delta=True,
+                     stdout=out, stderr=StringIO())
+        assert 'category.csv: строк 3, создано 0, обновлено 0, ' \
+               'удалено 0, без изменений 2' in out.getvalue(), (
+                   'Неизменившиеся строки не должны записываться заново.'
+               )
+        review = Review.objects.get()
+        assert (review.id, review.text, review.score) == (1, 'Передумал', 4)
+        assert Title.objects.get(pk=1).rating == 4, (
+            'Проверьте, что после импорта изменений рейтинги пересчитаны.'
+        )
@@ -0,0 +1,116 @@
+import json
+from io import StringIO
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.asgi import get_asgi_application
+from django.core.management import call_command
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import Review, Title
+
+
+@async_to_sync
+async def asgi_get(path, token):
+    """Ответ приложения ASGI целиком: статус и тело."""
+    application = get_asgi_application()
+    messages = []
+    requests = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+    async def receive():
+        return requests.pop() if requests else {'type': 'http.disconnect'}
+
+    async def send(message):
+        messages.append(message)
+
+    await application({
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path,
+        'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'testserver'),
+                    (b'authorization', f'Bearer {token}'.encode())],
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 10000),
+    }, receive, send)
+    return messages[0]['status'], b''.join(
+        message.get('body', b'') for message in messages[1:]
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14Export:
+
+    def test_01_export_endpoint(self, client, user_client, admin_client,
+                                data_dir):
+        call_command('import_csv', data_dir=data_dir,
+                     stdout=StringIO(), stderr=StringIO())
+        url = '/api/v1/export/titles.ndjson'
+        assert client.get(url).status_code == 401, (
+            'Выгрузка недоступна анонимному пользователю.'
+        )
+        assert user_client.get(url).status_code == 403, (
+            'Выгрузка доступна только администратору.'
+        )
+        assert admin_client.get(
+            '/api/v1/export/unknown.csv'
+        ).status_code == 404
+
+        response = admin_client.get(url)
+        assert response.status_code == 200
+        assert response.streaming, 'Выгрузка должна отдаваться потоком.'
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert [json.loads(line) for line in lines] == [{
+            'id': 1,
+            'name': 'Побег из Шоушенка',
+            'year': 1994,
+            'category': 1,
+            'description': None,
+            'category_slug': 'movie',
+            'genre': ['drama'],
+            'rating': 8,
+        }], 'Проверьте состав документа произведения в NDJSON.'
+
+        response = admin_client.get('/api/v1/export/review.csv')
+        assert response['Content-Type'].startswith('text/csv')
+        content = b''.join(response.streaming_content).decode()
+        assert content.splitlines()[0] == (
+            'id,title_id,text,author,score,pub_date'
+        ), 'Колонки CSV должны совпадать с файлами импорта.'
+
+    def test_02_export_csv_round_trip(self, data_dir, tmp_path):
+        call_command('import_csv', data_dir=data_dir, delta=True,
+                     stdout=StringIO(), stderr=StringIO())
+        Title.objects.filter(pk=1).update(description='Тюремная драма')
+        export_dir = tmp_path / 'export'
+        call_command('export_data', output_dir=export_dir, chunk_size=1,
+                     stdout=StringIO())
+        Title.objects.filter(pk=1).update(description=None)
+
+        out = StringIO()
+        call_command('import_csv', data_dir=export_dir, delta=True,
+                     print_errors=True, stdout=out, stderr=StringIO())
+        assert 'review.csv: строк 2, создано 0, обновлено 0, удалено 0, ' \
+               'без изменений 2' in out.getvalue(), (
+                   'Выгрузка в CSV должна загружаться обратно без изменений.'
+               )
+        assert 'ошибок 1' not in out.getvalue()
+        assert Review.objects.count() == 2
+        assert Title.objects.get(pk=1).rating == 8
+        assert Title.objects.get(pk=1).description == 'Тюремная драма', (
+            'Описание произведения должно сохраняться при выгрузке и '
+            'загрузке обратно.'
+        )
+
+    def test_03_export_under_asgi(self, admin, data_dir):
+        call_command('import_csv', data_dir=data_dir,
+                     stdout=StringIO(), stderr=StringIO())
+        token = AccessToken.for_user(admin)
+        status, body = asgi_get('/api/v1/export/genre.csv', token)
+        assert status == 200
+        assert body.decode().splitlines() == [
+            'id,name,slug', '1,Драма,drama'
+        ], (
+            'Под ASGI выгрузка должна отдаваться целиком.'
+        )
+        status, body = asgi_get('/api/v1/export/titles.ndjson', token)
+        assert status == 200
+        assert json.loads(body)['genre'] == ['drama']
@@ -0,0 +1,113 @@
+import pytest
+from django.core.checks import run_checks
+
+from reviews.models import Category, Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15ConditionalGet:
+
+    def test_01_not_modified(self, client, admin_client,
+                             django_assert_num_queries):
+        Title.objects.create(name='Побег из Шоушенка', year=1994)
+        response = client.get('/api/v1/titles/')
+        etag = response['ETag']
+        assert response.status_code == 200 and etag, (
+            'Список произведений должен отдавать заголовок ETag.'
+        )
+        assert response.has_header('Last-Modified')
+
+        with django_assert_num_queries(0):
+            response = client.get(
+                '/api/v1/titles/', HTTP_IF_NONE_MATCH=etag
+            )
+        assert response.status_code == 304, (
+            'Неизмененный список должен отдаваться как 304 без запросов к БД.'
+        )
+        response = client.get(
+            '/api/v1/titles/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert response.status_code == 304
+
+        genres_etag = client.get('/api/v1/genres/')['ETag']
+        categories_etag = client.get('/api/v1/categories/')['ETag']
+        admin_client.post(
+            '/api/v1/genres/', data={'name': 'Драма', 'slug': 'drama'}
+        )
+        assert client.get(
+            '/api/v1/genres/', HTTP_IF_NONE_MATCH=genres_etag
+        ).status_code == 200, 'Запись жанра должна менять версию жанров.'
+        assert client.get(
+            '/api/v1/categories/', HTTP_IF_NONE_MATCH=categories_etag
+        ).status_code == 304, 'Запись жанра не меняет версию категорий.'
+        response = client.get('/api/v1/titles/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Жанры входят в ответ произведений, их версия тоже меняется.'
+        )
+
+    def test_02_review_changes_titles_version(self, client, user_client,
+                                              django_assert_num_queries):
+        title = Title.objects.create(name='Побег из Шоушенка', year=1994)
+        url = f'/api/v1/titles/{title.id}/'
+        etag = client.get(url)['ETag']
+        user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Отлично', 'score': 10}
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and response.json()['rating'] == 10, (
+            'Новый отзыв меняет рейтинг, поэтому и версию произведений.'
+        )
+        title.genre.add(Genre.objects.create(name='Драма', slug='drama'))
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        ).status_code == 200, 'Изменение жанров произведения меняет версию.'
+
+    def test_03_process_local_cache_rejected(self, settings):
+        assert not [
+            error for error in run_checks(tags=['caches'])
+            if error.id.startswith('reviews.')
+        ]
+        settings.CACHES = {**settings.CACHES, 'local': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        settings.VERSION_STAMP_CACHE = 'local'
+        assert 'reviews.E001' in [
+            error.id for error in run_checks(tags=['caches'])
+        ], (
+            'Версии ресурсов в памяти процесса расходятся между процессами '
+            'сервера, проверка настроек должна это отклонять.'
+        )
+
+    def test_04_title_detail_versions(self, client, user_client):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        first, second = (
+            Title.objects.create(name=name, year=1994, category=category)
+            for name in ('Побег из Шоушенка', 'Форрест Гамп')
+        )
+        urls = [f'/api/v1/titles/{title.id}/' for title in (first, second)]
+        etags = [client.get(url)['ETag'] for url in urls]
+        list_etag = client.get('/api/v1/titles/')['ETag']
+
+        user_client.post(f'/api/v1/titles/{first.id}/reviews/',
+                         data={'text': 'Отлично', 'score': 10})
+        assert client.get(
+            urls[0], HTTP_IF_NONE_MATCH=etags[0]
+        ).status_code == 200, 'Отзыв меняет версию своего произведения.'
+        response = client.get(urls[1], HTTP_IF_NONE_MATCH=etags[1])
+        assert response.status_code == 304, (
+            'Отзыв на одно произведение не должен менять версию карточек '
+            'других произведений.'
+        )
+        assert client.get(urls[1])['X-Cache'] == 'HIT'
+        assert client.get(
+            '/api/v1/titles/', HTTP_IF_NONE_MATCH=list_etag
+        ).status_code == 200, 'Отзыв меняет рейтинг в списке произведений.'
+
+        category.name = 'Кино'
+        category.save()
+        assert client.get(
+            urls[1], HTTP_IF_NONE_MATCH=etags[1]
+        ).status_code == 200, (
+            'Правка категории меняет версию карточек всех произведений.'
+        )
@@ -0,0 +1,86 @@
+from io import StringIO
+
+import pytest
+from django.core.checks import run_checks
+from django.core.management import call_command
+
+from reviews.models import Category, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16ResponseCache:
+
+    def test_01_anonymous_reads_cached(self, client, admin_client,
+                                       django_assert_num_queries):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        Title.objects.create(name='Побег из Шоушенка', year=1994,
+                             category=category)
+        Title.objects.create(name='Пираты', year=2003)
+
+        response = client.get('/api/v1/titles/')
+        assert response['X-Cache'] == 'MISS'
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/titles/')
+        assert response['X-Cache'] == 'HIT', (
+            'Повторное чтение анонимом должно отдаваться из кэша без БД.'
+        )
+        assert response.json()['count'] == 2
+
+        response = client.get('/api/v1/titles/?category=movie')
+        assert response['X-Cache'] == 'MISS', (
+            'Фильтры и страница входят в ключ кэша.'
+        )
+        assert response.json()['count'] == 1
+        assert admin_client.get('/api/v1/titles/').get('X-Cache') is None, (
+            'Ответы авторизованным пользователям не кэшируются.'
+        )
+
+        category.name = 'Кино'
+        category.save()
+        response = client.get('/api/v1/titles/?category=movie')
+        assert response['X-Cache'] == 'MISS', (
+            'Изменение категории должно сбрасывать кэш произведений.'
+        )
+        assert response.json()['results'][0]['category']['name'] == 'Кино'
+        assert client.get('/api/v1/genres/')['X-Cache'] == 'MISS'
+        assert client.get('/api/v1/genres/')['X-Cache'] == 'HIT', (
+            'Изменение категории не затрагивает кэш жанров.'
+        )
+
+        out = StringIO()
+        call_command('response_cache_stats', reset=True, stdout=out)
+        assert 'попаданий 2, промахов 4' in out.getvalue()
+
+    def test_02_read_your_writes(self, client, user_client):
+        title = Title.objects.create(name='Побег из Шоушенка', year=1994)
+        url = f'/api/v1/titles/{title.id}/'
+        assert client.get(url).json()['rating'] is None
+        assert client.get(url)['X-Cache'] == 'HIT'
+
+        response = user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Отлично', 'score': 9}
+        )
+        assert response.status_code == 201
+        assert client.get(url).json()['rating'] == 9, (
+            'Следующее чтение после записи отзыва должно видеть новый '
+            'рейтинг.'
+        )
+        reviews = user_client.get(
+            f'/api/v1/titles/{title.id}/reviews/'
+        ).json()['results']
+        assert [review['text'] for review in reviews] == ['Отлично'], (
+            'Автор должен сразу видеть свой отзыв.'
+        )
+
+    def test_03_process_local_cache_rejected(self, settings):
+        settings.CACHES = {**settings.CACHES, 'local': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        settings.RESPONSE_CACHE = 'local'
+        assert 'api.E001' in [
+            error.id for error in run_checks(tags=['caches'])
+        ], (
+            'Кэш ответов должен быть общим для процессов сервера, кэш '
+            'в памяти процесса проверка настроек должна отклонять.'
+        )
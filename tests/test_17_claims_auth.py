@@ -0,0 +1,77 @@
+import time
+
+import pytest
+from rest_framework.test import APIClient
+
+from api.v1.authentication import get_token_for_user, token_cache
+from reviews.models import User
+
+
+def client_for(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {get_token_for_user(user)}'
+    )
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17ClaimsAuth:
+
+    def test_01_token_claims(self, client, user):
+        user.confirmation_code = '1234'
+        user.save()
+        response = client.post('/api/v1/auth/token/', data={
+            'username': user.username, 'confirmation_code': '1234'
+        })
+        assert response.status_code == 200
+        token = response.json()['access']
+        response = client.get(
+            '/api/v1/users/me/', HTTP_AUTHORIZATION=f'Bearer {token}'
+        )
+        assert response.status_code == 200, (
+            'Токен из `/api/v1/auth/token/` должен принадлежать пользователю.'
+        )
+        assert response.json()['email'] == user.email
+
+    def test_02_no_user_query(self, user, admin, django_assert_num_queries):
+        # Пользователи созданы только что, в ту же секунду, что и токены:
+        # такие клеймы перепроверяются по БД. Забываем изменения, как
+        # если бы пользователи были созданы раньше или в другом процессе.
+        token_cache.clear()
+        user_client = client_for(user)
+        with django_assert_num_queries(0):
+            response = user_client.post(
+                '/api/v1/categories/', data={'name': 'Фильм', 'slug': 'movie'}
+            )
+        assert response.status_code == 403, (
+            'Права должны проверяться по клеймам токена без запросов к БД.'
+        )
+        admin_client = client_for(admin)
+        # COUNT и SELECT пагинации, без чтения пользователя из токена.
+        with django_assert_num_queries(2):
+            response = admin_client.get('/api/v1/users/')
+        assert response.status_code == 200
+
+    def test_03_role_change(self, user, admin, monkeypatch):
+        user_client = client_for(user)
+        url = '/api/v1/categories/'
+        data = {'name': 'Фильм', 'slug': 'movie'}
+        assert user_client.post(url, data=data).status_code == 403
+
+        client_for(admin).patch(
+            f'/api/v1/users/{user.username}/', data={'role': User.ADMIN}
+        )
+        assert user_client.post(url, data=data).status_code == 201, (
+            'Смена роли через `/api/v1/users/` должна действовать сразу.'
+        )
+
+        # Изменение из другого процесса: сигналов здесь нет.
+        User.objects.filter(pk=user.pk).update(role=User.USER)
+        data = {'name': 'Книга', 'slug': 'book'}
+        assert user_client.post(url, data=data).status_code == 201
+        now = time.time()
+        monkeypatch.setattr(time, 'time', lambda: now + 61)
+        assert user_client.post(url, data=data).status_code == 403, (
+            'Смена роли должна вступать в силу не позже JWT_CLAIMS_TTL.'
+        )
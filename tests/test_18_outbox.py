@@ -0,0 +1,69 @@
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+
+from reviews.models import OutboxEmail
+
+OUTBOX_SETTINGS = {
+    'EMAIL_BACKEND': 'reviews.outbox.OutboxBackend',
+    'OUTBOX_EMAIL_BACKEND': 'django.core.mail.backends.locmem.EmailBackend',
+}
+
+
+class BrokenBackend(EmailBackend):
+
+    def send_messages(self, messages):
+        if any('bad@' in address for message in messages
+               for address in message.to):
+            raise ConnectionError('Почтовый сервер отклонил адрес.')
+        return super().send_messages(messages)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Outbox:
+
+    def test_01_signup_enqueues_email(self, client, settings):
+        for name, value in OUTBOX_SETTINGS.items():
+            setattr(settings, name, value)
+        response = client.post('/api/v1/auth/signup/', data={
+            'username': 'bingobongo', 'email': 'bingobongo@yamdb.fake'
+        })
+        assert response.status_code == 200
+        assert len(mail.outbox) == 0, (
+            'Регистрация не должна отправлять письмо сама.'
+        )
+        email = OutboxEmail.objects.get()
+        assert email.status == OutboxEmail.PENDING
+        assert email.message['to'] == ['bingobongo@yamdb.fake']
+
+        out = StringIO()
+        call_command('send_outbox', workers=2, stdout=out)
+        assert 'отправлено 1' in out.getvalue()
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == ['bingobongo@yamdb.fake']
+        assert 'Код подтверждения' in mail.outbox[0].body
+        email.refresh_from_db()
+        assert email.status == OutboxEmail.SENT and email.sent_at
+
+    def test_02_retries(self, settings):
+        for name, value in OUTBOX_SETTINGS.items():
+            setattr(settings, name, value)
+        settings.OUTBOX_EMAIL_BACKEND = f'{__name__}.BrokenBackend'
+        settings.OUTBOX_MAX_ATTEMPTS = 2
+        settings.OUTBOX_RETRY_DELAY = 0
+        mail.send_mail('Тема', 'Текст', None, ['good@yamdb.fake'])
+        mail.send_mail('Тема', 'Текст', None, ['bad@yamdb.fake'])
+
+        out = StringIO()
+        call_command('send_outbox', batch_size=10, stdout=out)
+        # Первая неудача откладывает письмо, вторая - последняя попытка.
+        assert 'отправлено 1, отложено 1, не отправлено 1' in out.getvalue(), (
+            'Ошибка одного письма не должна мешать остальным в пачке.'
+        )
+        good, bad = OutboxEmail.objects.order_by('id')
+        assert good.status == OutboxEmail.SENT
+        assert bad.status == OutboxEmail.FAILED and bad.attempts == 2
+        assert 'ConnectionError' in bad.last_error
@@ -0,0 +1,121 @@
+import multiprocessing
+import time
+from http import HTTPStatus
+
+import pytest
+from django.core.checks import run_checks
+
+from api.v1.throttling import SlidingWindowThrottle
+from api_yamdb.cache import AtomicFileBasedCache
+from reviews.models import Title
+
+
+def increment(cache_dir, count):
+    cache = AtomicFileBasedCache(str(cache_dir), {})
+    for _ in range(count):
+        cache.incr('counter')
+
+
+@pytest.fixture
+def rates(monkeypatch):
+    def set_rate(scope, rate):
+        monkeypatch.setitem(SlidingWindowThrottle.THROTTLE_RATES, scope, rate)
+    return set_rate
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Throttling:
+
+    def test_01_signup_throttled_by_email(self, client, rates, monkeypatch,
+                                          django_assert_num_queries):
+        rates('signup_email', '2/hour')
+        url = '/api/v1/auth/signup/'
+        data = {'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+        for _ in range(2):
+            assert client.post(url, data=data).status_code == HTTPStatus.OK
+
+        with django_assert_num_queries(0):
+            response = client.post(url, data={
+                'email': 'VALID@yamdb.fake', 'username': 'other'
+            })
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Превышение лимита регистраций на email должно возвращать 429 '
+            'без запросов к БД.'
+        )
+        assert 0 < int(response['Retry-After']) <= 2 * 60 * 60
+        assert client.post(url, data={
+            'email': 'other@yamdb.fake', 'username': 'other'
+        }).status_code == HTTPStatus.OK, 'Лимит действует на один email.'
+
+        # Через два окна счетчики прошлых запросов не учитываются.
+        now = time.time()
+        monkeypatch.setattr(time, 'time', lambda: now + 2 * 60 * 60)
+        assert client.post(url, data=data).status_code == HTTPStatus.OK
+
+    def test_02_token_throttled_by_username(self, client, user, rates):
+        rates('token_username', '1/min')
+        url = '/api/v1/auth/token/'
+        data = {'username': user.username, 'confirmation_code': 'guess'}
+        assert client.post(url, data=data).status_code == \
+            HTTPStatus.BAD_REQUEST
+        response = client.post(url, data=data)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Подбор кода подтверждения должен ограничиваться по username.'
+        )
+        assert response.has_header('Retry-After')
+
+    def test_03_review_create_throttled_by_user(self, admin_client,
+                                                user_client, rates):
+        rates('review_create', '1/min')
+        titles = [
+            Title.objects.create(name=name, year=2000).id
+            for name in ('Первое', 'Второе')
+        ]
+        data = {'text': 'Отлично', 'score': 10}
+        assert user_client.post(
+            f'/api/v1/titles/{titles[0]}/reviews/', data=data
+        ).status_code == HTTPStatus.CREATED
+        assert user_client.post(
+            f'/api/v1/titles/{titles[1]}/reviews/', data=data
+        ).status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Создание отзывов должно ограничиваться по пользователю.'
+        )
+        assert user_client.get(
+            f'/api/v1/titles/{titles[1]}/reviews/'
+        ).status_code == HTTPStatus.OK, 'Чтение не ограничивается.'
+        assert admin_client.post(
+            f'/api/v1/titles/{titles[1]}/reviews/', data=data
+        ).status_code == HTTPStatus.CREATED
+
+    def test_04_unsuitable_cache_rejected(self, settings):
+        assert 'api.E002' not in [
+            error.id for error in run_checks(tags=['caches'])
+        ], 'Кэш по умолчанию должен подходить для счетчиков.'
+        for backend in ('locmem.LocMemCache', 'filebased.FileBasedCache',
+                        'db.DatabaseCache'):
+            settings.CACHES = {**settings.CACHES, 'counters': {
+                'BACKEND': f'django.core.cache.backends.{backend}',
+                'LOCATION': 'counters',
+            }}
+            settings.THROTTLE_CACHE = 'counters'
+            assert 'api.E002' in [
+                error.id for error in run_checks(tags=['caches'])
+            ], (
+                f'{backend} теряет увеличения счетчиков между процессами, '
+                'проверка настроек должна его отклонять.'
+            )
+
+    def test_05_atomic_counters_across_processes(self, tmp_path):
+        context = multiprocessing.get_context('fork')
+        processes = [context.Process(target=increment, args=(tmp_path, 200))
+                     for _ in range(4)]
+        cache = AtomicFileBasedCache(str(tmp_path), {})
+        cache.add('counter', 0, 60)
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        assert cache.get('counter') == 800, (
+            'Одновременные incr из разных процессов не должны теряться.'
+        )
+        assert cache.add('counter', 0) is False
@@ -0,0 +1,44 @@
+import pytest
+from django.db import OperationalError, connection
+
+from reviews.sqlite import retry_locked_statement, retry_on_locked
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20Sqlite:
+
+    def test_01_pragmas(self, settings):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            assert cursor.fetchone()[0] == \
+                settings.SQLITE_PRAGMAS['busy_timeout'], (
+                    'Проверьте, что к соединению применяются SQLITE_PRAGMAS.'
+                )
+            cursor.execute('PRAGMA temp_store')
+            assert cursor.fetchone()[0] == 2
+        assert retry_locked_statement in connection.execute_wrappers
+
+    def test_02_retry_on_locked(self, settings):
+        settings.SQLITE_RETRY_DELAY = 0
+        calls = []
+
+        @retry_on_locked
+        def write():
+            calls.append(1)
+            if len(calls) < 3:
+                raise OperationalError('database is locked')
+            return 'ok'
+
+        assert write() == 'ok' and len(calls) == 3, (
+            'Запись должна повторяться, пока база занята.'
+        )
+
+        @retry_on_locked
+        def broken():
+            calls.append(1)
+            raise OperationalError('no such table: reviews_title')
+
+        calls.clear()
+        with pytest.raises(OperationalError):
+            broken()
+        assert len(calls) == 1, 'Другие ошибки БД не повторяются.'
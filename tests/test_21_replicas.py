@@ -0,0 +1,83 @@
+import pytest
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from api_yamdb.replicas import ReplicaRouter, balancer
+from reviews.models import Genre
+from reviews.versions import bump_versions
+
+
+def count_queries(client, method, url, **kwargs):
+    with CaptureQueriesContext(connections['replica']) as replica, \
+            CaptureQueriesContext(connections['default']) as primary:
+        response = getattr(client, method)(url, **kwargs)
+    return response, len(replica), len(primary)
+
+
+@pytest.fixture
+def replica_settings(settings):
+    settings.DATABASE_REPLICAS = ['replica']
+    settings.REPLICA_PIN_SECONDS = 60
+    return settings
+
+
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+class Test21Replicas:
+
+    def test_01_reads_from_replica(self, client, user_client,
+                                   replica_settings, monkeypatch):
+        Genre.objects.create(name='Драма', slug='drama')
+        # Ресурс изменен давно: свежесть реплики не проверяется.
+        monkeypatch.setattr(replica_settings, 'REPLICA_PIN_SECONDS', 0)
+        response, replica, primary = count_queries(
+            client, 'get', '/api/v1/genres/'
+        )
+        assert response.status_code == 200
+        assert replica and not primary, (
+            'Чтение должно идти с реплики.'
+        )
+        monkeypatch.setattr(replica_settings, 'REPLICA_PIN_SECONDS', 60)
+
+        response, replica, primary = count_queries(
+            user_client, 'post', '/api/v1/titles/1/reviews/',
+            data={'text': 'Отлично', 'score': 10}
+        )
+        assert not replica, 'Запись и чтения при записи идут в основную БД.'
+
+    def test_02_pinned_after_write(self, admin_client, replica_settings):
+        response, replica, primary = count_queries(
+            admin_client, 'post', '/api/v1/genres/',
+            data={'name': 'Драма', 'slug': 'drama'}
+        )
+        assert response.status_code == 201 and not replica
+        response, replica, primary = count_queries(
+            admin_client, 'get', '/api/v1/users/'
+        )
+        assert response.status_code == 200
+        assert primary and not replica, (
+            'После записи клиент должен читать из основной БД '
+            'REPLICA_PIN_SECONDS секунд.'
+        )
+
+    def test_03_fresh_version_reads_primary(self, client, replica_settings):
+        bump_versions('genres')
+        response, replica, primary = count_queries(
+            client, 'get', '/api/v1/genres/'
+        )
+        assert primary and not replica, (
+            'Недавно измененный ресурс нужно читать из основной БД.'
+        )
+
+    def test_04_router(self, replica_settings):
+        replica_settings.REPLICA_STRATEGY = 'least_loaded'
+        replica_settings.DATABASE_REPLICAS = ['default', 'replica']
+        first = balancer.acquire()
+        second = balancer.acquire()
+        assert {first, second} == {'default', 'replica'}, (
+            'Наименее загруженная реплика выбирается первой.'
+        )
+        balancer.release(first)
+        assert balancer.acquire() == first
+        router = ReplicaRouter()
+        assert router.db_for_write(Genre) == 'default'
+        assert not router.allow_migrate('replica', 'reviews')
@@ -0,0 +1,115 @@
+import asyncio
+import importlib
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import clear_url_caches, resolve
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+READ_URLS = (
+    '/api/v1/titles/',
+    '/api/v1/titles/{title}/',
+    '/api/v1/genres/',
+    '/api/v1/categories/',
+    '/api/v1/titles/{title}/reviews/',
+    '/api/v1/titles/{title}/reviews/{review}/comments/',
+)
+
+
+def reload_urls():
+    # Асинхронные view выбираются при импорте URLconf.
+    import api.v1.urls
+    import api_yamdb.urls
+    importlib.reload(api.v1.urls)
+    importlib.reload(api_yamdb.urls)
+    clear_url_caches()
+
+
+@pytest.fixture
+def async_views(settings):
+    def enable():
+        settings.ASYNC_READ_VIEWS = True
+        reload_urls()
+    yield enable
+    settings.ASYNC_READ_VIEWS = False
+    reload_urls()
+
+
+@async_to_sync
+async def get(url, **headers):
+    # AsyncClient в Django 3.2 принимает заголовки под их именами.
+    return await AsyncClient().get(url, **headers)
+
+
+@async_to_sync
+async def post(url, data, **headers):
+    return await AsyncClient().post(
+        url, data, content_type='application/json', **headers
+    )
+
+
+def create_data(user):
+    category = Category.objects.create(name='Фильм', slug='movie')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    title = Title.objects.create(
+        name='Побег из Шоушенка', year=1994, category=category
+    )
+    title.genre.add(genre)
+    review = Review.objects.create(
+        title=title, author=user, text='Отлично', score=10
+    )
+    Comment.objects.create(review=review, author=user, text='Согласен')
+    return {'title': title.id, 'review': review.id}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22AsyncRead:
+
+    def test_01_same_responses(self, client, user, async_views):
+        ids = create_data(user)
+        expected = {
+            url: client.get(url.format(**ids)).json() for url in READ_URLS
+        }
+        async_views()
+        for url in READ_URLS:
+            assert asyncio.iscoroutinefunction(
+                resolve(url.format(**ids)).func
+            ), f'Чтение `{url}` под ASGI должно быть асинхронной view.'
+            response = get(url.format(**ids))
+            assert response.status_code == 200
+            assert response.json() == expected[url], (
+                f'Асинхронная view `{url}` должна отвечать так же, '
+                'как синхронная.'
+            )
+
+    def test_02_conditional_and_cache(self, user, async_views):
+        ids = create_data(user)
+        async_views()
+        url = f'/api/v1/titles/{ids["title"]}/'
+        response = get(url)
+        assert response['X-Cache'] == 'MISS' and response.has_header('ETag')
+        assert get(url)['X-Cache'] == 'HIT', (
+            'Асинхронное чтение должно использовать кэш ответов.'
+        )
+        response = get(url, **{'if-none-match': response['ETag']})
+        assert response.status_code == 304, (
+            'Асинхронное чтение должно отвечать 304 по ETag.'
+        )
+
+    def test_03_errors_and_writes(self, token_admin, async_views):
+        async_views()
+        assert get('/api/v1/titles/1/reviews/').status_code == 404
+        assert get(
+            '/api/v1/genres/', authorization='Bearer invalid'
+        ).status_code == 401
+
+        response = post(
+            '/api/v1/genres/', {'name': 'Драма', 'slug': 'drama'},
+            authorization=f'Bearer {token_admin["access"]}',
+        )
+        assert response.status_code == 201, (
+            'Запись через асинхронную view выполняется синхронно.'
+        )
+        assert get('/api/v1/genres/').json()['count'] == 1
@@ -0,0 +1,99 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.metrics import Registry, registry
+from reviews.models import Title
+
+
+@pytest.fixture(autouse=True)
+def reset_registry():
+    registry.reset()
+    yield
+    registry.reset()
+
+
+def metric(text, name, **labels):
+    """Значение метрики с заданными метками из ответа /metrics."""
+    wanted = ','.join(f'{key}="{value}"' for key, value in labels.items())
+    if wanted:
+        wanted = f'{{{wanted}}}'
+    match = re.search(
+        rf'^{name}{re.escape(wanted)} (\S+)$', text, re.MULTILINE
+    )
+    assert match, f'В ответе /metrics нет `{name}{wanted}`.'
+    return float(match.group(1))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Metrics:
+
+    def test_01_access(self, client, user_client, admin_client):
+        assert client.get('/metrics').status_code == 401
+        assert user_client.get('/metrics').status_code == 403
+        response = admin_client.get('/metrics')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain'), (
+            'Метрики отдаются в текстовом формате Prometheus.'
+        )
+
+    def test_02_route_metrics(self, client, admin_client):
+        Title.objects.create(name='Побег из Шоушенка', year=1994)
+        with CaptureQueriesContext(connection) as queries:
+            client.get('/api/v1/titles/')
+        list_queries = len(queries)
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/1000/')
+        client.get('/api/v1/unknown/')
+
+        text = admin_client.get('/metrics').content.decode()
+        route = {'route': 'titles-list'}
+        assert metric(
+            text, 'yamdb_http_requests_total',
+            route='titles-list', method='GET', status='200'
+        ) == 2, 'Запросы считаются по имени маршрута, методу и статусу.'
+        assert metric(
+            text, 'yamdb_http_requests_total',
+            route='titles-detail', method='GET', status='404'
+        ) == 1
+        assert metric(
+            text, 'yamdb_http_requests_total',
+            route='unmatched', method='GET', status='404'
+        ) == 1, 'Адреса без маршрута идут в одну метку `unmatched`.'
+
+        assert metric(
+            text, 'yamdb_http_request_duration_seconds_count', **route
+        ) == 2
+        assert metric(
+            text, 'yamdb_http_request_duration_seconds_bucket',
+            route='titles-list', le='+Inf'
+        ) == 2
+        assert metric(
+            text, 'yamdb_http_request_duration_seconds_sum', **route
+        ) > 0
+        # Второй запрос получен из кэша ответов, без БД.
+        assert metric(
+            text, 'yamdb_db_queries_total', **route
+        ) == list_queries, 'Должны считаться все запросы к БД.'
+        assert metric(
+            text, 'yamdb_db_query_duration_seconds_total', **route
+        ) > 0
+
+    def test_03_processes_aggregated(self, client, admin_client):
+        client.get('/api/v1/genres/')
+        other = Registry()
+        other.observe('genres-list', 'GET', '200', 0.02, 2, 0.001)
+        other.flush()
+
+        text = admin_client.get('/metrics').content.decode()
+        assert metric(text, 'yamdb_metrics_processes') == 2
+        assert metric(
+            text, 'yamdb_http_requests_total',
+            route='genres-list', method='GET', status='200'
+        ) == 2, 'Счетчики процессов должны суммироваться.'
+        assert metric(
+            text, 'yamdb_http_request_duration_seconds_bucket',
+            route='genres-list', le='0.025'
+        ) >= 1
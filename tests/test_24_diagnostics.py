@@ -0,0 +1,123 @@
+import logging
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+
+from api.diagnostics import normalize_sql, track_queries
+from api.queries import query_stats, record_query
+from reviews.models import Comment, Review, Title
+
+HEADERS = ('X-DB-Query-Count', 'X-DB-Time-ms', 'Server-Timing')
+
+
+@pytest.fixture
+def diagnostics(settings, monkeypatch):
+    settings.DB_DIAGNOSTICS = True
+    # Лог пишется только в caplog, не в файл проекта.
+    monkeypatch.setattr(logging.getLogger('api.diagnostics'), 'handlers', [])
+    return settings
+
+
+class RepeatedQuerySerializer(serializers.Serializer):
+    reviews = serializers.SerializerMethodField()
+
+    def get_reviews(self, title):
+        return Review.objects.filter(title=title).count()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24Diagnostics:
+
+    def test_01_off_by_default(self, client):
+        response = client.get('/api/v1/titles/')
+        assert not any(response.has_header(name) for name in HEADERS), (
+            'Без DB_DIAGNOSTICS заголовков диагностики быть не должно.'
+        )
+
+    def test_02_headers(self, client, user, diagnostics):
+        title = Title.objects.create(name='Побег из Шоушенка', year=1994)
+        review = Review.objects.create(
+            title=title, author=user, text='Отлично', score=10
+        )
+        Comment.objects.create(review=review, author=user, text='Согласен')
+        # Сколько запросов к БД стоят чтения, за которыми следим.
+        budgets = {
+            '/api/v1/titles/': 3,
+            f'/api/v1/titles/{title.id}/': 2,
+            f'/api/v1/titles/{title.id}/reviews/': 3,
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/': 3,
+        }
+        for url, budget in budgets.items():
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url)
+            count = int(response['X-DB-Query-Count'])
+            assert count == len(queries), (
+                'X-DB-Query-Count должен совпадать с числом запросов к БД.'
+            )
+            assert count <= budget, (
+                f'`{url}`: {count} запросов к БД вместо {budget}.'
+            )
+            assert float(response['X-DB-Time-ms']) >= 0
+            assert response['Server-Timing'].startswith(
+                f'db;dur={response["X-DB-Time-ms"]};desc="{count} queries"'
+            )
+            assert response['X-DB-Repeated-Queries'] == '0'
+
+    def test_03_slow_query_log(self, client, diagnostics, caplog):
+        Title.objects.create(name='Побег из Шоушенка', year=1994)
+        diagnostics.DB_SLOW_QUERY_MS = 0
+        with caplog.at_level(logging.WARNING, logger='api.diagnostics'):
+            client.get('/api/v1/titles/')
+        messages = [record.getMessage() for record in caplog.records]
+        assert any(
+            'TitleViewSet.list' in message and 'reviews_title' in message
+            for message in messages
+        ), 'В логе медленных запросов должны быть SQL и view.'
+
+    def test_04_repeated_queries(self, diagnostics, caplog):
+        titles = Title.objects.bulk_create(
+            Title(name=f'Произведение {number}', year=2000)
+            for number in range(6)
+        )
+        with track_queries() as log:
+            RepeatedQuerySerializer(
+                Title.objects.all(), many=True
+            ).data
+        assert len(titles) + 1 == log.count
+        [(sql, count, _, (view, serializer))] = log.repeated()
+        assert count == len(titles) and 'reviews_review' in sql, (
+            'Одинаковые запросы с разными значениями должны '
+            'считаться вместе.'
+        )
+        assert serializer == 'RepeatedQuerySerializer', (
+            'Для повторяющегося запроса должен быть найден сериализатор.'
+        )
+
+    def test_05_normalize_sql(self):
+        assert normalize_sql(
+            'SELECT * FROM t WHERE id IN (%s, %s, %s) AND a = 5'
+        ) == normalize_sql('SELECT * FROM t WHERE id IN (%s) AND a = 7')
+        assert normalize_sql("SELECT 'a'") == normalize_sql("SELECT 'b'")
+
+    def test_06_single_query_recorder(self):
+        connection.ensure_connection()
+        assert [
+            wrapper for wrapper in connection.execute_wrappers
+            if wrapper.__module__.startswith('api.')
+        ] == [record_query], (
+            'Метрики и диагностика должны использовать одну обертку '
+            'запросов к БД.'
+        )
+        token = query_stats.set([0, 0.0])
+        try:
+            with track_queries() as log:
+                Title.objects.count()
+            stats = query_stats.get()
+        finally:
+            query_stats.reset(token)
+        assert stats[0] == log.count == 1 and stats[1] == log.seconds, (
+            'Один замер запроса должен попадать и в метрики, '
+            'и в журнал диагностики.'
+        )
@@ -0,0 +1,73 @@
+import pytest
+
+from api.benchmark import SCENARIOS, compare, run_benchmark, uncovered_routes
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleGenre, User)
+from reviews.seed import seed_catalog
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Benchmark:
+
+    def test_01_seed_catalog(self):
+        counts = seed_catalog(10, reviews_per_title=3, comments_per_review=2)
+        assert Title.objects.count() == counts[Title] == 10
+        assert Review.objects.count() == counts[Review] == 30
+        assert Comment.objects.count() == counts[Comment] == 60
+        assert TitleGenre.objects.count() == counts[TitleGenre] >= 10
+        title = Title.objects.get(pk=1)
+        assert title.rating is not None, (
+            'После заполнения рейтинги должны быть пересчитаны.'
+        )
+        first = list(Title.objects.order_by('id').values_list('year'))
+        for model in (Title, Category, Genre, User):
+            model.objects.all().delete()
+        seed_catalog(10, reviews_per_title=3, comments_per_review=2)
+        assert list(
+            Title.objects.order_by('id').values_list('year')
+        ) == first, 'Один и тот же seed должен давать одни и те же данные.'
+        title = Title.objects.create(name='Новое', year=2000)
+        assert title.id > 10, (
+            'Счетчики id должны продолжаться после заполнения.'
+        )
+
+    def test_02_every_route_covered(self):
+        assert not uncovered_routes(), (
+            'Для каждого маршрута api/v1/urls.py нужен сценарий бенчмарка.'
+        )
+
+    def test_03_run_benchmark(self):
+        seed_catalog(5, reviews_per_title=2, comments_per_review=1)
+        results = run_benchmark(requests=2, warmup=0)
+        assert set(results['scenarios']) == {
+            scenario.name for scenario in SCENARIOS
+        }
+        for name, result in results['scenarios'].items():
+            assert result['errors'] == 0, (
+                f'Сценарий `{name}` вернул статусы {result["statuses"]}.'
+            )
+            assert result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+            assert result['alloc_peak_kib'] > 0
+        assert results['scenarios']['GET titles-list']['queries'] > 0
+        assert results['meta']['dataset'] == {
+            'titles': 5, 'reviews': 10, 'comments': 10
+        }, 'Запись должна откатываться, данные - оставаться прежними.'
+
+    def test_04_compare(self):
+        def run(p95, queries):
+            return {'scenarios': {'GET titles-list': {
+                'p50_ms': 1.0, 'p95_ms': p95, 'p99_ms': p95,
+                'queries': queries, 'alloc_peak_kib': 10.0,
+            }}}
+
+        baseline = run(2.0, 3)
+        [row] = compare(run(2.1, 3), baseline, threshold=10)
+        assert not row['regression']
+        assert row['p95_ms'] == pytest.approx(5.0)
+        [row] = compare(run(2.5, 3), baseline, threshold=10)
+        assert row['regression'], 'Рост p95 выше порога - регрессия.'
+        [row] = compare(run(1.0, 4), baseline, threshold=10)
+        assert row['regression'], 'Лишний запрос к БД - регрессия.'
+        assert row['queries'] == 1
+        [row] = compare(run(1.0, 4), {'scenarios': {}})
+        assert row['new'] and not row['regression']
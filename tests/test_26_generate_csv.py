@@ -0,0 +1,88 @@
+import csv
+import re
+from collections import Counter
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+from reviews.csv_generate import CsvGenerator
+from reviews.models import Comment, Review, Title, TitleGenre, User
+
+FILES = ('category.csv', 'genre.csv', 'titles.csv', 'genre_title.csv',
+         'users.csv', 'review.csv', 'comments.csv')
+
+
+def generate(path, **kwargs):
+    options = {'titles': 50, 'users': 20, 'reviews': 300, 'comments': 400}
+    options.update(kwargs)
+    call_command('generate_csv', output_dir=path, stdout=StringIO(),
+                 **options)
+    return {name: (path / name).read_bytes() for name in FILES}
+
+
+def read(path, name):
+    with open(path / name, encoding='utf-8', newline='') as csv_file:
+        return list(csv.DictReader(csv_file))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26GenerateCsv:
+
+    def test_01_schemas(self, tmp_path):
+        generate(tmp_path)
+        fixtures = settings.BASE_DIR / 'static' / 'data'
+        for name in FILES:
+            with open(tmp_path / name, encoding='utf-8') as generated, \
+                    open(fixtures / name, encoding='utf-8') as fixture:
+                assert generated.readline() == fixture.readline(), (
+                    f'Заголовок {name} должен совпадать со static/data.'
+                )
+
+    def test_02_counts_and_skew(self, tmp_path):
+        generate(tmp_path)
+        assert len(read(tmp_path, 'titles.csv')) == 50
+        assert len(read(tmp_path, 'users.csv')) == 20
+        reviews = read(tmp_path, 'review.csv')
+        assert len(reviews) == 300
+        assert len(read(tmp_path, 'comments.csv')) == 400
+        pairs = {(row['title_id'], row['author']) for row in reviews}
+        assert len(pairs) == len(reviews), (
+            'У пользователя не больше одного отзыва на произведение.'
+        )
+        per_title = Counter(row['title_id'] for row in reviews)
+        assert max(per_title.values()) >= 3 * len(reviews) / 50, (
+            'Отзывы на произведения должны распределяться неравномерно.'
+        )
+        per_user = Counter(row['author'] for row in reviews)
+        assert max(per_user.values()) > 2 * min(per_user.values())
+
+    def test_03_deterministic(self, tmp_path):
+        first = generate(tmp_path / 'first', seed=7)
+        assert generate(tmp_path / 'second', seed=7) == first, (
+            'Один и тот же seed должен давать одинаковые файлы.'
+        )
+        assert generate(tmp_path / 'third', seed=8) != first
+
+    def test_04_import(self, tmp_path):
+        generate(tmp_path)
+        out = StringIO()
+        call_command('import_csv', data_dir=tmp_path, stdout=out,
+                     stderr=StringIO())
+        assert not re.search(r'ошибок [1-9]', out.getvalue()), (
+            'Сгенерированные файлы должны импортироваться без ошибок.'
+        )
+        assert Title.objects.count() == 50
+        assert User.objects.count() == 20
+        assert Review.objects.count() == 300
+        assert Comment.objects.count() == 400
+        assert TitleGenre.objects.count() == len(
+            read(tmp_path, 'genre_title.csv')
+        )
+
+    def test_05_invalid_counts(self, tmp_path):
+        with pytest.raises(ValueError):
+            CsvGenerator(tmp_path, titles=2, users=2, reviews=5)
+        with pytest.raises(ValueError):
+            CsvGenerator(tmp_path, reviews=0, comments=1)
@@ -0,0 +1,124 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+
+URL = '/api/v1/titles/bulk/'
+
+
+@pytest.fixture
+def catalog():
+    Category.objects.create(name='Фильм', slug='movie')
+    Category.objects.create(name='Книга', slug='book')
+    Genre.objects.create(name='Драма', slug='drama')
+    Genre.objects.create(name='Комедия', slug='comedy')
+
+
+def items(count):
+    return [
+        {'name': f'Произведение {number}', 'year': 2000,
+         'genre': ['drama', 'comedy'], 'category': 'movie'}
+        for number in range(count)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27TitlesBulk:
+
+    def test_01_access(self, client, user_client, catalog):
+        response = client.post(URL, items(1),
+                               content_type='application/json')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.post(
+            URL, items(1), format='json'
+        ).status_code == HTTPStatus.FORBIDDEN, (
+            'Массово создавать произведения может только администратор.'
+        )
+        assert not Title.objects.exists()
+
+    def test_02_partial_success(self, admin_client, catalog):
+        data = [
+            {'name': 'Побег из Шоушенка', 'year': 1994,
+             'description': 'Тюремная драма', 'genre': ['drama'],
+             'category': 'movie'},
+            {'name': 'Без категории', 'year': 2000, 'genre': ['drama'],
+             'category': 'unknown'},
+            {'year': 2000, 'genre': [], 'category': 'book'},
+            {'name': 'Из будущего', 'year': 3000, 'genre': [],
+             'category': 'book'},
+            {'name': 'Двенадцать стульев', 'year': 1928,
+             'genre': ['comedy', 'comedy', 'drama'], 'category': 'book'},
+            {'name': 'Неизвестный жанр', 'year': 2000,
+             'genre': ['drama', 'horror'], 'category': 'book'},
+        ]
+        response = admin_client.post(URL, data, format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        result = response.json()
+        assert [title['name'] for title in result['created']] == [
+            'Побег из Шоушенка', 'Двенадцать стульев'
+        ], 'Корректные элементы должны создаваться, несмотря на ошибки.'
+        assert [error['index'] for error in result['errors']] == [1, 2, 3, 5]
+        errors = {error['index']: error['errors']
+                  for error in result['errors']}
+        assert 'category' in errors[1]
+        assert 'name' in errors[2]
+        assert 'year' in errors[3]
+        assert list(errors[5]) == ['genre'] and len(errors[5]['genre']) == 1
+
+        first, second = result['created']
+        assert first['genre'] == ['drama']
+        assert first['description'] == 'Тюремная драма'
+        assert second['genre'] == ['comedy', 'drama']
+        title = Title.objects.get(pk=first['id'])
+        assert title.name == 'Побег из Шоушенка'
+        assert title.category.slug == 'movie'
+        title = Title.objects.get(pk=second['id'])
+        assert sorted(title.genre.values_list('slug', flat=True)) == [
+            'comedy', 'drama'
+        ]
+        assert Title.objects.count() == 2
+
+    def test_03_constant_queries(self, admin_client, catalog):
+        def count_queries(count):
+            with CaptureQueriesContext(connection) as queries:
+                response = admin_client.post(URL, items(count), format='json')
+            assert response.status_code == HTTPStatus.CREATED
+            return len(queries)
+
+        # Первый запрос заполняет кэши аутентификации.
+        count_queries(1)
+        assert count_queries(2) == count_queries(40), (
+            'Число запросов к БД не должно зависеть от числа произведений.'
+        )
+        assert Title.objects.count() == 43
+        ids = list(Title.objects.order_by('id').values_list('id', flat=True))
+        assert sorted(
+            Title.genre.through.objects.values_list('title_id', flat=True)
+        ) == sorted(ids * 2), 'У каждого произведения должны быть жанры.'
+
+    def test_04_invalid_request(self, admin_client, catalog, settings):
+        settings.TITLES_BULK_MAX = 2
+        for data in ({'name': 'Не список'}, [], items(3)):
+            response = admin_client.post(URL, data, format='json')
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+            assert 'non_field_errors' in response.json()
+        response = admin_client.post(
+            URL, [{'name': 'Без года', 'genre': [], 'category': 'movie'}],
+            format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Если не создано ни одного произведения, ответ - 400.'
+        )
+        assert response.json()['created'] == []
+        assert not Title.objects.exists()
+
+    def test_05_list_updated(self, client, admin_client, catalog):
+        assert client.get('/api/v1/titles/').json()['count'] == 0
+        admin_client.post(URL, items(3), format='json')
+        response = client.get('/api/v1/titles/')
+        assert response.json()['count'] == 3, (
+            'После массового создания кэш списка должен обновиться.'
+        )
@@ -0,0 +1,100 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+from tests.test_22_async_read import async_views, get  # noqa: F401
+
+URL = '/api/v1/titles/'
+
+
+def create_catalog(count):
+    category = Category.objects.create(name='Фильм', slug='movie')
+    genres = [
+        Genre.objects.create(name='Драма', slug='drama'),
+        Genre.objects.create(name='Комедия', slug='comedy'),
+    ]
+    titles = []
+    for number in range(count):
+        title = Title.objects.create(
+            name=f'Произведение {number}', year=2000, category=category
+        )
+        title.genre.set(genres[:number % 3])
+        titles.append(title.id)
+    return titles
+
+
+def ids_url(ids):
+    return f'{URL}?ids={",".join(str(pk) for pk in ids)}'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28TitlesIds:
+
+    def test_01_order_and_shape(self, client):
+        titles = create_catalog(6)
+        requested = [titles[4], titles[0], 100500, titles[2], titles[0]]
+        response = client.get(ids_url(requested))
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert [title['id'] for title in data] == [
+            titles[4], titles[0], titles[2]
+        ], (
+            'Произведения должны идти в порядке из запроса, без '
+            'несуществующих id и повторов.'
+        )
+        for title in data:
+            assert title == client.get(f'{URL}{title["id"]}/').json(), (
+                'Элемент ответа должен совпадать с карточкой произведения.'
+            )
+
+    def test_02_queries(self, client):
+        titles = create_catalog(20)
+
+        def count_queries(ids):
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(ids_url(ids))
+            assert response.status_code == HTTPStatus.OK
+            assert len(response.json()) == len(ids)
+            return len(queries)
+
+        # Произведения с категорией одним запросом, жанры - вторым.
+        assert count_queries(titles[:3]) == 2
+        assert count_queries(titles[::-1]) == 2, (
+            'Число запросов к БД не должно зависеть от числа id.'
+        )
+
+    def test_03_invalid(self, client, settings):
+        create_catalog(3)
+        settings.TITLES_IDS_MAX = 2
+        assert 'results' in client.get(f'{URL}?ids=').json(), (
+            'Пустой `?ids=` не должен отключать пагинацию.'
+        )
+        for value in ('a,b', '1,,2', '0', '-1', '1,2,3'):
+            response = client.get(f'{URL}?ids={value}')
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'`?ids={value}` должен возвращать 400.'
+            )
+            assert 'ids' in response.json()
+        response = client.get(f'{URL}?ids=1,2,1')
+        assert response.status_code == HTTPStatus.OK, (
+            'Повторы id не должны учитываться в ограничении.'
+        )
+
+    def test_04_with_filters(self, client):
+        titles = create_catalog(6)
+        response = client.get(ids_url(titles[::-1]) + '&genre=comedy')
+        assert [title['id'] for title in response.json()] == [
+            titles[5], titles[2]
+        ], 'Список id должен сочетаться с фильтрами.'
+
+    def test_05_async(self, client, async_views):  # noqa: F811
+        titles = create_catalog(4)
+        url = ids_url([titles[3], titles[1]])
+        expected = client.get(url).json()
+        async_views()
+        response = get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == expected